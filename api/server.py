@@ -11,6 +11,8 @@ from pydantic import BaseModel
 import uvicorn
 
 from src.dmmr import DMMRAgent, get_config, validate_config
+from src.dmmr.access_stats import AccessStats
+from src.dmmr.memory_systems import VectorDatabase, get_graph_store
 
 
 # ==================== 请求/响应模型 ====================
@@ -90,16 +92,85 @@ def get_or_create_agent(user_id: str, use_real_backends: bool = False) -> DMMRAg
     return agents_cache[agent_key]
 
 
-def clear_agent_cache(user_id: str = None):
-    """清除智能体缓存"""
+def save_agent_memory(agent: DMMRAgent):
+    """保存智能体的记忆快照与访问统计，供下次启动时热加载"""
+    try:
+        agent.memory_systems.save()
+        agent.activation_engine.save_access_stats()
+    except Exception as e:
+        print(f"⚠️ 记忆快照保存失败 (用户: {agent.user_id}): {e}")
+
+
+def release_agent(agent: DMMRAgent, save_memory: bool = True):
+    """释放智能体的图会话（共享驱动保持打开），可选先保存记忆快照"""
+    if save_memory:
+        save_agent_memory(agent)
+    try:
+        agent.memory_systems.close()
+    except Exception as e:
+        print(f"⚠️ 图会话释放失败 (用户: {agent.user_id}): {e}")
+
+
+def purge_agent_memory(agent: DMMRAgent):
+    """删除智能体的全部记忆：图数据、情景记忆及其磁盘文件、访问统计"""
+    try:
+        agent.memory_systems.purge()
+        agent.activation_engine.purge_access_stats()
+    except Exception as e:
+        print(f"⚠️ 记忆清除失败 (用户: {agent.user_id}): {e}")
+
+
+def purge_user_storage(user_id: str):
+    """
+    删除用户留在磁盘上的记忆文件（FAISS 快照、持久化情景存储、访问统计）
+    以及 Neo4j 中按图名标签区分的语义图和程序图，用户当前没有加载的智能体时同样生效
+    """
+    config = get_config().database
+    VectorDatabase.purge_storage(f"{user_id}_episodic")
+    AccessStats.user_path(config.cache_dir, user_id).unlink(missing_ok=True)
+    
+    graph_store = get_graph_store()
+    if not (config.use_real_graph_db or graph_store.connected):
+        return
+    for graph_name in (f"{user_id}_semantic", f"{user_id}_procedural"):
+        try:
+            graph_store.purge_graph(graph_name)
+        except Exception as e:
+            print(f"⚠️ 图数据删除失败 ({graph_name}): {e}")
+
+
+def user_agent_keys(user_id: str) -> List[str]:
+    """用户在缓存中的智能体键（按是否使用真实后端区分）"""
+    return [key for key in (f"{user_id}_False", f"{user_id}_True") if key in agents_cache]
+
+
+def clear_agent_cache(user_id: str = None, save_memory: bool = True, purge: bool = False):
+    """
+    清除智能体缓存（默认先保存记忆快照）
+
+    Args:
+        user_id: 只清除该用户的智能体，None 表示全部
+        save_memory: 释放前是否保存记忆快照
+        purge: 是否同时删除该用户的全部记忆（需指定 user_id，忽略 save_memory）
+    """
     if user_id:
         # 清除特定用户的智能体
-        keys_to_remove = [key for key in agents_cache.keys() if key.startswith(f"{user_id}_")]
+        keys_to_remove = user_agent_keys(user_id)
+        if purge:
+            for key in keys_to_remove:
+                agent = agents_cache.pop(key)
+                purge_agent_memory(agent)
+                release_agent(agent, save_memory=False)
+            purge_user_storage(user_id)
+            print(f"🗑️ 已删除用户 {user_id} 的全部记忆")
+            return
         for key in keys_to_remove:
-            del agents_cache[key]
+            release_agent(agents_cache.pop(key), save_memory)
         print(f"🗑️ 已清除用户 {user_id} 的智能体缓存")
     else:
         # 清除所有智能体
+        for agent in agents_cache.values():
+            release_agent(agent, save_memory)
         agents_cache.clear()
         print("🗑️ 已清除所有智能体缓存")
 
@@ -130,6 +201,7 @@ async def shutdown_event():
     """应用关闭事件"""
     print("🛑 DMMR API服务器关闭中...")
     clear_agent_cache()
+    get_graph_store().close()
     print("✅ DMMR API服务器已关闭")
 
 
@@ -196,13 +268,12 @@ async def reset_session(request: ResetRequest):
         print(f"🔄 重置会话请求 (用户: {request.user_id}, 清除记忆: {request.clear_memories})")
         
         if request.clear_memories:
-            # 清除智能体缓存
-            clear_agent_cache(request.user_id)
+            # 清除智能体缓存并删除磁盘上的记忆文件
+            clear_agent_cache(request.user_id, purge=True)
             message = "会话和记忆已完全重置"
         else:
             # 仅重置会话状态
-            agent_keys = [key for key in agents_cache.keys() if key.startswith(f"{request.user_id}_")]
-            for key in agent_keys:
+            for key in user_agent_keys(request.user_id):
                 agents_cache[key].reset_session()
             message = "会话状态已重置，记忆保留"
         
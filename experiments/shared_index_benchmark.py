@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+DMMR 共享向量索引基准
+对比每用户独立 FAISS 索引与按用户分区的共享索引在 1k / 10k 用户规模下的
+内存占用和检索延迟，用于决定是否开启 DMMR_SHARED_VECTOR_INDEX
+"""
+import io
+import sys
+import csv
+import json
+import time
+import argparse
+import contextlib
+import subprocess
+from pathlib import Path
+from typing import Dict, List, Any
+from datetime import datetime
+
+import numpy as np
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.dmmr import MemoryChunk, get_config
+from src.dmmr.memory_systems import VectorDatabase, FAISS_AVAILABLE
+
+
+MODES = ["per_user", "shared"]
+
+
+def rss_mb() -> float:
+    """当前进程常驻内存(MB)，读取 /proc/self/status"""
+    with open("/proc/self/status", "r") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def run_worker(mode: str, users: int, per_user: int, n_queries: int, k: int,
+               seed: int) -> Dict[str, Any]:
+    """在独立进程中构建一种模式并测量，避免两种模式的内存互相干扰"""
+    config = get_config().database
+    config.shared_vector_index = mode == "shared"
+    config.vector_index_type = "flat"
+    dim = config.vector_dim
+
+    rng = np.random.default_rng(seed)
+    vectors = rng.standard_normal((users * per_user, dim)).astype('float32')
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    queries = rng.standard_normal((n_queries, dim)).astype('float32')
+    targets = rng.integers(0, users, n_queries)
+
+    baseline = rss_mb()
+    start = time.perf_counter()
+    databases: List[VectorDatabase] = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for user in range(users):
+            db = VectorDatabase(collection_name=f"bench_{user}_episodic", use_real_backend=True)
+            rows = vectors[user * per_user:(user + 1) * per_user]
+            chunks = [
+                MemoryChunk(id=f"{user}_{i}", content="", user_id=str(user), embedding=row.tolist())
+                for i, row in enumerate(rows)
+            ]
+            db.add_batch(chunks)
+            # 嵌入已存入索引，释放记忆块上的列表副本，使对比只反映索引与元数据
+            for chunk in chunks:
+                chunk.embedding = None
+            databases.append(db)
+    build_time = time.perf_counter() - start
+    footprint = rss_mb() - baseline
+
+    latencies = []
+    for query, user in zip(queries, targets):
+        start = time.perf_counter()
+        databases[user].search(query.tolist(), n_results=k)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    return {
+        'mode': mode,
+        'users': users,
+        'vectors_per_user': per_user,
+        'footprint_mb': footprint,
+        'build_time_sec': build_time,
+        'mean_latency_ms': float(np.mean(latencies)),
+        'p99_latency_ms': float(np.percentile(latencies, 99)),
+    }
+
+
+def run(user_counts: List[int], per_user: int, n_queries: int, k: int,
+        seed: int) -> List[Dict[str, Any]]:
+    """对每个用户规模和模式各启动一个子进程"""
+    report = []
+    for users in user_counts:
+        for mode in MODES:
+            print(f"\n📊 {mode}: {users} 用户 × {per_user} 条向量")
+            output = subprocess.run(
+                [sys.executable, __file__, "--worker", mode, "--users", str(users),
+                 "--per-user", str(per_user), "--queries", str(n_queries),
+                 "-k", str(k), "--seed", str(seed)],
+                check=True, capture_output=True, text=True
+            ).stdout
+            row = json.loads(output.strip().splitlines()[-1])
+            report.append(row)
+            print(f"   内存={row['footprint_mb']:.1f}MB, 构建={row['build_time_sec']:.2f}s, "
+                  f"平均={row['mean_latency_ms']:.3f}ms, p99={row['p99_latency_ms']:.3f}ms")
+    return report
+
+
+def save_report(report: List[Dict[str, Any]], output_dir: Path, meta: Dict[str, Any]):
+    """保存JSON和CSV报告"""
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    json_file = output_dir / "shared_index_benchmark.json"
+    with open(json_file, 'w', encoding='utf-8') as f:
+        json.dump({'meta': meta, 'results': report}, f, ensure_ascii=False, indent=2)
+
+    csv_file = output_dir / "shared_index_benchmark.csv"
+    with open(csv_file, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=list(report[0].keys()))
+        writer.writeheader()
+        writer.writerows(report)
+
+    print(f"\n💾 报告已保存: {json_file}, {csv_file}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="DMMR 共享向量索引 vs 每用户索引: 内存与延迟基准")
+    parser.add_argument("--users", type=int, nargs="+", default=[1000, 10000], help="用户规模")
+    parser.add_argument("--per-user", type=int, default=20, help="每个用户的向量数")
+    parser.add_argument("--queries", type=int, default=2000, help="查询数")
+    parser.add_argument("-k", type=int, default=5, help="每次检索返回数")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output-dir", default=get_config().experiment.output_dir)
+    parser.add_argument("--worker", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if not FAISS_AVAILABLE:
+        print("❌ 未安装 faiss，无法运行共享索引基准")
+        return
+
+    if args.worker:
+        row = run_worker(args.worker, args.users[0], args.per_user, args.queries, args.k, args.seed)
+        print(json.dumps(row))
+        return
+
+    print("🚀 DMMR 共享向量索引基准")
+    print("=" * 50)
+    report = run(args.users, args.per_user, args.queries, args.k, args.seed)
+    save_report(report, Path(args.output_dir), {
+        'per_user': args.per_user,
+        'queries': args.queries,
+        'k': args.k,
+        'dim': get_config().database.vector_dim,
+        'timestamp': datetime.now().isoformat()
+    })
+
+
+if __name__ == "__main__":
+    main()
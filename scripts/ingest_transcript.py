@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+DMMR 情景记忆批量导入
+将 JSONL 聊天记录流式写入指定用户的情景记忆
+
+每行一个 JSON 对象，字段:
+    content (必需)          对话内容 (也接受 text)
+    id                      记忆块ID，缺省时自动生成
+    timestamp               ISO 格式时间戳
+    task_type               TaskType 取值，如 technical_coding
+    significance_score      重要性评分，缺省时由 ScoreCalculator 计算
+    metadata                其他元数据
+
+默认后端写入 cache_dir/<user_id>_episodic/ 下的持久化存储（服务端需设置
+DMMR_PERSIST_EPISODIC=1 才会加载）；--real-backends 时导入结束后保存 FAISS 快照。
+
+用法:
+    python scripts/ingest_transcript.py --user-id alice chats.jsonl --batch-size 2000
+"""
+import sys
+import json
+import time
+import argparse
+from pathlib import Path
+from datetime import datetime
+from typing import Dict, Any, Iterator, List
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.dmmr import (
+    MultipleMemorySystems, InformationExtractor, ScoreCalculator,
+    MemoryChunk, TaskType, get_config
+)
+
+
+def read_records(path: Path) -> Iterator[Dict[str, Any]]:
+    """逐行读取JSONL，跳过空行和无法解析的行"""
+    with open(path, 'r', encoding='utf-8') as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as e:
+                print(f"⚠️ 第 {line_no} 行解析失败，已跳过: {e}")
+
+
+def record_to_chunk(record: Dict[str, Any], user_id: str) -> MemoryChunk:
+    """将一条记录转换为记忆块（不含嵌入）"""
+    task_type = record.get('task_type', TaskType.GENERAL_QA.value)
+    try:
+        task_type = TaskType(task_type)
+    except ValueError:
+        task_type = TaskType.GENERAL_QA
+
+    chunk = MemoryChunk(
+        id=record.get('id'),
+        content=record.get('content') or record.get('text') or '',
+        user_id=user_id,
+        task_type=task_type,
+        metadata=record.get('metadata', {}),
+        significance_score=record.get('significance_score', 0.0)
+    )
+    if record.get('timestamp'):
+        chunk.timestamp = datetime.fromisoformat(record['timestamp'])
+    return chunk
+
+
+def ingest(path: Path, memory: MultipleMemorySystems, extractor: InformationExtractor,
+           scorer: ScoreCalculator, user_id: str, batch_size: int) -> int:
+    """按批次导入，返回导入的记忆块数"""
+    total = 0
+    batch: List[MemoryChunk] = []
+    scored: List[bool] = []
+
+    def flush():
+        embeddings = extractor.generate_embeddings([chunk.content for chunk in batch])
+        for chunk, embedding, has_score in zip(batch, embeddings, scored):
+            chunk.embedding = embedding
+            if not has_score:
+                chunk.significance_score = scorer.calculate_initial_score(chunk)
+        memory.add_to_episodic_batch(batch)
+
+    start = time.perf_counter()
+    for record in read_records(path):
+        chunk = record_to_chunk(record, user_id)
+        if not chunk.content:
+            continue
+        batch.append(chunk)
+        scored.append('significance_score' in record)
+
+        if len(batch) >= batch_size:
+            flush()
+            total += len(batch)
+            batch, scored = [], []
+            elapsed = time.perf_counter() - start
+            print(f"   已导入 {total} 条 ({total / max(elapsed, 1e-9):.0f} 条/秒)")
+
+    if batch:
+        flush()
+        total += len(batch)
+
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="将JSONL聊天记录批量导入DMMR情景记忆")
+    parser.add_argument("transcript", type=Path, help="JSONL 文件路径")
+    parser.add_argument("--user-id", required=True, help="目标用户ID")
+    parser.add_argument("--batch-size", type=int, default=1000, help="每批写入的记忆块数")
+    parser.add_argument("--real-backends", action="store_true", help="使用真实数据库后端")
+    args = parser.parse_args()
+
+    print(f"🚀 导入聊天记录: {args.transcript} → 用户 {args.user_id}")
+
+    if not args.real_backends:
+        # 纯内存后端进程退出即丢失，导入时改用持久化的内存映射存储
+        get_config().database.persist_episodic = True
+    memory = MultipleMemorySystems(args.user_id, use_real_backends=args.real_backends)
+    # 嵌入在本地生成，不需要 API 密钥
+    extractor = InformationExtractor()
+    scorer = ScoreCalculator()
+
+    start = time.perf_counter()
+    try:
+        total = ingest(args.transcript, memory, extractor, scorer, args.user_id, args.batch_size)
+    finally:
+        # 保存快照后释放，进程退出后导入的记忆仍然可用（中途失败时保留已导入的部分）
+        memory.save()
+        memory.close()
+    elapsed = time.perf_counter() - start
+
+    print(f"✅ 导入完成: {total} 条记忆, 耗时 {elapsed:.2f}s ({total / max(elapsed, 1e-9):.0f} 条/秒)")
+
+
+if __name__ == "__main__":
+    main()
@@ -14,7 +14,7 @@ Core Modules:
 
 from .config import get_config, validate_config, config_manager
 from .data_models import (
-    TaskType, MemoryChunk, Node, Relationship, Entity,
+    TaskType, MemoryChunk, EpisodicFilter, Node, Relationship, Entity,
     ActivationResult, RetrievalResult, ResponseMetrics,
     ExperimentConfig, BenchmarkResult
 )
@@ -52,6 +52,7 @@ __all__ = [
     # Data Models
     "TaskType",
     "MemoryChunk",
+    "EpisodicFilter",
     "Node", 
     "Relationship",
     "Entity",
@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+"""
+访问统计 - 认知启动的数据来源
+按用户记录节点激活能量、最近使用的情景记忆块与图中度中心性最高的节点，
+持久化为 JSON，使下次启动的预热只预取该用户真正会访问的记忆
+"""
+import heapq
+import json
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .config import safe_path_name
+
+
+class AccessStats:
+    """
+    单个用户的访问统计
+
+    节点得分为指数衰减的累计激活能量：每记录一轮激活，旧得分乘以 decay，
+    近期反复激活的节点排在前面。衰减通过放大新增量实现（只在数值过大时整体归一化），
+    每轮记录的开销只与本轮激活的节点数有关。
+
+    Args:
+        path: 持久化文件路径，None 表示只在内存中统计
+        decay: 每轮激活后旧得分的衰减系数
+        max_nodes: 保留得分最高的节点数
+        max_recent_chunks: 保留最近使用的情景记忆块数
+    """
+
+    # 放大系数超过该值时归一化，避免浮点溢出
+    RESCALE_LIMIT = 1e100
+
+    def __init__(self, path: Optional[Path] = None, decay: float = 0.9,
+                 max_nodes: int = 512, max_recent_chunks: int = 64):
+        self.path = Path(path) if path else None
+        self.decay = decay
+        self.max_nodes = max_nodes
+        self.max_recent_chunks = max_recent_chunks
+        self.node_scores: Dict[str, float] = {}
+        self.recent_chunks: "OrderedDict[str, None]" = OrderedDict()
+        self.central_nodes: List[str] = []
+        self._scale = 1.0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_user(cls, cache_dir: str, user_id: str, **kwargs) -> "AccessStats":
+        """
+        加载用户的访问统计（cache_dir/<user_id>_access.json），不存在时返回空统计
+        user_id 来自客户端，经 safe_path_name 转换，不会写到 cache_dir 之外
+        """
+        stats = cls(cls.user_path(cache_dir, user_id), **kwargs)
+        stats.load()
+        return stats
+
+    @staticmethod
+    def user_path(cache_dir: str, user_id: str) -> Path:
+        """用户访问统计文件的路径"""
+        return Path(cache_dir) / f"{safe_path_name(user_id)}_access.json"
+
+    def __len__(self) -> int:
+        return len(self.node_scores)
+
+    def record_activation(self, activations: Iterable[Tuple[str, float]]):
+        """记录一轮扩散激活的结果 (节点ID, 激活能量)"""
+        with self._lock:
+            self._scale /= self.decay
+            scale = self._scale
+            scores = self.node_scores
+            for node_id, energy in activations:
+                scores[node_id] = scores.get(node_id, 0.0) + energy * scale
+            if scale > self.RESCALE_LIMIT:
+                self._rescale()
+            if len(scores) > 2 * self.max_nodes:
+                self.node_scores = dict(
+                    heapq.nlargest(self.max_nodes, scores.items(), key=lambda item: item[1]))
+
+    def _rescale(self):
+        """把得分换算回当前轮的尺度"""
+        scale = self._scale
+        self.node_scores = {node_id: score / scale for node_id, score in self.node_scores.items()}
+        self._scale = 1.0
+
+    def record_chunks(self, chunk_ids: Iterable[str]):
+        """记录被使用的情景记忆块（最近使用的排在最后）"""
+        with self._lock:
+            for chunk_id in chunk_ids:
+                if not chunk_id:
+                    continue
+                self.recent_chunks.pop(chunk_id, None)
+                self.recent_chunks[chunk_id] = None
+            while len(self.recent_chunks) > self.max_recent_chunks:
+                self.recent_chunks.popitem(last=False)
+
+    def set_central_nodes(self, node_ids: List[str]):
+        """更新度中心性最高的节点列表"""
+        with self._lock:
+            self.central_nodes = list(node_ids)
+
+    def top_nodes(self, k: int) -> List[str]:
+        """累计激活得分最高的 k 个节点"""
+        with self._lock:
+            return [node_id for node_id, _ in
+                    heapq.nlargest(k, self.node_scores.items(), key=lambda item: item[1])]
+
+    def recent_chunk_ids(self, k: int) -> List[str]:
+        """最近使用的 k 个情景记忆块（最近的在前）"""
+        with self._lock:
+            return list(reversed(self.recent_chunks))[:k]
+
+    def load(self):
+        """从持久化文件恢复统计，文件不存在或损坏时保持为空"""
+        if self.path is None or not self.path.exists():
+            return
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as e:
+            print(f"⚠️ 访问统计加载失败 ({self.path}): {e}")
+            return
+        with self._lock:
+            self.node_scores = {str(k): float(v) for k, v in data.get("node_scores", {}).items()}
+            self.recent_chunks = OrderedDict.fromkeys(data.get("recent_chunks", []))
+            self.central_nodes = list(data.get("central_nodes", []))
+            self._scale = 1.0
+
+    def purge(self):
+        """清空统计并删除持久化文件"""
+        with self._lock:
+            self.node_scores = {}
+            self.recent_chunks = OrderedDict()
+            self.central_nodes = []
+            self._scale = 1.0
+        if self.path is not None:
+            self.path.unlink(missing_ok=True)
+
+    def save(self):
+        """写入持久化文件（先写临时文件再替换，避免写一半的文件）"""
+        if self.path is None:
+            return
+        with self._lock:
+            self._rescale()
+            data = {
+                "node_scores": self.node_scores,
+                "recent_chunks": list(self.recent_chunks),
+                "central_nodes": self.central_nodes
+            }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".json.tmp")
+        tmp_path.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,342 @@
+# -*- coding: utf-8 -*-
+"""
+激活缓存 - 激活引擎的认知就绪状态存储
+支持 LRU / LFU / ARC 淘汰策略、按条目的过期时间(TTL)、条目数与内存字节双重预算，
+读写均为同步快速路径，并记录命中/未命中/淘汰/过期计数
+"""
+import abc
+import heapq
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from pydantic import BaseModel
+
+
+def estimate_size(value: Any) -> int:
+    """递归估算对象占用的字节数（容器与 pydantic 模型逐层累加）"""
+    size = sys.getsizeof(value)
+    if isinstance(value, BaseModel):
+        return size + sum(estimate_size(v) for v in value.__dict__.values())
+    if isinstance(value, dict):
+        return size + sum(estimate_size(k) + estimate_size(v) for k, v in value.items())
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return size + sum(estimate_size(item) for item in value)
+    return size
+
+
+class CachePolicy(abc.ABC):
+    """
+    淘汰策略接口，只维护键的顺序/频率，值由 ActivationCache 保存
+
+    写入新键的顺序为 admit → (victim)* → insert：
+    admit 在腾出空间之前调用，ARC 借此根据幽灵列表调整自适应参数
+    """
+
+    name = "base"
+
+    def admit(self, key: str):
+        """新键即将写入（尚未腾出空间）"""
+
+    @abc.abstractmethod
+    def insert(self, key: str):
+        """新键已写入"""
+
+    @abc.abstractmethod
+    def touch(self, key: str):
+        """键被命中或覆盖写入"""
+
+    @abc.abstractmethod
+    def remove(self, key: str):
+        """键被显式删除或过期（不视为淘汰）"""
+
+    @abc.abstractmethod
+    def victim(self) -> str:
+        """选出并移除一个淘汰键"""
+
+
+class LRUPolicy(CachePolicy):
+    """最近最少使用"""
+
+    name = "lru"
+
+    def __init__(self, capacity: int):
+        self.order: "OrderedDict[str, None]" = OrderedDict()
+
+    def insert(self, key: str):
+        self.order[key] = None
+
+    def touch(self, key: str):
+        self.order.move_to_end(key)
+
+    def remove(self, key: str):
+        self.order.pop(key, None)
+
+    def victim(self) -> str:
+        return self.order.popitem(last=False)[0]
+
+
+class LFUPolicy(CachePolicy):
+    """最不经常使用，同频率按最近最少使用淘汰（O(1) 频率桶）"""
+
+    name = "lfu"
+
+    def __init__(self, capacity: int):
+        self.freq: Dict[str, int] = {}
+        self.buckets: Dict[int, "OrderedDict[str, None]"] = {}
+        self.min_freq = 0
+
+    def _unlink(self, key: str) -> int:
+        count = self.freq.pop(key)
+        bucket = self.buckets[count]
+        del bucket[key]
+        if not bucket:
+            del self.buckets[count]
+        return count
+
+    def insert(self, key: str):
+        self.freq[key] = 1
+        self.buckets.setdefault(1, OrderedDict())[key] = None
+        self.min_freq = 1
+
+    def touch(self, key: str):
+        old = self._unlink(key)
+        count = old + 1
+        self.freq[key] = count
+        self.buckets.setdefault(count, OrderedDict())[key] = None
+        if old == self.min_freq and old not in self.buckets:
+            self.min_freq = count
+
+    def remove(self, key: str):
+        if key in self.freq:
+            self._unlink(key)
+
+    def victim(self) -> str:
+        if self.min_freq not in self.buckets:
+            self.min_freq = min(self.buckets)
+        key = next(iter(self.buckets[self.min_freq]))
+        self._unlink(key)
+        return key
+
+
+class ARCPolicy(CachePolicy):
+    """
+    自适应替换缓存 (Megiddo & Modha, 2003)
+
+    T1 保存只访问过一次的键，T2 保存访问过多次的键，B1/B2 是它们最近淘汰键的幽灵列表。
+    幽灵命中时调整 T1 的目标大小 p，使缓存在"近期性"与"频率"之间自适应。
+    """
+
+    name = "arc"
+
+    def __init__(self, capacity: int):
+        self.capacity = max(capacity, 1)
+        self.p = 0
+        self.t1: "OrderedDict[str, None]" = OrderedDict()
+        self.t2: "OrderedDict[str, None]" = OrderedDict()
+        self.b1: "OrderedDict[str, None]" = OrderedDict()
+        self.b2: "OrderedDict[str, None]" = OrderedDict()
+        self._ghost: Optional[str] = None  # 正在写入的键来自哪个幽灵列表
+
+    def admit(self, key: str):
+        if key in self.b1:
+            self.p = min(self.capacity, self.p + max(len(self.b2) // len(self.b1), 1))
+            del self.b1[key]
+            self._ghost = "b1"
+        elif key in self.b2:
+            self.p = max(0, self.p - max(len(self.b1) // len(self.b2), 1))
+            del self.b2[key]
+            self._ghost = "b2"
+        else:
+            self._ghost = None
+
+    def insert(self, key: str):
+        if self._ghost:
+            self.t2[key] = None
+        else:
+            self.t1[key] = None
+        self._ghost = None
+        # 幽灵列表只记录键，限制在 |T1|+|B1| <= c、总量 <= 2c
+        while len(self.t1) + len(self.b1) > self.capacity and self.b1:
+            self.b1.popitem(last=False)
+        while self.b2 and (len(self.t1) + len(self.t2) + len(self.b1) + len(self.b2)
+                           > 2 * self.capacity):
+            self.b2.popitem(last=False)
+
+    def touch(self, key: str):
+        if key in self.t1:
+            del self.t1[key]
+        else:
+            del self.t2[key]
+        self.t2[key] = None
+
+    def remove(self, key: str):
+        self.t1.pop(key, None)
+        self.t2.pop(key, None)
+
+    def victim(self) -> str:
+        if self.t1 and (len(self.t1) > self.p or not self.t2
+                        or (self._ghost == "b2" and len(self.t1) == self.p)):
+            key = self.t1.popitem(last=False)[0]
+            self.b1[key] = None
+        else:
+            key = self.t2.popitem(last=False)[0]
+            self.b2[key] = None
+        return key
+
+
+CACHE_POLICIES = {policy.name: policy for policy in (LRUPolicy, LFUPolicy, ARCPolicy)}
+
+
+class _CacheEntry:
+    __slots__ = ("value", "expires_at", "nbytes")
+
+    def __init__(self, value: Any, expires_at: Optional[float], nbytes: int):
+        self.value = value
+        self.expires_at = expires_at
+        self.nbytes = nbytes
+
+
+class ActivationCache:
+    """
+    高速激活缓存，模拟认知就绪状态
+
+    Args:
+        max_size: 最大条目数，0 表示禁用缓存
+        policy: 淘汰策略 lru / lfu / arc
+        ttl: 默认过期时间(秒)，None 或 0 表示不过期；set() 可按条目覆盖
+        max_bytes: 估算内存预算(字节)，0 表示只按条目数限制
+        sizeof: 估算值大小的函数，默认 estimate_size
+    """
+
+    def __init__(self, max_size: int = 100, policy: str = "lru", ttl: Optional[float] = None,
+                 max_bytes: int = 0, sizeof: Callable[[Any], int] = estimate_size):
+        if policy not in CACHE_POLICIES:
+            raise ValueError(f"不支持的缓存策略: {policy}")
+        self.max_size = max_size
+        self.max_bytes = max_bytes
+        self.ttl = ttl or None
+        self.sizeof = sizeof
+        self.policy = CACHE_POLICIES[policy](max_size)
+        self._entries: Dict[str, _CacheEntry] = {}
+        self._expiry: List[Tuple[float, str]] = []  # (过期时刻, 键) 小顶堆，惰性清理
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0}
+        print(f"⚡ 激活缓存初始化 (容量: {max_size}, 策略: {policy})")
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        """是否存在未过期的键（不计入命中统计，也不影响淘汰顺序）"""
+        entry = self._entries.get(key)
+        return entry is not None and not self._expired(entry, time.monotonic())
+
+    @staticmethod
+    def _expired(entry: _CacheEntry, now: float) -> bool:
+        return entry.expires_at is not None and entry.expires_at <= now
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """获取缓存项，未命中或已过期时返回 default"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats["misses"] += 1
+                return default
+            if entry.expires_at is not None and self._expired(entry, time.monotonic()):
+                self._drop(key)
+                self.policy.remove(key)
+                self.stats["expirations"] += 1
+                self.stats["misses"] += 1
+                return default
+            self.stats["hits"] += 1
+            self.policy.touch(key)
+            return entry.value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        """设置缓存项；超出条目数或字节预算时按策略淘汰"""
+        if self.max_size <= 0:
+            return
+        nbytes = self.sizeof(value) if self.max_bytes else 0
+        if self.max_bytes and nbytes > self.max_bytes:
+            return  # 单项超出整个预算，不缓存
+        ttl = ttl if ttl is not None else self.ttl
+
+        with self._lock:
+            now = time.monotonic()
+            self._purge_expired(now)
+            expires_at = now + ttl if ttl else None
+
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._bytes += nbytes - entry.nbytes
+                entry.value, entry.expires_at, entry.nbytes = value, expires_at, nbytes
+                self.policy.touch(key)
+            else:
+                self.policy.admit(key)
+                self._evict_until(len(self._entries) + 1 <= self.max_size, nbytes)
+                self._entries[key] = _CacheEntry(value, expires_at, nbytes)
+                self._bytes += nbytes
+                self.policy.insert(key)
+            if expires_at is not None:
+                heapq.heappush(self._expiry, (expires_at, key))
+            # 覆盖写入可能使字节数超出预算
+            self._evict_until(True, 0)
+
+    def _evict_until(self, fits_count: bool, incoming_bytes: int):
+        """淘汰直到条目数与字节预算都能容纳 incoming_bytes"""
+        while self._entries and (
+            not fits_count
+            or (self.max_bytes and self._bytes + incoming_bytes > self.max_bytes)
+        ):
+            self._drop(self.policy.victim())
+            self.stats["evictions"] += 1
+            fits_count = len(self._entries) + 1 <= self.max_size
+
+    def _purge_expired(self, now: float):
+        """清理已过期的条目"""
+        while self._expiry and self._expiry[0][0] <= now:
+            expires_at, key = heapq.heappop(self._expiry)
+            entry = self._entries.get(key)
+            # 堆中可能残留已被覆盖或删除的旧记录
+            if entry is not None and entry.expires_at == expires_at:
+                self._drop(key)
+                self.policy.remove(key)
+                self.stats["expirations"] += 1
+
+    def _drop(self, key: str):
+        entry = self._entries.pop(key)
+        self._bytes -= entry.nbytes
+
+    def delete(self, key: str) -> bool:
+        """删除缓存项"""
+        with self._lock:
+            if key not in self._entries:
+                return False
+            self._drop(key)
+            self.policy.remove(key)
+            return True
+
+    def clear(self):
+        """清空缓存（保留统计）"""
+        with self._lock:
+            self._entries.clear()
+            self._expiry.clear()
+            self._bytes = 0
+            self.policy = type(self.policy)(self.max_size)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取缓存统计"""
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "hit_rate": self.stats["hits"] / lookups if lookups else 0.0,
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "policy": self.policy.name
+        }
@@ -4,41 +4,31 @@
 基于ACT-R理论的联想记忆激活机制
 """
 import asyncio
+import heapq
 import math
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Any, Tuple, Optional, Set
 from .data_models import Node, TaskType
-from .memory_systems import MultipleMemorySystems
+from .memory_systems import MultipleMemorySystems, NUMPY_AVAILABLE
 from .config import get_config
+from .activation_cache import ActivationCache
+from .access_stats import AccessStats
 
+if NUMPY_AVAILABLE:
+    import numpy as np
 
-class ActivationCache:
-    """高速激活缓存，模拟认知就绪状态"""
-    
-    def __init__(self, max_size: int = 100):
-        self.cache: Dict[str, Any] = {}
-        self.max_size = max_size
-        print(f"⚡ 激活缓存初始化 (容量: {max_size})")
-    
-    async def get(self, key: str) -> Optional[Any]:
-        """异步获取缓存项"""
-        return self.cache.get(key)
-    
-    async def set(self, key: str, value: Any):
-        """异步设置缓存项"""
-        if len(self.cache) >= self.max_size:
-            await self.evict()
-        self.cache[key] = value
-    
-    async def evict(self):
-        """缓存淘汰策略"""
-        # 简单实现：删除前20%的项目
-        evict_count = int(self.max_size * 0.2)
-        keys_to_remove = list(self.cache.keys())[:evict_count]
-        
-        for key in keys_to_remove:
-            del self.cache[key]
-        
-        print(f"  [缓存清理] 淘汰了 {evict_count} 个缓存项")
+# 邻居列表: [(邻居节点, 边权重)]
+Neighbors = List[Tuple[Node, float]]
+
+
+def _run_sync(coro):
+    """在同步代码中运行协程；若当前线程已有事件循环，则在独立线程中运行"""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coro).result()
 
 
 class ActivationEngine:
@@ -46,8 +36,13 @@ class ActivationEngine:
     
     def __init__(self, memory: MultipleMemorySystems):
         self.memory = memory
-        self.cache = ActivationCache()
         self.config = get_config().activation
+        self.cache = ActivationCache(
+            max_size=self.config.cache_size,
+            policy=self.config.cache_policy,
+            ttl=self.config.cache_ttl,
+            max_bytes=self.config.cache_max_bytes
+        )
         
         # 激活参数
         self.decay_factor = self.config.decay_factor
@@ -58,72 +53,222 @@ class ActivationEngine:
         # 激活状态跟踪
         self.active_nodes: Dict[str, float] = {}
         
-        # 预取统计
+        # 预取统计：useful_prefetches 为预取条目在激活路径上被实际读取的次数（每条计一次），
+        # cache_hits / cache_misses 为激活路径上节点与邻居列表读取的缓存命中情况
         self.prefetch_stats = {
             "total_prefetches": 0,
-            "useful_prefetches": 0
+            "useful_prefetches": 0,
+            "cache_hits": 0,
+            "cache_misses": 0,
+            "answer_hits": 0
         }
         self._last_prefetch_ids: Set[str] = set()
+        self._prefetched_keys: Set[str] = set()
         self._last_turn_stats = {"total": 0, "useful": 0}
         
+        # 用户访问统计：认知启动据此决定预取哪些节点与情景记忆
+        self.access_stats = AccessStats.for_user(
+            get_config().database.cache_dir, memory.user_id, decay=self.config.access_decay
+        )
+        
         print(f"⚡ 激活引擎初始化完成 (阈值: {self.activation_threshold}, 衰减: {self.decay_factor})")
     
     async def cognitive_priming(self, user_id: str, context_hints: List[str] = None):
         """
         认知启动 - 预加载相关记忆到认知就绪状态
-        模拟记忆系统的预激活过程
+        模拟记忆系统的预激活过程，预取内容来自该用户持久化的访问统计
         """
         print(f"🧠 开始认知启动 (用户: {user_id})")
         
-        # 预取高频节点
-        high_priority_nodes = ["Python", "Bug", "PowerShell", "API", "学习", "朋友"]
+        # 预取该用户最常激活的节点，以及上次统计的图中度中心性最高的节点
+        top_k = self.config.priming_top_k
+        high_priority_nodes = list(dict.fromkeys(
+            self.access_stats.top_nodes(top_k) + self.access_stats.central_nodes[:top_k]
+        ))
+        prefetch_count = await asyncio.to_thread(self._prime_nodes, high_priority_nodes)
+        
+        # 最近使用的情景记忆块提升到热层（未启用分层时不执行）
+        recent_chunks = self.access_stats.recent_chunk_ids(self.config.priming_recent_chunks)
+        promoted = self.memory.promote_episodic(recent_chunks) if recent_chunks else 0
+        
+        # 更新统计
+        self._last_turn_stats["total"] += prefetch_count
+        self.prefetch_stats["total_prefetches"] += prefetch_count
         
+        # 启动后台语义扩展
+        asyncio.create_task(self._background_semantic_expansion(user_id))
+        
+        print(f"✅ 认知启动完成 (预取: {prefetch_count} 个节点, 情景记忆: {promoted} 条)")
+    
+    def _prime_nodes(self, node_ids: List[str]) -> int:
+        """预取节点（语义与程序记忆各查一次），返回预取到的条目数"""
         prefetch_count = 0
-        for node_id in high_priority_nodes:
+        for node_id in node_ids:
             # 尝试从语义记忆获取节点
-            node = self.memory.get_semantic_node(node_id)
+            node = self._prefetch_node("node:", self.memory.semantic, node_id)
             if node:
-                await self.cache.set(f"node:{node_id}", node)
                 self._last_prefetch_ids.add(node_id)
                 prefetch_count += 1
                 print(f"  → 预取节点: {node_id}")
             
             # 也从程序记忆尝试获取
-            proc_node = self.memory.get_procedural_node(node_id)
+            proc_node = self._prefetch_node("proc_node:", self.memory.procedural, node_id)
             if proc_node:
-                await self.cache.set(f"proc_node:{node_id}", proc_node)
                 prefetch_count += 1
-        
-        # 更新统计
-        self._last_turn_stats["total"] = prefetch_count
-        self.prefetch_stats["total_prefetches"] += prefetch_count
-        
-        # 启动后台语义扩展
-        asyncio.create_task(self._background_semantic_expansion(user_id))
-        
-        print(f"✅ 认知启动完成 (预取: {prefetch_count} 个节点)")
+        return prefetch_count
     
     async def _background_semantic_expansion(self, user_id: str):
         """后台语义扩展任务"""
-        await asyncio.sleep(0.1)  # 模拟异步处理延迟
+        await asyncio.sleep(0.1)  # 让出事件循环，先完成启动
         
         print("  [后台] 语义扩展任务执行中...")
         
-        # 模拟从记忆系统中发现更多相关节点
-        expansion_nodes = ["Docker", "JavaScript", "Framework", "Exception"]
+        try:
+            expansion_count = await asyncio.to_thread(self._semantic_expansion)
+        except Exception as e:
+            print(f"  ⚠️ [后台] 语义扩展失败: {e}")
+            return
+        self._last_turn_stats["total"] += expansion_count
+        self.prefetch_stats["total_prefetches"] += expansion_count
         
-        for node_id in expansion_nodes:
-            node = self.memory.get_semantic_node(node_id)
-            if node:
-                await self.cache.set(f"expanded:{node_id}", node)
+        print(f"  [后台] 语义扩展完成 (预取: {expansion_count} 项)")
+    
+    def _semantic_expansion(self) -> int:
+        """
+        从当前图刷新度中心性排名，并沿高频节点向外扩展一跳：
+        预取高频节点权重最高的邻居与高中心性节点；远程图时一并缓存高频节点的邻居列表
+        """
+        top_k = self.config.priming_top_k
+        central = list(dict.fromkeys(
+            self.memory.semantic.top_degree_nodes(top_k)
+            + self.memory.procedural.top_degree_nodes(top_k)
+        ))
+        self.access_stats.set_central_nodes(central)
+        
+        seeds = self.access_stats.top_nodes(top_k)
+        versions = self.memory.graph_versions
+        semantic, procedural = self._fetch_neighbors_many(seeds) if seeds else ({}, {})
+        expansion_count = 0
+        
+        # 邻居节点ID -> (权重, 键前缀, 图版本, 节点)，同一邻居取最大权重
+        strongest: Dict[str, Tuple[float, str, int, Node]] = {}
+        for node_id in seeds:
+            if self.memory.has_remote_graph:
+                self._store_neighbors(node_id, versions, semantic[node_id], procedural[node_id])
+                self._prefetched_keys.add(f"neighbors:{node_id}")
+                expansion_count += 1
+            for prefix, version, neighbors in (("expanded:", versions[0], semantic[node_id]),
+                                               ("proc_node:", versions[1], procedural[node_id])):
+                for neighbor, weight in neighbors:
+                    if neighbor.id not in strongest or weight > strongest[neighbor.id][0]:
+                        strongest[neighbor.id] = (weight, prefix, version, neighbor)
+        
+        primed = set(seeds)
+        strongest_first = heapq.nlargest(top_k, strongest.values(), key=lambda item: item[0])
+        for _, prefix, version, neighbor in strongest_first:
+            if neighbor.id not in primed:
+                primed.add(neighbor.id)
+                self._cache_prefetched(prefix + neighbor.id, version, neighbor)
+                expansion_count += 1
+        
+        for node_id in central:
+            if node_id in primed:
+                continue
+            if (self._prefetch_node("expanded:", self.memory.semantic, node_id) or
+                    self._prefetch_node("proc_node:", self.memory.procedural, node_id)):
+                expansion_count += 1
+        return expansion_count
+    
+    # 读穿透缓存的键前缀：语义节点（按需读取 / 认知启动 / 后台扩展）与程序节点
+    SEMANTIC_NODE_PREFIXES = ("node:", "expanded:")
+    PROCEDURAL_NODE_PREFIXES = ("proc_node:",)
+    
+    def _prefetch_node(self, prefix: str, graph, node_id: str) -> Optional[Node]:
+        """预取一个节点写入缓存，条目记录读取前的图版本用于失效判断"""
+        version = graph.version
+        node = graph.get_node(node_id)
+        if node:
+            self._cache_prefetched(prefix + node_id, version, node)
+        return node
+    
+    def _cache_prefetched(self, key: str, version: int, node: Node):
+        """写入一个预取条目，首次被激活路径读取时计为有用预取"""
+        self.cache.set(key, (version, node))
+        self._prefetched_keys.add(key)
+    
+    def _note_cache_hit(self, key: str):
+        """记录一次缓存命中；预取条目首次被读取时计为有用预取"""
+        self.prefetch_stats["cache_hits"] += 1
+        if key in self._prefetched_keys:
+            self._prefetched_keys.discard(key)
+            self.prefetch_stats["useful_prefetches"] += 1
+            self._last_turn_stats["useful"] += 1
+    
+    def _get_graph_node(self, graph, prefixes: Tuple[str, ...], node_id: str) -> Optional[Node]:
+        """
+        读穿透获取单个图中的节点（远程图时不存在的结果同样缓存）
         
-        print("  [后台] 语义扩展完成")
+        条目为 (读取时的图版本, 节点)，节点本身或其关系在此之后被写入则视为过期。
+        内存图的字典查找比缓存更快，只读取尚未用过的预取条目，未命中也不回填。
+        """
+        remote = graph.driver is not None
+        for prefix in prefixes:
+            key = prefix + node_id
+            if not remote and key not in self._prefetched_keys:
+                continue
+            entry = self.cache.get(key)
+            if entry is None:
+                continue
+            version, node = entry
+            if graph.changed_since((node_id,), version):
+                self.cache.delete(key)
+                continue
+            self._note_cache_hit(key)
+            return node
+        
+        self.prefetch_stats["cache_misses"] += 1
+        if not remote:
+            return graph.get_node(node_id)
+        version = graph.version
+        node = graph.get_node(node_id)
+        self.cache.set(prefixes[0] + node_id, (version, node))
+        return node
+    
+    def _get_node(self, node_id: str) -> Optional[Node]:
+        """读穿透获取节点：语义记忆优先，其次程序记忆"""
+        memory = self.memory
+        return (self._get_graph_node(memory.semantic, self.SEMANTIC_NODE_PREFIXES, node_id) or
+                self._get_graph_node(memory.procedural, self.PROCEDURAL_NODE_PREFIXES, node_id))
+    
+    def _cached_neighbors(self, node_id: str) -> Optional[Neighbors]:
+        """读取缓存的邻居列表；节点、其关系或任一邻居节点被写入后失效"""
+        key = f"neighbors:{node_id}"
+        entry = self.cache.get(key)
+        if entry is None:
+            return None
+        (semantic_version, procedural_version), neighbors = entry
+        node_ids = [node_id] + [neighbor.id for neighbor, _ in neighbors]
+        if (self.memory.semantic.changed_since(node_ids, semantic_version) or
+                self.memory.procedural.changed_since(node_ids, procedural_version)):
+            self.cache.delete(key)
+            return None
+        self._note_cache_hit(key)
+        return neighbors
+    
+    def _store_neighbors(self, node_id: str, versions: Tuple[int, int],
+                         semantic: Neighbors, procedural: Neighbors):
+        """缓存邻居列表（语义在前、程序在后），并顺带缓存邻居节点本身，之后收集激活节点时无需逐个往返查询"""
+        self.cache.set(f"neighbors:{node_id}", (versions, semantic + procedural))
+        for neighbor, _ in semantic:
+            self.cache.set(f"node:{neighbor.id}", (versions[0], neighbor))
+        for neighbor, _ in procedural:
+            self.cache.set(f"proc_node:{neighbor.id}", (versions[1], neighbor))
     
     def spreading_activation(self, cues: List[Tuple[str, float]], 
                            task_type: TaskType, 
                            max_depth: Optional[int] = None) -> List[Node]:
         """
-        扩散激活 - 核心联想记忆算法
+        扩散激活 - 核心联想记忆算法（同步接口）
         基于ACT-R理论实现激活能量在记忆网络中的传播
         
         Args:
@@ -135,6 +280,106 @@ class ActivationEngine:
             激活的节点列表
         """
         max_depth = max_depth or self.max_depth
+        memo_key = self._memo_key(cues, task_type, max_depth)
+        activated_nodes = self._recall_activation(memo_key)
+        if activated_nodes is not None:
+            self._record_access(activated_nodes)
+            return activated_nodes
+        
+        if self.config.engine_mode == "vectorized" and NUMPY_AVAILABLE:
+            activated_nodes = self._spreading_activation_vectorized(cues, task_type, max_depth)
+        elif self.config.engine_mode == "best_first":
+            activated_nodes = self._spreading_activation_best_first(cues, task_type, max_depth)
+        else:
+            activated_nodes = _run_sync(self._spreading_activation_bfs(cues, task_type, max_depth))
+        self._memoize_activation(memo_key, activated_nodes)
+        self._record_access(activated_nodes)
+        return activated_nodes
+    
+    async def spreading_activation_async(self, cues: List[Tuple[str, float]],
+                                         task_type: TaskType,
+                                         max_depth: Optional[int] = None) -> List[Node]:
+        """异步扩散激活（BFS模式；best_first 模式在线程中执行），结果同样按线索与图版本记忆化"""
+        max_depth = max_depth or self.max_depth
+        memo_key = self._memo_key(cues, task_type, max_depth)
+        activated_nodes = self._recall_activation(memo_key)
+        if activated_nodes is None:
+            if self.config.engine_mode == "best_first":
+                activated_nodes = await asyncio.to_thread(
+                    self._spreading_activation_best_first, cues, task_type, max_depth
+                )
+            else:
+                activated_nodes = await self._spreading_activation_bfs(cues, task_type, max_depth)
+            self._memoize_activation(memo_key, activated_nodes)
+        self._record_access(activated_nodes)
+        return activated_nodes
+    
+    def _memo_key(self, cues: List[Tuple[str, float]], task_type: TaskType, max_depth: int) -> str:
+        """
+        激活结果的缓存键：规范化线索 + 任务类型 + 深度 + 两个图的版本号 + 传播参数
+        
+        重复线索与BFS一致地规范化（按首次出现的顺序去重，能量取最后一次的值）；
+        图的任何节点/关系写入都会改变版本号，旧结果因此自然失效。
+        """
+        energies: Dict[str, float] = {}
+        for node_id, initial_energy in cues:
+            energies[node_id] = initial_energy
+        budget = ()
+        if self.config.engine_mode == "best_first":
+            budget = (self.config.best_first_max_nodes, self.config.best_first_max_edges,
+                      self.config.best_first_top_k, self.config.best_first_patience)
+        return repr((
+            "activation", tuple(energies.items()), task_type.value, max_depth,
+            self.memory.graph_versions, self.config.engine_mode,
+            self.decay_factor, self.activation_threshold, budget
+        ))
+    
+    def _recall_activation(self, memo_key: str) -> Optional[List[Node]]:
+        """命中时恢复激活状态与节点上的激活能量，返回与重新计算相同的结果"""
+        cached = self.cache.get(memo_key)
+        if cached is None:
+            return None
+        activated, active_nodes = cached
+        self.active_nodes = dict(active_nodes)
+        for node, activation_energy in activated:
+            node.properties["activation"] = activation_energy
+        print(f"⚡ 扩散激活命中缓存 (激活节点: {len(activated)})")
+        return [node for node, _ in activated]
+    
+    def _record_access(self, activated_nodes: List[Node]):
+        """本轮激活结果计入用户访问统计"""
+        self.access_stats.record_activation(
+            (node.id, node.properties.get("activation", 0.0)) for node in activated_nodes
+        )
+    
+    def record_episodic_access(self, chunk_ids: List[str]):
+        """记录本轮检索到的情景记忆块，下次认知启动时提升到热层"""
+        self.access_stats.record_chunks(chunk_ids)
+    
+    def save_access_stats(self):
+        """持久化用户访问统计"""
+        self.access_stats.save()
+    
+    def purge_access_stats(self):
+        """清空用户访问统计并删除其持久化文件"""
+        self.access_stats.purge()
+    
+    def _memoize_activation(self, memo_key: str, activated_nodes: List[Node]):
+        """缓存排序后的激活结果及其能量快照"""
+        activated = [(node, node.properties.get("activation", 0)) for node in activated_nodes]
+        self.cache.set(memo_key, (activated, dict(self.active_nodes)))
+    
+    async def _spreading_activation_bfs(self, cues: List[Tuple[str, float]],
+                                        task_type: TaskType,
+                                        max_depth: int) -> List[Node]:
+        """
+        异步扩散激活 - 按层扩展BFS前沿
+        
+        FIFO的BFS本身就是逐层处理的，因此按层循环与逐节点出队的结果完全一致。
+        每层开始时并发预取前沿节点的邻居（仅远程图后端），
+        本层触发的跨模态检索作为一个任务派发，与后续层的扩展并发执行，
+        所有并发操作共用一个信号量限流。
+        """
         print(f"🔥 开始扩散激活 (线索: {len(cues)}, 类型: {task_type.value}, 深度: {max_depth})")
         
         # 重置激活状态
@@ -143,63 +388,372 @@ class ActivationEngine:
         # 获取任务相关的注意力权重
         attention_weights = self._get_attention_weights(task_type)
         
-        # 初始化激活队列
-        activation_queue = []
+        # 初始化第0层前沿
+        frontier: List[str] = []
         for node_id, initial_energy in cues:
             self.active_nodes[node_id] = initial_energy
-            activation_queue.append((node_id, 0))  # (节点ID, 深度)
+            frontier.append(node_id)
         
         visited = set()
+        semaphore = asyncio.Semaphore(max(self.config.max_concurrent_lookups, 1))
+        cross_modal_tasks = []
         
-        # BFS扩散激活
-        while activation_queue:
-            current_id, depth = activation_queue.pop(0)
-            
-            if depth >= max_depth or current_id in visited:
-                continue
+        # 逐层BFS扩散激活
+        for depth in range(max_depth):
+            if not frontier:
+                break
             
-            visited.add(current_id)
-            current_activation = self.active_nodes.get(current_id, 0)
+            # 并发预取本层已达阈值节点的邻居
+            prefetched = await self._prefetch_neighbors(frontier, visited, semaphore)
             
-            # 检查激活阈值
-            if current_activation < self.activation_threshold:
-                continue
+            next_frontier: List[str] = []
+            cross_modal_ids: List[str] = []
+            for current_id in frontier:
+                if current_id in visited:
+                    continue
+                
+                visited.add(current_id)
+                current_activation = self.active_nodes.get(current_id, 0)
+                
+                # 检查激活阈值
+                if current_activation < self.activation_threshold:
+                    continue
+                
+                print(f"  → 处理节点: {current_id} (激活: {current_activation:.3f}, 深度: {depth})")
+                
+                # 获取邻居节点（同层中途才越过阈值的节点没有预取）
+                neighbors = prefetched.get(current_id)
+                if neighbors is None:
+                    neighbors = self._get_all_neighbors(current_id)
+                
+                # 传播激活能量
+                for neighbor_node, edge_weight in neighbors:
+                    # 计算注意力权重
+                    attention_weight = attention_weights.get(neighbor_node.label, 1.0)
+                    
+                    # ACT-R激活传播公式：A_i = B_i + Σ(W_j * S_ji)
+                    # 这里简化为：received_energy =
+                    #     sender_activation * decay * edge_weight * attention_weight
+                    received_energy = (current_activation * 
+                                     self.decay_factor * 
+                                     edge_weight * 
+                                     attention_weight)
+                    
+                    # 更新邻居节点激活值
+                    neighbor_id = neighbor_node.id
+                    self.active_nodes[neighbor_id] = (
+                        self.active_nodes.get(neighbor_id, 0) + received_energy
+                    )
+                    
+                    # 加入下一层前沿
+                    if neighbor_id not in visited:
+                        next_frontier.append(neighbor_id)
+                
+                # 跨模态激活门控
+                if current_activation > 0.8:  # 高激活阈值触发跨模态
+                    cross_modal_ids.append(current_id)
             
-            print(f"  → 处理节点: {current_id} (激活: {current_activation:.3f}, 深度: {depth})")
+            # 本层的跨模态检索合并为一次批量查询，与下一层扩展并发执行
+            if cross_modal_ids:
+                cross_modal_tasks.append(asyncio.create_task(
+                    self._cross_modal_activation_async(cross_modal_ids, semaphore)
+                ))
             
-            # 获取邻居节点
-            neighbors = self._get_all_neighbors(current_id)
+            frontier = next_frontier
+        
+        if cross_modal_tasks:
+            await asyncio.gather(*cross_modal_tasks)
+        
+        # 收集并返回激活节点
+        activated_nodes = self._collect_activated_nodes()
+        
+        print(f"✅ 扩散激活完成 (激活节点: {len(activated_nodes)})")
+        return activated_nodes
+    
+    async def _prefetch_neighbors(self, frontier: List[str], visited: Set[str],
+                                  semaphore: asyncio.Semaphore) -> Dict[str, Neighbors]:
+        """
+        批量获取前沿中已达阈值节点的邻居（仅远程图后端，内存图直接按需读取）
+        每个图只发一次 UNWIND 查询，而不是每个节点两次往返
+        """
+        if not self.memory.has_remote_graph:
+            return {}
+        
+        candidates = list(dict.fromkeys(
+            node_id for node_id in frontier
+            if node_id not in visited
+            and self.active_nodes.get(node_id, 0) >= self.activation_threshold
+        ))
+        if not candidates:
+            return {}
+        
+        # 已缓存的邻居列表直接使用，其余合并为每个图一次批量查询
+        prefetched, missing = self._split_cached_neighbors(candidates)
+        if not missing:
+            return prefetched
+        
+        async with semaphore:
+            prefetched.update(await asyncio.to_thread(self._fetch_and_store_neighbors, missing))
+        return prefetched
+    
+    def _split_cached_neighbors(self, node_ids: List[str]) -> Tuple[Dict[str, Neighbors],
+                                                                    List[str]]:
+        """分出已缓存邻居列表的节点与仍需查询的节点"""
+        cached: Dict[str, Neighbors] = {}
+        missing = []
+        for node_id in node_ids:
+            neighbors = self._cached_neighbors(node_id)
+            if neighbors is None:
+                missing.append(node_id)
+            else:
+                cached[node_id] = neighbors
+        return cached, missing
+    
+    def _fetch_and_store_neighbors(self, node_ids: List[str]) -> Dict[str, Neighbors]:
+        """每个图一次批量查询节点的邻居，并写入缓存"""
+        self.prefetch_stats["cache_misses"] += len(node_ids)
+        versions = self.memory.graph_versions
+        semantic, procedural = self._fetch_neighbors_many(node_ids)
+        fetched = {}
+        for node_id in node_ids:
+            self._store_neighbors(node_id, versions, semantic[node_id], procedural[node_id])
+            fetched[node_id] = semantic[node_id] + procedural[node_id]
+        return fetched
+    
+    def _fetch_neighbors_many(self, node_ids: List[str]) -> Tuple[Dict[str, Neighbors],
+                                                                   Dict[str, Neighbors]]:
+        """分别批量查询语义与程序记忆的邻居"""
+        return (self.memory.semantic.get_weighted_neighbors_many(node_ids),
+                self.memory.procedural.get_weighted_neighbors_many(node_ids))
+    
+    def _spreading_activation_best_first(self, cues: List[Tuple[str, float]],
+                                         task_type: TaskType,
+                                         max_depth: int) -> List[Node]:
+        """
+        最佳优先扩散激活 - 按激活能量从高到低扩展节点
+        
+        与BFS模式的公式相同，但用最大堆代替FIFO队列：每次扩展当前能量最高、
+        尚未扩展且深度未达上限的节点，每个节点最多扩展一次（能量变化时重新入堆，
+        旧堆项出堆时跳过）。满足任一条件即停止：
+        - 堆顶能量低于阈值（其余节点都无法传播）
+        - 扩展节点数或处理边数达到预算（best_first_max_nodes / best_first_max_edges）
+        - 前k个激活节点的集合连续 best_first_patience 次扩展没有变化
+        
+        预算使稠密图上每轮的邻居读取次数有上界，而高能量节点总是最先扩展。
+        远程图后端上，扩展未读取邻居的节点时连同堆顶 best_first_prefetch 个待扩展节点
+        一起批量读取（见 _prefetch_heap_top），每批每个图一次查询。
+        """
+        print(f"🔥 开始最佳优先扩散激活 (线索: {len(cues)}, 类型: {task_type.value}, 深度: {max_depth})")
+        
+        self.active_nodes.clear()
+        attention_weights = self._get_attention_weights(task_type)
+        max_nodes = self.config.best_first_max_nodes
+        max_edges = self.config.best_first_max_edges
+        top_k = max(self.config.best_first_top_k, 1)
+        patience = self.config.best_first_patience
+        
+        for node_id, initial_energy in cues:
+            self.active_nodes[node_id] = initial_energy
+        
+        # 堆项: (-激活能量, 深度, 节点ID)；depth[节点] 为到达该节点的最小深度
+        depth: Dict[str, int] = {}
+        heap: List[Tuple[float, int, str]] = []
+        for node_id, energy in self.active_nodes.items():
+            depth[node_id] = 0
+            heap.append((-energy, 0, node_id))
+        heapq.heapify(heap)
+        
+        # 前k集合（只含达到阈值的节点），floor 为集合中的最低能量
+        top: Dict[str, float] = {}
+        floor = [float("inf")]
+        
+        def update_top(node_id: str, energy: float) -> bool:
+            """能量更新后维护前k集合，返回集合成员是否变化"""
+            if node_id in top:
+                top[node_id] = energy
+                floor[0] = min(top.values())
+                return False
+            if energy < self.activation_threshold:
+                return False
+            if len(top) < top_k:
+                top[node_id] = energy
+                floor[0] = min(top.values())
+                return True
+            if energy <= floor[0]:
+                return False
+            del top[min(top, key=top.get)]
+            top[node_id] = energy
+            floor[0] = min(top.values())
+            return True
+        
+        for node_id, energy in self.active_nodes.items():
+            update_top(node_id, energy)
+        
+        expanded: Set[str] = set()
+        # 远程图：已批量读取、尚未扩展的节点的邻居
+        remote = self.memory.has_remote_graph
+        fetched: Dict[str, Neighbors] = {}
+        cross_modal_ids: List[str] = []
+        processed_edges = 0
+        stable = 0
+        stop_reason = "前沿耗尽"
+        while heap:
+            neg_energy, node_depth, current_id = heapq.heappop(heap)
+            current_activation = -neg_energy
+            if current_id in expanded or current_activation != self.active_nodes[current_id]:
+                continue  # 已扩展，或能量已变化（以最新的堆项为准）
+            if current_activation < self.activation_threshold:
+                stop_reason = "低于阈值"
+                break
+            if node_depth >= max_depth:
+                continue  # 线索深度为0，仅 max_depth=0 时出现
             
-            # 传播激活能量
+            expanded.add(current_id)
+            if remote:
+                if current_id not in fetched:
+                    fetched.update(self._prefetch_heap_top(
+                        current_id, heap, expanded, fetched, max_depth))
+                neighbors = fetched.pop(current_id)
+            else:
+                neighbors = self._get_all_neighbors(current_id)
+            changed = False
             for neighbor_node, edge_weight in neighbors:
-                # 计算注意力权重
                 attention_weight = attention_weights.get(neighbor_node.label, 1.0)
+                received_energy = (current_activation *
+                                   self.decay_factor *
+                                   edge_weight *
+                                   attention_weight)
                 
-                # ACT-R激活传播公式：A_i = B_i + Σ(W_j * S_ji)
-                # 这里简化为：received_energy = sender_activation * decay * edge_weight * attention_weight
-                received_energy = (current_activation * 
-                                 self.decay_factor * 
-                                 edge_weight * 
-                                 attention_weight)
-                
-                # 更新邻居节点激活值
                 neighbor_id = neighbor_node.id
-                self.active_nodes[neighbor_id] = (
-                    self.active_nodes.get(neighbor_id, 0) + received_energy
-                )
-                
-                # 添加到激活队列
-                if neighbor_id not in visited:
-                    activation_queue.append((neighbor_id, depth + 1))
+                energy = self.active_nodes.get(neighbor_id, 0) + received_energy
+                self.active_nodes[neighbor_id] = energy
+                neighbor_depth = min(depth.get(neighbor_id, node_depth + 1), node_depth + 1)
+                depth[neighbor_id] = neighbor_depth
+                # 达到深度上限的节点只接收能量，不再入堆
+                if neighbor_id not in expanded and neighbor_depth < max_depth:
+                    heapq.heappush(heap, (-energy, neighbor_depth, neighbor_id))
+                changed |= update_top(neighbor_id, energy)
+                processed_edges += 1
             
             # 跨模态激活门控
-            if current_activation > 0.8:  # 高激活阈值触发跨模态
-                await self._cross_modal_activation(current_id)
+            if current_activation > 0.8:
+                cross_modal_ids.append(current_id)
+            
+            if max_nodes and len(expanded) >= max_nodes:
+                stop_reason = "节点预算用尽"
+                break
+            if max_edges and processed_edges >= max_edges:
+                stop_reason = "边预算用尽"
+                break
+            stable = 0 if changed else stable + 1
+            if patience and stable >= patience:
+                stop_reason = f"前{top_k}集合已稳定"
+                break
+        
+        print(f"  → 扩展节点 {len(expanded)}, 处理边 {processed_edges}, 停止原因: {stop_reason}")
+        
+        # 跨模态检索合并为一次批量查询
+        if cross_modal_ids:
+            self._cross_modal_activation(cross_modal_ids)
         
-        # 收集并返回激活节点
         activated_nodes = self._collect_activated_nodes()
+        print(f"✅ 最佳优先扩散激活完成 (激活节点: {len(activated_nodes)})")
+        return activated_nodes
+    
+    def _prefetch_heap_top(self, current_id: str, heap: List[Tuple[float, int, str]],
+                           expanded: Set[str], fetched: Dict[str, Neighbors],
+                           max_depth: int) -> Dict[str, Neighbors]:
+        """
+        读取当前节点及堆顶能量最高的若干待扩展节点的邻居：已缓存的直接使用，
+        其余每个图一次批量查询。堆中的过期项、已扩展或已读取的节点跳过
+        """
+        batch_size = max(self.config.best_first_prefetch, 1)
+        batch = [current_id]
+        for neg_energy, node_depth, node_id in heapq.nsmallest(2 * batch_size, heap):
+            if len(batch) >= batch_size:
+                break
+            if (node_id in expanded or node_id in fetched or node_id in batch
+                    or -neg_energy != self.active_nodes[node_id]
+                    or -neg_energy < self.activation_threshold or node_depth >= max_depth):
+                continue
+            batch.append(node_id)
         
-        print(f"✅ 扩散激活完成 (激活节点: {len(activated_nodes)})")
+        neighbors, missing = self._split_cached_neighbors(batch)
+        if missing:
+            neighbors.update(self._fetch_and_store_neighbors(missing))
+        return neighbors
+    
+    def _spreading_activation_vectorized(self, cues: List[Tuple[str, float]],
+                                         task_type: TaskType,
+                                         max_depth: int) -> List[Node]:
+        """
+        向量化扩散激活 - 在CSR快照上逐层做稀疏矩阵-向量乘
+        
+        与BFS模式的公式相同（衰减、边权、按邻居标签的注意力权重、阈值），
+        但按层同步传播：每个节点以本层开始时的激活值向外扩散一次，
+        同层节点之间的能量在下一层才生效。
+        
+        这是BFS的近似而非等价实现：BFS按节点首次到达的顺序逐个扩展，
+        有环的图上两者的激活值和排序会不同（前20名通常只部分重合），
+        因此只在 engine_mode="vectorized" 时显式启用，默认仍为BFS。
+        """
+        print(f"🔥 开始向量化扩散激活 (线索: {len(cues)}, 类型: {task_type.value}, 深度: {max_depth})")
+        
+        self.active_nodes.clear()
+        snapshot = self.memory.freeze()
+        n = snapshot.num_nodes
+        
+        # 每条边的传播系数: decay * edge_weight * attention(邻居标签)
+        attention_weights = self._get_attention_weights(task_type)
+        label_attention = np.array(
+            [attention_weights.get(label, 1.0) for label in snapshot.label_names] or [1.0]
+        )
+        edge_factor = (self.decay_factor * snapshot.weights
+                       * label_attention[snapshot.neighbor_labels])
+        edge_source = np.repeat(np.arange(n), np.diff(snapshot.indptr))
+        
+        activation = np.zeros(n)
+        frontier = np.zeros(n, dtype=bool)
+        for node_id, initial_energy in cues:
+            self.active_nodes[node_id] = initial_energy
+            i = snapshot.node_index.get(node_id)
+            if i is not None:
+                activation[i] = initial_energy
+                frontier[i] = True
+        
+        expanded = np.zeros(n, dtype=bool)
+        cross_modal_mask = np.zeros(n, dtype=bool)
+        for depth in range(max_depth):
+            # 阈值门控：只有达到阈值的前沿节点向外传播
+            senders = frontier & ~expanded & (activation >= self.activation_threshold)
+            expanded |= frontier
+            if not senders.any():
+                break
+            cross_modal_mask |= senders & (activation > 0.8)
+            
+            edge_mask = senders[edge_source]
+            targets = snapshot.indices[edge_mask]
+            activation += np.bincount(
+                targets,
+                weights=activation[edge_source[edge_mask]] * edge_factor[edge_mask],
+                minlength=n
+            )
+            
+            frontier = np.zeros(n, dtype=bool)
+            frontier[targets] = True
+            frontier &= ~expanded
+            print(f"  → 第 {depth} 层: 传播节点 {int(senders.sum())}, 新前沿 {int(frontier.sum())}")
+        
+        for i in np.flatnonzero(activation):
+            self.active_nodes[snapshot.node_ids[i]] = float(activation[i])
+        
+        # 跨模态检索合并为一次批量向量查询
+        cross_modal_ids = [snapshot.node_ids[i] for i in np.flatnonzero(cross_modal_mask)]
+        if cross_modal_ids:
+            self._cross_modal_activation(cross_modal_ids)
+        
+        activated_nodes = self._collect_activated_nodes()
+        print(f"✅ 向量化扩散激活完成 (激活节点: {len(activated_nodes)})")
         return activated_nodes
     
     def _get_attention_weights(self, task_type: TaskType) -> Dict[str, float]:
@@ -231,36 +785,54 @@ class ActivationEngine:
         
         return attention_maps.get(task_type, {"default": 1.0})
     
-    def _get_all_neighbors(self, node_id: str) -> List[Tuple[Node, float]]:
-        """获取节点的所有邻居（语义+程序记忆）"""
-        neighbors = []
+    def _get_all_neighbors(self, node_id: str) -> Neighbors:
+        """获取节点的所有邻居（语义+程序记忆），远程图时优先读取缓存"""
+        remote = self.memory.has_remote_graph
+        if remote:
+            neighbors = self._cached_neighbors(node_id)
+            if neighbors is not None:
+                return neighbors
+            self.prefetch_stats["cache_misses"] += 1
+        versions = self.memory.graph_versions
         
         # 语义记忆邻居
         semantic_neighbors = self.memory.get_semantic_weighted_neighbors(node_id)
-        neighbors.extend(semantic_neighbors)
         
         # 程序记忆邻居
         procedural_neighbors = self.memory.get_procedural_weighted_neighbors(node_id)
-        neighbors.extend(procedural_neighbors)
         
-        return neighbors
+        if remote:
+            self._store_neighbors(node_id, versions, semantic_neighbors, procedural_neighbors)
+        return semantic_neighbors + procedural_neighbors
     
-    async def _cross_modal_activation(self, node_id: str):
-        """跨模态激活 - 从图记忆触发向量记忆检索"""
-        print(f"  🔗 跨模态激活: {node_id}")
+    async def _cross_modal_activation_async(self, node_ids: List[str],
+                                            semaphore: asyncio.Semaphore):
+        """在线程中执行一次批量跨模态检索，受信号量限流"""
+        async with semaphore:
+            await asyncio.to_thread(self._cross_modal_activation, node_ids)
+    
+    def _cross_modal_activation(self, node_ids: List[str]):
+        """跨模态激活 - 从图记忆触发向量记忆检索（一次批量查询）"""
+        print(f"  🔗 跨模态激活: {', '.join(node_ids)}")
+        
+        # 获取带嵌入的节点
+        source_nodes = []
+        for node_id in node_ids:
+            node = self._get_node(node_id)
+            if node and node.embedding:
+                source_nodes.append(node)
+        
+        if not source_nodes:
+            return
         
-        # 获取节点
-        node = (self.memory.get_semantic_node(node_id) or 
-                self.memory.get_procedural_node(node_id))
+        # 在情景记忆中批量搜索相关事件
+        results = self.memory.search_batch(
+            [node.embedding for node in source_nodes], n_results=2
+        )
         
-        if node and node.embedding:
-            # 在情景记忆中搜索相关事件
-            episodic_memories = self.memory.search_episodic_by_vector(
-                node.embedding, n_results=2
-            )
-            
+        for node, episodic_memories in zip(source_nodes, results):
             if episodic_memories:
-                print(f"    → 发现相关情景记忆: {len(episodic_memories)} 个")
+                print(f"    → {node.id} 发现相关情景记忆: {len(episodic_memories)} 个")
                 
                 # 可以进一步将情景记忆中的实体重新注入激活网络
                 # 这里简化处理
@@ -271,9 +843,8 @@ class ActivationEngine:
         
         for node_id, activation_energy in self.active_nodes.items():
             if activation_energy > self.activation_threshold:
-                # 尝试从两个记忆系统获取节点
-                node = (self.memory.get_semantic_node(node_id) or 
-                       self.memory.get_procedural_node(node_id))
+                # 尝试从两个记忆系统获取节点（经读穿透缓存）
+                node = self._get_node(node_id)
                 
                 if node:
                     # 将激活能量存储在节点属性中
@@ -296,10 +867,10 @@ class ActivationEngine:
         used_set = set(used_memory_ids)
         hits = len(self._last_prefetch_ids.intersection(used_set))
         
+        # 激活路径上的预取命中在读取时统计，这里只记录最终进入回答的预取节点
         if hits > 0:
-            self._last_turn_stats["useful"] += hits
-            self.prefetch_stats["useful_prefetches"] += hits
-            print(f"  📊 预取命中: {hits}/{len(self._last_prefetch_ids)}")
+            self.prefetch_stats["answer_hits"] += hits
+            print(f"  📊 预取节点进入回答: {hits}/{len(self._last_prefetch_ids)}")
     
     def reward_activation_path(self, path_nodes: List[str], reward: float = 0.1):
         """奖励成功的激活路径（强化学习）"""
@@ -335,10 +906,15 @@ class ActivationEngine:
                 sum(self.active_nodes.values()) / len(self.active_nodes)
                 if self.active_nodes else 0
             ),
-            "cache_size": len(self.cache.cache),
+            "cache_size": len(self.cache),
+            "cache_stats": self.cache.get_stats(),
             "prefetch_hit_rate": (
                 self.prefetch_stats["useful_prefetches"] / 
                 max(self.prefetch_stats["total_prefetches"], 1)
+            ),
+            "lookup_hit_rate": (
+                self.prefetch_stats["cache_hits"] /
+                max(self.prefetch_stats["cache_hits"] + self.prefetch_stats["cache_misses"], 1)
             )
         }
 
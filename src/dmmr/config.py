@@ -3,7 +3,9 @@
 DMMR 配置管理
 集中管理系统配置和环境变量
 """
+import hashlib
 import os
+import re
 from typing import Dict, Any, Optional
 from dataclasses import dataclass, field
 from pathlib import Path
@@ -18,15 +20,38 @@ class DatabaseConfig:
     vector_dim: int = 256
     vector_uri: Optional[str] = None
     
+    # FAISS索引类型与近似检索参数
+    vector_index_type: str = "flat"  # flat, ivf_flat, ivf_pq, hnsw
+    ann_train_threshold: int = 10000  # 集合达到该规模后自动训练并切换到近似索引
+    ivf_nlist: int = 1024
+    ivf_nprobe: int = 16
+    pq_m: int = 32
+    pq_nbits: int = 8
+    hnsw_m: int = 32
+    hnsw_ef_search: int = 64
+    compact_tombstone_ratio: float = 0.25  # 删除产生的墓碑占比超过该值时后台压缩索引
+    shared_vector_index: bool = False  # 所有用户的情景记忆共用一个按用户分区的 FAISS 索引
+    
+    # 情景记忆冷热分层
+    hot_tier_size: int = 0  # 常驻内存的热层记忆块数，0 表示不分层
+    hot_tier_min_recall: float = 0.95  # 热层前k结果对冷层结果的抽查召回率不低于该值时才由热层作答
+    hot_tier_audit_interval: int = 8  # 热层作答期间每隔多少次检索抽查一次冷层
+    hot_tier_recency_weight: float = 0.5  # 热层排序中时效与重要性的权重
+    
     # 图数据库
     use_real_graph_db: bool = False
     graph_backend: str = "neo4j"  # neo4j, memgraph
     graph_uri: Optional[str] = None
     graph_user: Optional[str] = None
     graph_password: Optional[str] = None
+    graph_pool_size: int = 100  # 所有用户共享的 Neo4j 连接池大小
+    graph_write_batch_size: int = 500  # 缓冲的节点/关系写入达到该数量后批量提交
+    graph_flush_interval: float = 1.0  # 缓冲写入的最长滞留时间(秒)
+    graph_flush_max_retries: int = 3  # 批量写入连续失败的重试次数，超过后失败的行转入 dead_letters
     
     # 本地缓存
     cache_dir: str = "cache"
+    persist_episodic: bool = False  # 情景记忆持久化到 cache_dir/<collection_name>/
 
 
 @dataclass
@@ -54,7 +79,30 @@ class ActivationConfig:
     activation_threshold: float = 0.1
     fan_out_factor: float = 1.0
     max_depth: int = 3
-    cache_size: int = 100
+    cache_size: int = 100  # 激活缓存条目上限，0 表示禁用缓存与认知预热
+    cache_policy: str = "lru"  # lru, lfu, arc
+    cache_ttl: float = 0.0  # 缓存条目过期时间(秒)，0 表示不过期
+    cache_max_bytes: int = 0  # 激活缓存估算内存上限(字节)，0 表示只按条目数限制
+    engine_mode: str = "bfs"  # bfs, vectorized (CSR快照上的稀疏矩阵传播，BFS的近似), best_first (按能量优先扩展，有预算)
+    best_first_max_nodes: int = 256  # best_first 模式每轮最多扩展的节点数，0 表示不限
+    best_first_max_edges: int = 4096  # best_first 模式每轮最多处理的边数，0 表示不限
+    best_first_top_k: int = 20  # best_first 模式判断收敛的前k激活节点数
+    best_first_patience: int = 32  # 前k集合连续这么多次扩展不变即提前终止，0 表示不提前终止
+    best_first_prefetch: int = 16  # best_first 模式在远程图上一次批量读取邻居的堆顶节点数
+    max_concurrent_lookups: int = 8  # 异步扩散激活中并发的邻居/跨模态检索上限
+    priming_top_k: int = 16  # 认知启动预取的高频激活节点 / 高中心性节点 / 扩展邻居数
+    priming_recent_chunks: int = 16  # 认知启动提升到热层的最近使用情景记忆块数
+    access_decay: float = 0.9  # 访问统计中节点激活得分每轮的衰减系数
+
+
+@dataclass
+class RetentionConfig:
+    """记忆保留策略配置"""
+    max_episodic_chunks: int = 0  # 每个用户情景记忆的条数上限，0 表示不限
+    max_episodic_bytes: int = 0  # 每个用户情景记忆的估算字节上限，0 表示不限
+    low_water_ratio: float = 0.9  # 超限后淘汰到上限的该比例，避免频繁触发
+    recency_weight: float = 0.5  # 保留分 = 时效分×权重 + 重要性×(1-权重)
+    eviction_batch_size: int = 256  # 每批淘汰条数，批间让出锁使检索继续
 
 
 @dataclass  
@@ -79,6 +127,7 @@ class DMMRConfig:
     database: DatabaseConfig = field(default_factory=DatabaseConfig)
     api: APIConfig = field(default_factory=APIConfig)  
     activation: ActivationConfig = field(default_factory=ActivationConfig)
+    retention: RetentionConfig = field(default_factory=RetentionConfig)
     triage: TriageConfig = field(default_factory=TriageConfig)
     experiment: ExperimentConfig = field(default_factory=ExperimentConfig)
 
@@ -107,6 +156,29 @@ class ConfigManager:
         config.database.vector_backend = os.getenv("DMMR_VECTOR_BACKEND", config.database.vector_backend)
         config.database.vector_dim = int(os.getenv("DMMR_VECTOR_DIM", str(config.database.vector_dim)))
         config.database.vector_uri = os.getenv("DMMR_VECTOR_URI", config.database.vector_uri)
+        config.database.vector_index_type = os.getenv(
+            "DMMR_VECTOR_INDEX", config.database.vector_index_type)
+        config.database.ann_train_threshold = int(os.getenv(
+            "DMMR_ANN_TRAIN_THRESHOLD", str(config.database.ann_train_threshold)))
+        config.database.ivf_nlist = int(os.getenv("DMMR_IVF_NLIST", str(config.database.ivf_nlist)))
+        config.database.ivf_nprobe = int(os.getenv(
+            "DMMR_IVF_NPROBE", str(config.database.ivf_nprobe)))
+        config.database.pq_m = int(os.getenv("DMMR_PQ_M", str(config.database.pq_m)))
+        config.database.pq_nbits = int(os.getenv("DMMR_PQ_NBITS", str(config.database.pq_nbits)))
+        config.database.hnsw_m = int(os.getenv("DMMR_HNSW_M", str(config.database.hnsw_m)))
+        config.database.hnsw_ef_search = int(os.getenv(
+            "DMMR_HNSW_EF_SEARCH", str(config.database.hnsw_ef_search)))
+        config.database.compact_tombstone_ratio = float(os.getenv(
+            "DMMR_COMPACT_RATIO", str(config.database.compact_tombstone_ratio)))
+        config.database.shared_vector_index = os.getenv("DMMR_SHARED_VECTOR_INDEX", "0") == "1"
+        config.database.hot_tier_size = int(os.getenv(
+            "DMMR_HOT_TIER_SIZE", str(config.database.hot_tier_size)))
+        config.database.hot_tier_min_recall = float(os.getenv(
+            "DMMR_HOT_TIER_MIN_RECALL", str(config.database.hot_tier_min_recall)))
+        config.database.hot_tier_audit_interval = int(os.getenv(
+            "DMMR_HOT_TIER_AUDIT_INTERVAL", str(config.database.hot_tier_audit_interval)))
+        config.database.hot_tier_recency_weight = float(os.getenv(
+            "DMMR_HOT_TIER_RECENCY_WEIGHT", str(config.database.hot_tier_recency_weight)))
         
         config.database.use_real_graph_db = os.getenv("DMMR_USE_REAL_GRAPH", "0") == "1"
         config.database.graph_backend = os.getenv("DMMR_GRAPH_BACKEND", config.database.graph_backend)
@@ -114,7 +186,17 @@ class ConfigManager:
         config.database.graph_user = os.getenv("DMMR_GRAPH_USER", config.database.graph_user)
         config.database.graph_password = os.getenv("DMMR_GRAPH_PASSWORD", config.database.graph_password)
         
+        config.database.graph_pool_size = int(os.getenv(
+            "DMMR_GRAPH_POOL_SIZE", str(config.database.graph_pool_size)))
+        config.database.graph_write_batch_size = int(os.getenv(
+            "DMMR_GRAPH_WRITE_BATCH", str(config.database.graph_write_batch_size)))
+        config.database.graph_flush_interval = float(os.getenv(
+            "DMMR_GRAPH_FLUSH_INTERVAL", str(config.database.graph_flush_interval)))
+        config.database.graph_flush_max_retries = int(os.getenv(
+            "DMMR_GRAPH_FLUSH_RETRIES", str(config.database.graph_flush_max_retries)))
+        
         config.database.cache_dir = os.getenv("DMMR_CACHE_DIR", config.database.cache_dir)
+        config.database.persist_episodic = os.getenv("DMMR_PERSIST_EPISODIC", "0") == "1"
         
         # API配置
         config.api.api_key = os.getenv("ARK_API_KEY") or os.getenv("OPENAI_API_KEY")
@@ -133,6 +215,44 @@ class ConfigManager:
         config.activation.fan_out_factor = float(os.getenv("DMMR_FAN_OUT_FACTOR", str(config.activation.fan_out_factor)))
         config.activation.max_depth = int(os.getenv("DMMR_MAX_DEPTH", str(config.activation.max_depth)))
         config.activation.cache_size = int(os.getenv("DMMR_CACHE_SIZE", str(config.activation.cache_size)))
+        config.activation.cache_policy = os.getenv(
+            "DMMR_CACHE_POLICY", config.activation.cache_policy)
+        config.activation.cache_ttl = float(os.getenv(
+            "DMMR_CACHE_TTL", str(config.activation.cache_ttl)))
+        config.activation.cache_max_bytes = int(os.getenv(
+            "DMMR_CACHE_MAX_BYTES", str(config.activation.cache_max_bytes)))
+        config.activation.engine_mode = os.getenv(
+            "DMMR_ACTIVATION_MODE", config.activation.engine_mode)
+        config.activation.best_first_max_nodes = int(os.getenv(
+            "DMMR_BEST_FIRST_MAX_NODES", str(config.activation.best_first_max_nodes)))
+        config.activation.best_first_max_edges = int(os.getenv(
+            "DMMR_BEST_FIRST_MAX_EDGES", str(config.activation.best_first_max_edges)))
+        config.activation.best_first_top_k = int(os.getenv(
+            "DMMR_BEST_FIRST_TOP_K", str(config.activation.best_first_top_k)))
+        config.activation.best_first_patience = int(os.getenv(
+            "DMMR_BEST_FIRST_PATIENCE", str(config.activation.best_first_patience)))
+        config.activation.best_first_prefetch = int(os.getenv(
+            "DMMR_BEST_FIRST_PREFETCH", str(config.activation.best_first_prefetch)))
+        config.activation.max_concurrent_lookups = int(os.getenv(
+            "DMMR_MAX_CONCURRENT_LOOKUPS", str(config.activation.max_concurrent_lookups)))
+        config.activation.priming_top_k = int(os.getenv(
+            "DMMR_PRIMING_TOP_K", str(config.activation.priming_top_k)))
+        config.activation.priming_recent_chunks = int(os.getenv(
+            "DMMR_PRIMING_RECENT_CHUNKS", str(config.activation.priming_recent_chunks)))
+        config.activation.access_decay = float(os.getenv(
+            "DMMR_ACCESS_DECAY", str(config.activation.access_decay)))
+        
+        # 保留策略配置
+        config.retention.max_episodic_chunks = int(os.getenv(
+            "DMMR_MAX_EPISODIC_CHUNKS", str(config.retention.max_episodic_chunks)))
+        config.retention.max_episodic_bytes = int(os.getenv(
+            "DMMR_MAX_EPISODIC_BYTES", str(config.retention.max_episodic_bytes)))
+        config.retention.low_water_ratio = float(os.getenv(
+            "DMMR_RETENTION_LOW_WATER", str(config.retention.low_water_ratio)))
+        config.retention.recency_weight = float(os.getenv(
+            "DMMR_RETENTION_RECENCY_WEIGHT", str(config.retention.recency_weight)))
+        config.retention.eviction_batch_size = int(os.getenv(
+            "DMMR_EVICTION_BATCH", str(config.retention.eviction_batch_size)))
         
         # 分类配置
         config.triage.confidence_threshold = float(os.getenv("DMMR_TRIAGE_THRESHOLD", str(config.triage.confidence_threshold)))
@@ -197,6 +317,26 @@ def get_config() -> DMMRConfig:
     return config_manager.config
 
 
+_SAFE_PATH_NAME = re.compile(r"[A-Za-z0-9][A-Za-z0-9_.-]{0,127}")
+# 哈希后的名字形如 "<slug>-<16位十六进制>"，同形的原名也要哈希，两类输出才不会重合
+_HASHED_PATH_NAME = re.compile(r".*-[0-9a-f]{16}")
+
+
+def safe_path_name(name: str) -> str:
+    """
+    把用户ID等外部输入转换为安全的单级文件名（用于 cache_dir 下的目录/文件名）
+    
+    只含字母、数字、"_"、"."、"-" 且不以 "." 开头的名字原样返回（已有数据的路径不变），
+    其余替换非法字符后追加原名的哈希，不会越出 cache_dir。以 "-<16位十六进制>" 结尾的名字
+    即使合法也会哈希，因此原样返回的名字与哈希结果互不重合，不同名字只会在哈希碰撞时冲突。
+    """
+    if _SAFE_PATH_NAME.fullmatch(name) and not _HASHED_PATH_NAME.fullmatch(name):
+        return name
+    slug = re.sub(r"[^A-Za-z0-9_-]", "_", name)[:64]
+    digest = hashlib.sha256(name.encode("utf-8")).hexdigest()[:16]
+    return f"{slug}-{digest}"
+
+
 def validate_config() -> bool:
     """验证配置是否有效"""
     warnings = config_manager.validate_config()
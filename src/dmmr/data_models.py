@@ -36,6 +36,36 @@ class MemoryChunk(BaseModel):
         }
 
 
+class EpisodicFilter(BaseModel):
+    """情景记忆检索过滤条件，各条件之间为"与"关系，未设置的条件不生效"""
+    task_types: Optional[List[TaskType]] = Field(default=None, description="允许的任务类型")
+    start_time: Optional[datetime] = Field(default=None, description="时间窗口起点(含)")
+    end_time: Optional[datetime] = Field(default=None, description="时间窗口终点(含)")
+    min_significance: Optional[float] = Field(default=None, description="最低重要性评分")
+    metadata: Dict[str, Any] = Field(default_factory=dict, description="元数据等值条件，值为列表/元组/集合时匹配其中任一")
+    
+    def accepted_values(self, key: str) -> List[Any]:
+        """某个元数据键可接受的取值"""
+        expected = self.metadata[key]
+        return list(expected) if isinstance(expected, (list, tuple, set, frozenset)) else [expected]
+    
+    def matches(self, chunk: MemoryChunk) -> bool:
+        """逐条判断记忆块是否满足条件（无向量索引时使用）"""
+        if self.task_types is not None and chunk.task_type not in self.task_types:
+            return False
+        if (self.start_time is not None
+                and chunk.timestamp.timestamp() < self.start_time.timestamp()):
+            return False
+        if self.end_time is not None and chunk.timestamp.timestamp() > self.end_time.timestamp():
+            return False
+        if self.min_significance is not None and chunk.significance_score < self.min_significance:
+            return False
+        return all(
+            key in chunk.metadata and chunk.metadata[key] in self.accepted_values(key)
+            for key in self.metadata
+        )
+
+
 class Node(BaseModel):
     """图节点，表示语义或程序记忆中的实体"""
     id: str = Field(description="节点唯一标识")
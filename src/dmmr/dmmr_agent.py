@@ -206,6 +206,9 @@ class DMMRAgent:
             else:
                 self.memory_systems.add_semantic_relationship(relationship)
         
+        # 本轮的图写入在一个事务中批量提交
+        self.memory_systems.flush()
+        
         # 更新环境画像
         self._update_environment_profile(user_input)
         
@@ -250,6 +253,7 @@ class DMMRAgent:
             episodic_memories = self.memory_systems.search_episodic_by_vector(
                 query_embedding, n_results=3
             )
+            self.activation_engine.record_episodic_access([chunk.id for chunk in episodic_memories])
             
             for chunk in episodic_memories:
                 activated_memories.append({
@@ -428,7 +432,9 @@ class DMMRAgent:
             'total_memories_created': self.session_stats['total_memories_created'],
             'total_memories_retrieved': self.session_stats['total_memories_retrieved'],
             'activation_events': self.session_stats['activation_events'],
-            'prefetch_stats': self.activation_engine.get_prefetch_stats()
+            'prefetch_stats': self.activation_engine.get_prefetch_stats(),
+            'retention_stats': self.memory_systems.get_retention_stats(),
+            'tier_stats': self.memory_systems.get_tier_stats()
         }
 
 
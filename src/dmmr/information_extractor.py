@@ -8,11 +8,18 @@ from typing import List, Dict, Any, Optional
 from .data_models import Node, Relationship, Entity, TaskType
 from .api_wrapper import APIWrapper
 
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
 
 class InformationExtractor:
     """信息抽取器，负责从文本中抽取结构化信息"""
     
-    def __init__(self, api_wrapper: APIWrapper):
+    def __init__(self, api_wrapper: Optional[APIWrapper] = None):
+        # 抽取与嵌入均在本地完成，批量导入等场景无需 API 密钥
         self.api_wrapper = api_wrapper
         
         # 实体识别规则库
@@ -46,10 +53,11 @@ class InformationExtractor:
         
         print("🔍 信息抽取器初始化完成")
     
-    def generate_embedding(self, text: str) -> List[float]:
+    @staticmethod
+    def generate_embedding(text: str) -> List[float]:
         """
         生成文本嵌入向量
-        使用确定性哈希方法生成轻量级嵌入
+        使用确定性哈希方法生成轻量级嵌入（不依赖实例状态，向量数据库补全缺失嵌入时也使用它）
         """
         from .config import get_config
         dim = get_config().database.vector_dim
@@ -69,6 +77,33 @@ class InformationExtractor:
         norm = math.sqrt(sum(v * v for v in vector)) or 1.0
         return [v / norm for v in vector]
     
+    @staticmethod
+    def generate_embeddings(texts: List[str]) -> List[List[float]]:
+        """
+        批量生成文本嵌入向量
+        与 generate_embedding 结果一致，但所有维度的计算在一次矩阵运算中完成
+        """
+        if not NUMPY_AVAILABLE:
+            return [InformationExtractor.generate_embedding(text) for text in texts]
+        if not texts:
+            return []
+        
+        from .config import get_config
+        dim = get_config().database.vector_dim
+        
+        # (hash * k) mod 2^32 只依赖哈希的低32位，可安全地用int64计算
+        low_bits = np.array(
+            [int(hashlib.md5(text.encode('utf-8')).hexdigest(), 16) % (2**32) for text in texts],
+            dtype=np.int64
+        )
+        seeds = (low_bits[:, None] * np.arange(1, dim + 1, dtype=np.int64)) % (2**32)
+        vectors = np.sin(seeds * 0.00001) * 0.5 + 0.5
+        
+        # L2归一化
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return (vectors / norms).tolist()
+    
     def extract_entities(self, text: str) -> List[Entity]:
         """从文本中抽取实体"""
         entities = {}
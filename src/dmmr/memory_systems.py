@@ -3,26 +3,785 @@
 Multiple Memory Systems - Manages episodic, semantic, and procedural memories.
 Supports both real and simulated backends for vector and graph databases.
 """
+import contextlib
+import heapq
+import json
 import math
-from typing import List, Dict, Any, Optional, Tuple
-from .data_models import MemoryChunk, Node, Relationship
-from .config import get_config
+import os
+import shutil
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import List, Dict, Any, Deque, Optional, Tuple
+from .data_models import MemoryChunk, EpisodicFilter, Node, Relationship, TaskType
+from .config import get_config, safe_path_name
+from .retention import RetentionPolicy, get_score_calculator
 
 # Optional dependencies
 try:
-    import faiss
     import numpy as np
-    FAISS_AVAILABLE = True
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+try:
+    import faiss
+    FAISS_AVAILABLE = NUMPY_AVAILABLE
 except ImportError:
     FAISS_AVAILABLE = False
 
 try:
-    from neo4j import GraphDatabase, Driver
+    from neo4j import GraphDatabase as Neo4jGraphDatabase, Driver
     NEO4J_AVAILABLE = True
 except ImportError:
     NEO4J_AVAILABLE = False
 
 
+class EmbeddingMatrix:
+    """
+    Growable, row-normalized float32 matrix with a parallel id array.
+
+    Rows are L2-normalized on insert so a cosine ranking is a single
+    matrix-vector product. Rows are never reordered; a replaced or
+    embedding-less chunk is masked out instead, which keeps the scan
+    order (and therefore tie-breaking) identical to insertion order.
+    Removed chunks leave a tombstone row (id ``None``) until compact().
+    With ``normalize_rows`` off, rows are stored as given, so scores rank
+    like a raw inner product (the query is still normalized).
+    """
+
+    normalize_rows = True
+
+    def __init__(self, dim: int, initial_capacity: int = 1024):
+        self.dim = dim
+        self.vectors = np.zeros((max(initial_capacity, 1), dim), dtype=np.float32)
+        self.live = np.zeros(self.vectors.shape[0], dtype=bool)
+        self.ids: List[Optional[str]] = []
+        self.id_to_row: Dict[str, int] = {}
+        self.tombstones = 0
+
+    def __len__(self) -> int:
+        return len(self.id_to_row)
+
+    def normalize(self, vectors) -> "np.ndarray":
+        """Converts one or many vectors to an L2-normalized (n, dim) float32 array."""
+        arr = self.fit(vectors)
+        norms = np.linalg.norm(arr, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return arr / norms
+
+    def fit(self, vectors) -> "np.ndarray":
+        """Converts one or many vectors to an (n, dim) float32 array, padding or truncating."""
+        try:
+            arr = np.asarray(vectors, dtype=np.float32)
+        except ValueError:  # ragged rows
+            arr = np.zeros((len(vectors), self.dim), dtype=np.float32)
+            for i, vector in enumerate(vectors):
+                width = min(len(vector), self.dim)
+                arr[i, :width] = vector[:width]
+        if arr.ndim == 1:
+            arr = arr.reshape(1, -1)
+        if arr.shape[1] != self.dim:
+            fitted = np.zeros((arr.shape[0], self.dim), dtype=np.float32)
+            width = min(arr.shape[1], self.dim)
+            fitted[:, :width] = arr[:, :width]
+            arr = fitted
+        return arr
+
+    def _rows(self, vectors) -> "np.ndarray":
+        """Vectors as stored in the matrix."""
+        return self.normalize(vectors) if self.normalize_rows else self.fit(vectors)
+
+    def _ensure_capacity(self, rows: int):
+        """Grows the backing arrays geometrically."""
+        capacity = self.vectors.shape[0]
+        if rows <= capacity:
+            return
+        new_capacity = max(rows, capacity * 2)
+        vectors = np.zeros((new_capacity, self.dim), dtype=np.float32)
+        vectors[:capacity] = self.vectors
+        live = np.zeros(new_capacity, dtype=bool)
+        live[:capacity] = self.live
+        self.vectors, self.live = vectors, live
+
+    def _row_for(self, chunk_id: str) -> int:
+        """Returns the row of ``chunk_id``, appending a new (masked) row if needed."""
+        row = self.id_to_row.get(chunk_id)
+        if row is None:
+            row = len(self.ids)
+            self._ensure_capacity(row + 1)
+            self.ids.append(chunk_id)
+            self.id_to_row[chunk_id] = row
+        return row
+
+    def upsert(self, chunk_id: str, vector: Optional[List[float]]):
+        """Inserts or replaces the row for ``chunk_id``; an empty vector masks it out."""
+        row = self._row_for(chunk_id)
+        if vector:
+            self.vectors[row] = self._rows(vector)[0]
+            self.live[row] = True
+        else:
+            self.live[row] = False
+
+    def upsert_batch(self, chunk_ids: List[str], vectors: List[Optional[List[float]]]):
+        """Inserts or replaces many rows, normalizing all non-empty vectors in one pass."""
+        rows = np.asarray([self._row_for(chunk_id) for chunk_id in chunk_ids], dtype=np.int64)
+        has_vector = np.array([bool(vector) for vector in vectors], dtype=bool)
+        if has_vector.any():
+            self.vectors[rows[has_vector]] = self._rows(
+                [vector for vector in vectors if vector]
+            )
+        self.live[rows] = has_vector
+
+    def remove(self, chunk_id: str) -> bool:
+        """Tombstones the row of ``chunk_id``; returns False if it was not stored."""
+        row = self.id_to_row.pop(chunk_id, None)
+        if row is None:
+            return False
+        self.ids[row] = None
+        self.live[row] = False
+        self.tombstones += 1
+        return True
+
+    def compact(self):
+        """Drops tombstoned rows; survivors keep their relative (tie-breaking) order."""
+        if not self.tombstones:
+            return
+        keep = np.asarray([row for row, chunk_id in enumerate(self.ids) if chunk_id is not None],
+                          dtype=np.int64)
+        vectors = np.zeros((max(len(keep), 1), self.dim), dtype=np.float32)
+        live = np.zeros(vectors.shape[0], dtype=bool)
+        vectors[:len(keep)] = self.vectors[keep]
+        live[:len(keep)] = self.live[keep]
+        self.vectors, self.live = vectors, live
+        self.ids = [self.ids[row] for row in keep]
+        self.id_to_row = {chunk_id: row for row, chunk_id in enumerate(self.ids)}
+        self.tombstones = 0
+
+    def scores(self, query_vector: List[float]) -> "np.ndarray":
+        """Cosine similarity of every row against the query (masked rows get -inf)."""
+        return self.scores_batch([query_vector])[0]
+
+    def scores_batch(self, query_vectors, rows: Optional["np.ndarray"] = None) -> "np.ndarray":
+        """
+        Scores a whole (m, dim) query matrix in one GEMM, returning (m, rows).
+        With ``rows`` (ascending row numbers) only those rows are scored.
+        """
+        if rows is not None:
+            scores = self.normalize(query_vectors) @ self.vectors[rows].T
+            scores[:, ~self.live[rows]] = -np.inf
+            return scores
+        size = len(self.ids)
+        scores = self.normalize(query_vectors) @ self.vectors[:size].T
+        scores[:, ~self.live[:size]] = -np.inf
+        return scores
+
+    def top_k(self, scores: "np.ndarray", k: int,
+              rows: Optional["np.ndarray"] = None) -> List[Tuple[str, float]]:
+        """Selects the ``k`` best rows in descending score, ties in insertion order."""
+        k = min(k, int(np.count_nonzero(scores > -np.inf)))
+        if k <= 0:
+            return []
+        if k < len(scores):
+            kth = np.partition(scores, len(scores) - k)[len(scores) - k]
+            candidates = np.flatnonzero(scores >= kth)
+        else:
+            candidates = np.flatnonzero(scores > -np.inf)
+        order = candidates[np.lexsort((candidates, -scores[candidates]))][:k]
+        if rows is not None:
+            return [(self.ids[rows[i]], float(scores[i])) for i in order]
+        return [(self.ids[row], float(scores[row])) for row in order]
+
+
+class MappedEpisodicStore(EmbeddingMatrix):
+    """
+    Disk-backed episodic store: memory-mapped vectors plus an append-only chunk log.
+
+    Layout under ``directory``:
+        meta.json     vector dimension of the store
+        vectors.f32   row-normalized embeddings (capacity x dim, float32)
+        live.u8       1 when the row has a searchable embedding
+        offsets.i64   1 + byte offset of the row's latest record in chunks.jsonl
+                      (0 marks a removed row)
+        ids.jsonl     one JSON-encoded chunk id per row, in row order
+        chunks.jsonl  append-only chunk records (embedding omitted)
+
+    Reopening maps the arrays and reads the id list only; chunk records are
+    parsed on access. The store doubles as the chunk mapping of VectorDatabase
+    (``store[chunk_id] = chunk`` / ``store[chunk_id]``).
+    """
+
+    def __init__(self, dim: int, directory: str, initial_capacity: int = 1024):
+        self.dim = dim
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        
+        meta_path = self.directory / "meta.json"
+        if meta_path.exists():
+            stored_dim = json.loads(meta_path.read_text(encoding="utf-8"))["dim"]
+            if stored_dim != dim:
+                raise ValueError(f"Episodic store {self.directory} has dimension {stored_dim}, "
+                                 f"expected {dim}")
+        else:
+            meta_path.write_text(json.dumps({"dim": dim}), encoding="utf-8")
+        
+        self.ids = []
+        ids_path = self.directory / "ids.jsonl"
+        if ids_path.exists():
+            with open(ids_path, "r", encoding="utf-8") as f:
+                # A torn last line (crash mid-write) is ignored
+                self.ids = [json.loads(line) for line in f if line.endswith("\n")]
+        
+        vectors_path = self.directory / "vectors.f32"
+        existing = vectors_path.stat().st_size // (4 * dim) if vectors_path.exists() else 0
+        self._map(max(initial_capacity, existing, len(self.ids), 1))
+        
+        # Rows without a record were removed (or never finished writing)
+        self.tombstones = 0
+        for row in np.flatnonzero(self.offsets[:len(self.ids)] == 0):
+            self.ids[row] = None
+            self.tombstones += 1
+        self.id_to_row = {chunk_id: row for row, chunk_id in enumerate(self.ids)
+                          if chunk_id is not None}
+        
+        self._open_logs()
+
+    def _open_logs(self):
+        """Opens the append-only id list and chunk log."""
+        self._ids_file = open(self.directory / "ids.jsonl", "a", encoding="utf-8")
+        self._log = open(self.directory / "chunks.jsonl", "a+b")
+
+    def _map(self, capacity: int):
+        """(Re)maps the fixed-width row files at ``capacity`` rows."""
+        self._unmap()
+        for name, row_bytes in (("vectors.f32", 4 * self.dim), ("live.u8", 1), ("offsets.i64", 8)):
+            path = self.directory / name
+            with open(path, "a+b") as f:
+                if f.seek(0, 2) < capacity * row_bytes:
+                    f.truncate(capacity * row_bytes)
+        self.vectors = np.memmap(self.directory / "vectors.f32", dtype=np.float32,
+                                 mode="r+", shape=(capacity, self.dim))
+        self.live = np.memmap(self.directory / "live.u8", dtype=bool, mode="r+", shape=(capacity,))
+        self.offsets = np.memmap(self.directory / "offsets.i64", dtype=np.int64, mode="r+",
+                                 shape=(capacity,))
+
+    def _unmap(self):
+        """
+        Flushes and releases the row-file mappings. Files must not be resized
+        or replaced while mapped (Windows refuses, elsewhere the old mapping
+        would keep serving stale pages).
+        """
+        for name in ("vectors", "live", "offsets"):
+            array = getattr(self, name, None)
+            if not isinstance(array, np.memmap):
+                continue
+            array.flush()
+            mapping = array._mmap
+            setattr(self, name, None)
+            del array
+            if mapping is not None:
+                try:
+                    mapping.close()
+                except BufferError:
+                    pass  # a caller still holds a view; it is released when collected
+
+    def _ensure_capacity(self, rows: int):
+        """Grows the backing files geometrically and remaps them."""
+        capacity = self.vectors.shape[0]
+        if rows <= capacity:
+            return
+        self.flush()
+        self._map(max(rows, capacity * 2))
+
+    def _row_for(self, chunk_id: str) -> int:
+        """Returns the row of ``chunk_id``, persisting the id of a new row."""
+        is_new = chunk_id not in self.id_to_row
+        row = super()._row_for(chunk_id)
+        if is_new:
+            self._ids_file.write(json.dumps(chunk_id, ensure_ascii=False) + "\n")
+            self._ids_file.flush()
+        return row
+
+    def __setitem__(self, chunk_id: str, chunk: MemoryChunk):
+        """Appends the chunk record to the log and points its row at it."""
+        row = self._row_for(chunk_id)
+        record = chunk.model_dump_json(exclude={"embedding"}).encode("utf-8") + b"\n"
+        offset = self._log.seek(0, 2)
+        self._log.write(record)
+        self._log.flush()
+        self.offsets[row] = offset + 1
+
+    def read_record(self, chunk_id: str) -> MemoryChunk:
+        """Reads the latest record of ``chunk_id`` without its embedding."""
+        row = self.id_to_row[chunk_id]
+        if self.offsets[row] == 0:
+            raise KeyError(chunk_id)
+        self._log.seek(int(self.offsets[row]) - 1)
+        return MemoryChunk.model_validate_json(self._log.readline())
+
+    def __getitem__(self, chunk_id: str) -> MemoryChunk:
+        """Reads the latest record of ``chunk_id``, restoring its embedding from the matrix."""
+        chunk = self.read_record(chunk_id)
+        row = self.id_to_row[chunk_id]
+        if self.live[row]:
+            chunk.embedding = self.vectors[row].tolist()
+        return chunk
+
+    def __contains__(self, chunk_id: str) -> bool:
+        row = self.id_to_row.get(chunk_id)
+        return row is not None and self.offsets[row] != 0
+
+    def pop(self, chunk_id: str, default=None) -> Optional[MemoryChunk]:
+        """Removes a chunk (persisted by zeroing its record offset) and returns it."""
+        if chunk_id not in self:
+            return default
+        chunk = self[chunk_id]
+        row = self.id_to_row[chunk_id]
+        self.remove(chunk_id)
+        self.offsets[row] = 0
+        return chunk
+
+    def compact(self):
+        """
+        Rewrites the row files, id list and chunk log without removed rows.
+        
+        New files are written beside the old ones, the old mappings and file
+        handles are closed, and the new files are swapped in with os.replace
+        and remapped.
+        """
+        if not self.tombstones:
+            return
+        keep = [row for row, chunk_id in enumerate(self.ids) if chunk_id is not None]
+        ids = [self.ids[row] for row in keep]
+        offsets = np.zeros(len(keep), dtype=np.int64)
+        
+        self.flush()
+        with open(self.directory / "chunks.jsonl.tmp", "wb") as out:
+            for i, row in enumerate(keep):
+                if self.offsets[row]:
+                    self._log.seek(int(self.offsets[row]) - 1)
+                    offsets[i] = out.tell() + 1
+                    out.write(self._log.readline())
+        with open(self.directory / "ids.jsonl.tmp", "w", encoding="utf-8") as out:
+            for chunk_id in ids:
+                out.write(json.dumps(chunk_id, ensure_ascii=False) + "\n")
+        np.asarray(self.vectors[keep], dtype=np.float32).tofile(self.directory / "vectors.f32.tmp")
+        np.asarray(self.live[keep], dtype=np.uint8).tofile(self.directory / "live.u8.tmp")
+        offsets.tofile(self.directory / "offsets.i64.tmp")
+        
+        self._ids_file.close()
+        self._log.close()
+        self._unmap()
+        for name in ("vectors.f32", "live.u8", "offsets.i64", "ids.jsonl", "chunks.jsonl"):
+            os.replace(self.directory / f"{name}.tmp", self.directory / name)
+        
+        self._map(max(len(keep), 1))
+        self.ids = ids
+        self.id_to_row = {chunk_id: row for row, chunk_id in enumerate(ids)}
+        self.tombstones = 0
+        self._open_logs()
+
+    def get(self, chunk_id: str, default=None) -> Optional[MemoryChunk]:
+        return self[chunk_id] if chunk_id in self else default
+
+    def values(self):
+        """Iterates over all stored chunks, parsing each record lazily."""
+        for chunk_id in self.ids:
+            if chunk_id is not None and chunk_id in self:
+                yield self[chunk_id]
+
+    def flush(self):
+        """Flushes the mapped arrays and log buffers to disk."""
+        for array in (self.vectors, self.live, self.offsets):
+            array.flush()
+        self._ids_file.flush()
+        self._log.flush()
+
+    def close(self):
+        """Flushes and closes the store's files and mappings."""
+        self.flush()
+        self._ids_file.close()
+        self._log.close()
+        self._unmap()
+
+
+class ChunkFieldIndex:
+    """
+    Per-row filter columns of an episodic store, used to pre-filter searches.
+
+    Task type, timestamp and significance live in parallel numpy arrays and
+    scalar metadata values in an inverted index of ``(key, value) -> rows``,
+    so an EpisodicFilter becomes a boolean row mask without touching any chunk
+    record. Unhashable metadata values (lists, dicts) are not indexed.
+    """
+
+    TASK_CODES = {task_type: code for code, task_type in enumerate(TaskType)}
+
+    def __init__(self, initial_capacity: int = 1024):
+        capacity = max(initial_capacity, 1)
+        self.valid = np.zeros(capacity, dtype=bool)
+        self.task_types = np.zeros(capacity, dtype=np.int8)
+        self.timestamps = np.zeros(capacity, dtype=np.float64)
+        self.significance = np.zeros(capacity, dtype=np.float32)
+        self.postings: Dict[Tuple[str, Any], set] = {}
+        self.row_keys: Dict[int, List[Tuple[str, Any]]] = {}
+
+    def _ensure_capacity(self, rows: int):
+        """Grows the column arrays geometrically."""
+        capacity = self.valid.shape[0]
+        if rows <= capacity:
+            return
+        new_capacity = max(rows, capacity * 2)
+        for name in ("valid", "task_types", "timestamps", "significance"):
+            old = getattr(self, name)
+            new = np.zeros(new_capacity, dtype=old.dtype)
+            new[:capacity] = old
+            setattr(self, name, new)
+
+    def set(self, row: int, chunk: MemoryChunk):
+        """Indexes ``chunk`` at ``row``, replacing whatever was there."""
+        self.clear(row)
+        self._ensure_capacity(row + 1)
+        self.valid[row] = True
+        self.task_types[row] = self.TASK_CODES[chunk.task_type]
+        self.timestamps[row] = chunk.timestamp.timestamp()
+        self.significance[row] = chunk.significance_score
+        keys = []
+        for key, value in chunk.metadata.items():
+            try:
+                self.postings.setdefault((key, value), set()).add(row)
+            except TypeError:  # unhashable value
+                continue
+            keys.append((key, value))
+        if keys:
+            self.row_keys[row] = keys
+
+    def clear(self, row: int):
+        """Removes ``row`` from every column."""
+        if row < self.valid.shape[0]:
+            self.valid[row] = False
+        for key in self.row_keys.pop(row, ()):
+            rows = self.postings[key]
+            rows.discard(row)
+            if not rows:
+                del self.postings[key]
+
+    def compact(self, keep: List[int]):
+        """Renumbers the rows in ``keep`` to ``0..len(keep)-1``, dropping all others."""
+        keep_arr = np.asarray(keep, dtype=np.int64)
+        capacity = max(len(keep), 1)
+        for name in ("valid", "task_types", "timestamps", "significance"):
+            old = getattr(self, name)
+            new = np.zeros(capacity, dtype=old.dtype)
+            new[:len(keep)] = old[keep_arr]
+            setattr(self, name, new)
+        row_keys = {new: self.row_keys[old] for new, old in enumerate(keep) if old in self.row_keys}
+        self.postings, self.row_keys = {}, row_keys
+        for row, keys in row_keys.items():
+            for key in keys:
+                self.postings.setdefault(key, set()).add(row)
+
+    def mask(self, filters: EpisodicFilter, size: int) -> "np.ndarray":
+        """Boolean mask over rows ``[0, size)`` of the rows matching ``filters``."""
+        self._ensure_capacity(size)
+        mask = self.valid[:size].copy()
+        if filters.task_types is not None:
+            codes = [self.TASK_CODES[task_type] for task_type in filters.task_types]
+            mask &= np.isin(self.task_types[:size], codes)
+        if filters.start_time is not None:
+            mask &= self.timestamps[:size] >= filters.start_time.timestamp()
+        if filters.end_time is not None:
+            mask &= self.timestamps[:size] <= filters.end_time.timestamp()
+        if filters.min_significance is not None:
+            mask &= self.significance[:size] >= np.float32(filters.min_significance)
+        for key in filters.metadata:
+            selected = np.zeros(size, dtype=bool)
+            for value in filters.accepted_values(key):
+                try:
+                    rows = self.postings.get((key, value), ())
+                except TypeError:  # unhashable value never matches
+                    continue
+                selected[[row for row in rows if row < size]] = True
+            mask &= selected
+        return mask
+
+
+class HotTier(EmbeddingMatrix):
+    """
+    Small in-RAM tier holding the most retention-worthy chunks of a collection.
+
+    The tier is inclusive: hot chunks stay in the collection's full (cold)
+    store as well, so a search that falls through to the cold tier sees every
+    chunk. Chunk records are kept alongside the matrix, so a hot hit never
+    touches the cold store; with ``detach_embeddings`` they are kept without
+    their embedding lists, which are restored from the (normalized) matrix
+    rows on access. When the tier outgrows its capacity, chunks are ranked by
+    ScoreCalculator.calculate_retention_score (recency and significance) and
+    the lowest are demoted. With ``inner_product`` rows keep their norms, so
+    the tier ranks like a FAISS inner-product index instead of by cosine.
+    """
+
+    # Demotion runs once the tier outgrows its capacity by this fraction
+    SLACK = 0.125
+
+    def __init__(self, dim: int, capacity: int, recency_weight: float = 0.5,
+                 detach_embeddings: bool = False, inner_product: bool = False):
+        self.capacity = capacity
+        self.normalize_rows = not inner_product
+        self.recency_weight = recency_weight
+        self.detach_embeddings = detach_embeddings
+        self.max_size = capacity + max(1, int(capacity * self.SLACK))
+        super().__init__(dim, initial_capacity=self.max_size + 1)
+        self.chunks: Dict[str, MemoryChunk] = {}
+        self.fields = ChunkFieldIndex(self.max_size + 1)
+
+    def put(self, chunk_ids: List[str], chunks: List[MemoryChunk],
+            vectors: Optional[List[List[float]]] = None):
+        """
+        Promotes chunks (replacing older versions); chunks without a vector are dropped.
+        ``vectors`` overrides the chunks' own embeddings (e.g. read back from an index).
+        """
+        if vectors is None:
+            vectors = [chunk.embedding for chunk in chunks]
+        embedded = []
+        for chunk_id, chunk, vector in zip(chunk_ids, chunks, vectors):
+            if vector is not None and len(vector):
+                embedded.append((chunk_id, chunk, vector))
+            else:
+                self.discard(chunk_id)
+        if not embedded:
+            return
+        self.upsert_batch([chunk_id for chunk_id, _, _ in embedded],
+                          [vector for _, _, vector in embedded])
+        for chunk_id, chunk, _ in embedded:
+            if self.detach_embeddings:
+                chunk = chunk.model_copy(update={"embedding": None})
+            self.chunks[chunk_id] = chunk
+            self.fields.set(self.id_to_row[chunk_id], chunk)
+        if len(self.chunks) > self.max_size:
+            self.demote()
+
+    def __getitem__(self, chunk_id: str) -> MemoryChunk:
+        chunk = self.chunks[chunk_id]
+        if self.detach_embeddings:
+            vector = self.vectors[self.id_to_row[chunk_id]].tolist()
+            chunk = chunk.model_copy(update={"embedding": vector})
+        return chunk
+
+    def discard(self, chunk_id: str) -> bool:
+        """Removes a chunk from the tier (it stays in the cold store)."""
+        if self.chunks.pop(chunk_id, None) is None:
+            return False
+        self.fields.clear(self.id_to_row[chunk_id])
+        return self.remove(chunk_id)
+
+    def demote(self):
+        """Keeps the ``capacity`` highest-scoring chunks and compacts the matrix."""
+        scorer = get_score_calculator()
+        ranked = sorted(self.chunks, reverse=True,
+                        key=lambda chunk_id: scorer.calculate_retention_score(
+                            self.chunks[chunk_id], self.recency_weight))
+        for chunk_id in ranked[self.capacity:]:
+            self.discard(chunk_id)
+        self.compact()
+
+    def compact(self):
+        """Drops tombstoned rows from the matrix and the filter columns alike."""
+        if not self.tombstones:
+            return
+        keep = [row for row, chunk_id in enumerate(self.ids) if chunk_id is not None]
+        super().compact()
+        self.fields.compact(keep)
+
+    def clear(self):
+        """Empties the tier."""
+        self.ids, self.id_to_row, self.chunks = [], {}, {}
+        self.live[:] = False
+        self.tombstones = 0
+        self.fields = ChunkFieldIndex(self.max_size + 1)
+
+
+class ReadWriteLock:
+    """Many concurrent readers or one writer; a waiting writer blocks new readers."""
+    
+    def __init__(self):
+        self._cond = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer = False
+        self._writers_waiting = 0
+    
+    @contextlib.contextmanager
+    def read(self):
+        with self._cond:
+            while self._writer or self._writers_waiting:
+                self._cond.wait()
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._readers -= 1
+                if not self._readers:
+                    self._cond.notify_all()
+    
+    @contextlib.contextmanager
+    def write(self):
+        with self._cond:
+            self._writers_waiting += 1
+            while self._writer or self._readers:
+                self._cond.wait()
+            self._writers_waiting -= 1
+            self._writer = True
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._writer = False
+                self._cond.notify_all()
+
+
+class SharedVectorIndex:
+    """
+    One FAISS index shared by many users' episodic collections.
+    
+    Every collection owns a partition; its vectors are stored under 64-bit ids
+    ``partition << 32 | row``, so a partition's search is an IDSelectorRange
+    over its id block. Thousands of light users then share one contiguous
+    store instead of thousands of tiny indexes.
+    
+    Each partition also keeps the index positions of its rows, so reading rows
+    back never scans the shared id map. Searches and reads share a read lock;
+    adds and removals take it exclusively.
+    """
+    
+    PARTITION_BITS = 32
+    
+    def __init__(self, dim: int):
+        self.dim = dim
+        # Plain IndexIDMap: no per-vector reverse map, rows are resolved through _positions
+        self.index = faiss.IndexIDMap(faiss.IndexFlatIP(dim))
+        self._partitions: Dict[str, int] = {}
+        self._counts: Dict[int, int] = {}
+        # Partition -> index position of each row (grown by doubling; _counts holds the length)
+        self._positions: Dict[int, "np.ndarray"] = {}
+        self._partitions_lock = threading.Lock()
+        self._lock = ReadWriteLock()
+    
+    def partition(self, name: str) -> "SharedIndexPartition":
+        """Attaches to a collection's partition, dropping vectors left by a previous owner."""
+        with self._partitions_lock:
+            key = self._partitions.setdefault(name, len(self._partitions))
+        partition = SharedIndexPartition(self, key)
+        partition.reset()
+        return partition
+    
+    def id_range(self, key: int) -> Tuple[int, int]:
+        """Returns the ``[lo, hi)`` id block of a partition."""
+        return key << self.PARTITION_BITS, (key + 1) << self.PARTITION_BITS
+    
+    def add(self, key: int, vectors, ids):
+        """Adds vectors under explicit ids (the partition's next rows)."""
+        n = len(ids)
+        with self._lock.write():
+            start = self.index.ntotal
+            self.index.add_with_ids(vectors, ids)
+            count = self._counts.get(key, 0)
+            positions = self._positions.get(key)
+            if positions is None or len(positions) < count + n:
+                grown = np.empty(max(2 * (count + n), 64), dtype='int64')
+                if positions is not None:
+                    grown[:count] = positions[:count]
+                positions = self._positions[key] = grown
+            positions[count:count + n] = np.arange(start, start + n)
+            self._counts[key] = count + n
+    
+    def search(self, key: int, queries, k: int, ids: Optional["np.ndarray"] = None):
+        """Searches only the vectors of one partition (or only ``ids`` within it)."""
+        lo, hi = self.id_range(key)
+        selector = faiss.IDSelectorRange(lo, hi) if ids is None else faiss.IDSelectorBatch(ids)
+        params = faiss.SearchParameters(sel=selector)
+        with self._lock.read():
+            return self.index.search(queries, k, params=params)
+    
+    def reconstruct(self, key: int, start: int, n: int):
+        """Returns rows ``[start, start + n)`` of a partition."""
+        with self._lock.read():
+            count = self._counts.get(key, 0)
+            if not count:
+                return self.index.index.reconstruct_batch(np.empty(0, dtype='int64'))
+            positions = self._positions[key][start:min(start + n, count)]
+            return self.index.index.reconstruct_batch(positions)
+    
+    def remove(self, key: int):
+        """Removes every vector of a partition."""
+        with self._lock.write():
+            count = self._counts.pop(key, 0)
+            positions = self._positions.pop(key, None)
+            if not count:
+                return
+            removed = np.sort(positions[:count])
+            self.index.remove_ids(faiss.IDSelectorRange(*self.id_range(key)))
+            # remove_ids keeps the remaining vectors in order; shift the other partitions down
+            for other, other_positions in self._positions.items():
+                live = other_positions[:self._counts.get(other, 0)]
+                live -= np.searchsorted(removed, live)
+
+
+class SharedIndexPartition:
+    """
+    A collection's view of a SharedVectorIndex.
+    
+    Exposes the subset of the FAISS index API VectorDatabase relies on
+    (``d``, ``ntotal``, ``add``, ``search``, ``reconstruct_n``), with
+    collection-local row numbers in place of global ids.
+    """
+    
+    def __init__(self, shared: SharedVectorIndex, key: int):
+        self.shared = shared
+        self.key = key
+        self.d = shared.dim
+        self.ntotal = 0
+        self.base, _ = shared.id_range(key)
+    
+    def add(self, vectors):
+        start = self.base + self.ntotal
+        ids = np.arange(start, start + len(vectors), dtype='int64')
+        self.shared.add(self.key, vectors, ids)
+        self.ntotal += len(vectors)
+    
+    def search(self, queries, k: int, rows: Optional["np.ndarray"] = None):
+        ids = None if rows is None else (np.asarray(rows, dtype='int64') + self.base)
+        scores, ids = self.shared.search(self.key, queries, k, ids)
+        return scores, np.where(ids >= 0, ids - self.base, -1)
+    
+    def reconstruct_n(self, start: int, n: int):
+        return self.shared.reconstruct(self.key, start, n)
+    
+    def reset(self):
+        self.shared.remove(self.key)
+        self.ntotal = 0
+    
+    def to_faiss(self):
+        """Copies the partition into a standalone flat index (the per-user snapshot format)."""
+        index = faiss.IndexFlatIP(self.d)
+        if self.ntotal:
+            index.add(self.reconstruct_n(0, self.ntotal))
+        return index
+
+
+_shared_vector_indexes: Dict[int, SharedVectorIndex] = {}
+_shared_vector_lock = threading.Lock()
+
+
+def get_shared_vector_index(dim: int) -> SharedVectorIndex:
+    """Returns the process-wide shared vector index for a dimension."""
+    with _shared_vector_lock:
+        if dim not in _shared_vector_indexes:
+            _shared_vector_indexes[dim] = SharedVectorIndex(dim)
+        return _shared_vector_indexes[dim]
+
+
 class VectorDatabase:
     """Vector Database Interface - supports FAISS and in-memory implementations."""
     
@@ -31,23 +790,236 @@ class VectorDatabase:
         self.use_real_backend = use_real_backend
         self.config = get_config().database
         
+        # Guards index swaps during (background) compaction
+        self._lock = threading.RLock()
+        self._compacting = False
+        self.hot_tier: Optional[HotTier] = None
+        # Filter columns aligned with the store's rows, built on the first filtered search
+        self._fields: Optional[ChunkFieldIndex] = None
+        
         if use_real_backend and FAISS_AVAILABLE:
             self._init_faiss()
         else:
             self._init_memory_backend()
+        
+        # Recent/significant chunks answered from RAM before scanning the full store
+        self.tier_stats = {'hot_hits': 0, 'cold_hits': 0}
+        if self.config.hot_tier_size > 0 and NUMPY_AVAILABLE:
+            mapped = isinstance(getattr(self, 'memory_store', None), MappedEpisodicStore)
+            # Rank hot chunks on the cold tier's scale: inner product for FAISS, cosine otherwise
+            self.hot_tier = HotTier(self.dim, self.config.hot_tier_size,
+                                    self.config.hot_tier_recency_weight, detach_embeddings=mapped,
+                                    inner_product=hasattr(self, 'index'))
+            # Running recall of hot answers, measured against the cold tier (None until audited)
+            self.hot_recall: Optional[float] = None
+            self._tier_queries = 0
+            self._warm_hot_tier()
+        
+        # Per-user caps on stored chunks/bytes; checked after every add
+        self.retention: Optional[RetentionPolicy] = None
+        if RetentionPolicy.is_enabled(get_config().retention):
+            self.retention = RetentionPolicy(self)
+            self.retention.maybe_run()
+    
+    ANN_INDEX_TYPES = ("ivf_flat", "ivf_pq", "hnsw")
+    
+    # Below this many tombstones compaction is never scheduled automatically
+    COMPACT_MIN_TOMBSTONES = 64
     
     def _init_faiss(self):
         """Initializes the FAISS backend."""
         self.dim = self.config.vector_dim
-        self.index = faiss.IndexFlatIP(self.dim)  # Inner product index
+        self.index_type = self.config.vector_index_type
+        if self.index_type != "flat" and self.index_type not in self.ANN_INDEX_TYPES:
+            raise ValueError(f"Unsupported vector index type: {self.index_type}")
+        if self.config.shared_vector_index:
+            if self.index_type != "flat":
+                raise ValueError("The shared vector index only supports the flat index type")
+            # A slice of the process-wide index, filtered to this collection on search
+            self.index = get_shared_vector_index(self.dim).partition(self.collection_name)
+        else:
+            # Start exact; approximate indexes are trained once the collection is large enough
+            self.index = faiss.IndexFlatIP(self.dim)  # Inner product index
         self.id_to_chunk = {}
-        self.chunk_ids = []
-        print(f"📊 FAISS vector database initialized (dimension: {self.dim})")
+        # Index position -> chunk id (None for deleted positions) and its inverse
+        self.chunk_ids: List[Optional[str]] = []
+        self.id_to_row: Dict[str, int] = {}
+        self.tombstones = 0
+        print(f"📊 FAISS vector database initialized (dimension: {self.dim}, "
+              f"index: {self.index_type}{', shared' if self.shared_index else ''})")
+        
+        # Warm restart from the last snapshot, if any
+        if (self.snapshot_dir / "index.faiss").exists():
+            self.load()
+    
+    @property
+    def shared_index(self) -> bool:
+        """Whether this collection lives in the process-wide shared index."""
+        return isinstance(getattr(self, 'index', None), SharedIndexPartition)
+    
+    def close(self):
+        """Releases this collection's vectors from the shared index (no-op otherwise)."""
+        if self.shared_index:
+            self.index.reset()
+    
+    def purge(self):
+        """
+        Drops every chunk of this collection and deletes its on-disk storage
+        (FAISS snapshot and persistent store). The instance must not be used afterwards.
+        """
+        with self._lock:
+            if hasattr(self, 'index'):
+                self.index.reset()
+            if isinstance(getattr(self, 'memory_store', None), MappedEpisodicStore):
+                self.memory_store.close()
+            self.purge_storage(self.collection_name)
+    
+    @staticmethod
+    def purge_storage(collection_name: str):
+        """Deletes a collection's directory under cache_dir, whether or not it is loaded."""
+        directory = Path(get_config().database.cache_dir) / safe_path_name(collection_name)
+        shutil.rmtree(directory, ignore_errors=True)
+    
+    @property
+    def snapshot_dir(self) -> Path:
+        """Default snapshot location: cache_dir/<collection_name>/faiss."""
+        return self.storage_dir / "faiss"
+    
+    @property
+    def storage_dir(self) -> Path:
+        """This collection's directory under cache_dir (name sanitized by safe_path_name)."""
+        return Path(self.config.cache_dir) / safe_path_name(self.collection_name)
+    
+    def save(self, path: Optional[str] = None):
+        """
+        Snapshots the FAISS index and its id/metadata table.
+        
+        Writes ``index.faiss`` (faiss.write_index) and ``chunks.jsonl`` (one
+        ``[chunk_id, chunk]`` row per index position, embeddings omitted since
+        they live in the index). The persistent in-memory store is flushed instead.
+        """
+        with self._lock:
+            if not hasattr(self, 'index'):
+                if isinstance(self.memory_store, MappedEpisodicStore):
+                    self.memory_store.flush()
+                return
+            
+            directory = Path(path) if path else self.snapshot_dir
+            directory.mkdir(parents=True, exist_ok=True)
+            
+            # Write to temporary files first so a crash never leaves a torn snapshot
+            index = self.index.to_faiss() if self.shared_index else self.index
+            faiss.write_index(index, str(directory / "index.faiss.tmp"))
+            with open(directory / "chunks.jsonl.tmp", "w", encoding="utf-8") as f:
+                for chunk_id in self.chunk_ids:
+                    # Deleted positions are kept as [null, null] so rows line up with the index
+                    record = None
+                    if chunk_id is not None:
+                        record = self.id_to_chunk[chunk_id].model_dump(mode="json",
+                                                                       exclude={"embedding"})
+                    f.write(json.dumps([chunk_id, record], ensure_ascii=False) + "\n")
+            os.replace(directory / "index.faiss.tmp", directory / "index.faiss")
+            os.replace(directory / "chunks.jsonl.tmp", directory / "chunks.jsonl")
+            
+            print(f"💾 FAISS snapshot saved ({directory}, {self.index.ntotal} vectors)")
+    
+    def load(self, path: Optional[str] = None):
+        """Restores the FAISS index and id/metadata table written by save()."""
+        directory = Path(path) if path else self.snapshot_dir
+        index = faiss.read_index(str(directory / "index.faiss"))
+        if index.d != self.dim:
+            raise ValueError(f"FAISS snapshot {directory} has dimension {index.d}, "
+                             f"expected {self.dim}")
+        
+        chunk_ids, id_to_chunk = [], {}
+        with open(directory / "chunks.jsonl", "r", encoding="utf-8") as f:
+            for line in f:
+                chunk_id, record = json.loads(line)
+                chunk_ids.append(chunk_id)
+                if chunk_id is not None:
+                    id_to_chunk[chunk_id] = MemoryChunk.model_validate(record)
+        if len(chunk_ids) != index.ntotal:
+            raise ValueError(f"FAISS snapshot {directory} is inconsistent: "
+                             f"{index.ntotal} vectors, {len(chunk_ids)} chunk records")
+        
+        if self.shared_index:
+            self.index.reset()
+            if index.ntotal:
+                self.index.add(index.reconstruct_n(0, index.ntotal))
+        else:
+            self.index = index
+        self.chunk_ids, self.id_to_chunk = chunk_ids, id_to_chunk
+        self.id_to_row = {chunk_id: row for row, chunk_id in enumerate(chunk_ids)
+                          if chunk_id is not None}
+        self.tombstones = len(chunk_ids) - len(self.id_to_row)
+        self._fields = None
+        self.set_search_params()
+        if self.hot_tier is not None:
+            self._warm_hot_tier()
+        print(f"📂 FAISS snapshot loaded ({directory}, {index.ntotal} vectors)")
+    
+    @property
+    def ann_active(self) -> bool:
+        """Whether searches currently go through an approximate index."""
+        return (hasattr(self, 'index')
+                and not isinstance(self.index, (faiss.IndexFlat, SharedIndexPartition)))
+    
+    def _create_ann_index(self, n_train: int):
+        """Creates an untrained approximate index sized for ``n_train`` vectors."""
+        if self.index_type == "hnsw":
+            return faiss.IndexHNSWFlat(self.dim, self.config.hnsw_m, faiss.METRIC_INNER_PRODUCT)
+        
+        # Keep ~39 training points per centroid, as FAISS recommends
+        nlist = max(1, min(self.config.ivf_nlist, n_train // 39))
+        quantizer = faiss.IndexFlatIP(self.dim)
+        if self.index_type == "ivf_flat":
+            return faiss.IndexIVFFlat(quantizer, self.dim, nlist, faiss.METRIC_INNER_PRODUCT)
+        
+        # PQ needs m to divide dim and at least 2**nbits training points
+        m = max(d for d in range(1, min(self.config.pq_m, self.dim) + 1) if self.dim % d == 0)
+        nbits = max(1, min(self.config.pq_nbits, int(math.log2(max(n_train, 2)))))
+        return faiss.IndexIVFPQ(quantizer, self.dim, nlist, m, nbits, faiss.METRIC_INNER_PRODUCT)
+    
+    def _maybe_train_ann_index(self):
+        """Swaps the flat index for the configured ANN index once the threshold is crossed."""
+        if self.index_type == "flat" or self.ann_active:
+            return
+        if self.index.ntotal < self.config.ann_train_threshold:
+            return
+        
+        vectors = self.index.reconstruct_n(0, self.index.ntotal)
+        index = self._create_ann_index(len(vectors))
+        if not index.is_trained:
+            index.train(vectors)
+        index.add(vectors)
+        self.index = index
+        self.set_search_params()
+        print(f"📊 FAISS index trained and switched to {self.index_type} ({index.ntotal} vectors)")
+    
+    def set_search_params(self, nprobe: Optional[int] = None, ef_search: Optional[int] = None):
+        """Sets the recall/latency knobs of the approximate index (nprobe / efSearch)."""
+        if not self.ann_active:
+            return
+        if isinstance(self.index, faiss.IndexIVF):
+            self.index.nprobe = min(nprobe or self.config.ivf_nprobe, self.index.nlist)
+            # Compaction reads vectors back, which IVF only supports with a direct map
+            if self.index.direct_map.type == faiss.DirectMap.NoMap:
+                self.index.make_direct_map()
+        elif isinstance(self.index, faiss.IndexHNSW):
+            self.index.hnsw.efSearch = ef_search or self.config.hnsw_ef_search
     
     def _init_memory_backend(self):
         """Initializes the in-memory backend."""
-        self.memory_store = {}
         self.dim = get_config().database.vector_dim
+        if self.config.persist_episodic and NUMPY_AVAILABLE:
+            directory = self.storage_dir
+            self.matrix = MappedEpisodicStore(self.dim, directory)
+            self.memory_store = self.matrix
+            print(f"💽 Persistent vector database opened ({directory}, {len(self.matrix)} chunks)")
+            return
+        
+        self.memory_store = {}
+        self.matrix = EmbeddingMatrix(self.dim) if NUMPY_AVAILABLE else None
         print(f"💾 In-memory vector database initialized (collection: {self.collection_name})")
     
     def add(self, chunk: MemoryChunk):
@@ -56,55 +1028,561 @@ class VectorDatabase:
         if chunk.embedding is None:
             chunk.embedding = self._generate_embedding(chunk.content)
         
-        if hasattr(self, 'index'):  # FAISS backend
-            self._add_to_faiss(chunk)
-        else:  # In-memory backend
-            self._add_to_memory(chunk)
+        with self._lock:
+            replaced = self._replaced_chunks([chunk])
+            if hasattr(self, 'index'):  # FAISS backend
+                chunk_id = self._add_to_faiss(chunk)
+            else:  # In-memory backend
+                chunk_id = self._add_to_memory(chunk)
+            if self.hot_tier is not None:
+                self.hot_tier.put([chunk_id], [chunk])
+        self._maybe_compact()
+        if self.retention is not None:
+            self.retention.note_added([chunk], replaced)
+    
+    def add_batch(self, chunks: List[MemoryChunk]):
+        """Adds many memory chunks with a single index append."""
+        if not chunks:
+            return
+        
+        # Generate all missing embeddings up front
+        missing = [chunk for chunk in chunks if chunk.embedding is None]
+        if missing:
+            embeddings = self._generate_embeddings([chunk.content for chunk in missing])
+            for chunk, embedding in zip(missing, embeddings):
+                chunk.embedding = embedding
+        
+        with self._lock:
+            replaced = self._replaced_chunks(chunks)
+            if hasattr(self, 'index'):  # FAISS backend
+                chunk_ids = self._add_batch_to_faiss(chunks)
+            else:  # In-memory backend
+                chunk_ids = self._add_batch_to_memory(chunks)
+            if self.hot_tier is not None:
+                self.hot_tier.put(chunk_ids, chunks)
+        self._maybe_compact()
+        if self.retention is not None:
+            self.retention.note_added(chunks, replaced)
+    
+    def _replaced_chunks(self, chunks: List[MemoryChunk]) -> List[MemoryChunk]:
+        """Records that adding ``chunks`` overwrites (looked up only if retention tracks bytes)."""
+        if self.retention is None or not self.retention.config.max_episodic_bytes:
+            return []
+        replaced = []
+        pending: Dict[str, MemoryChunk] = {}
+        for chunk in chunks:
+            if not chunk.id:
+                continue
+            previous = pending.get(chunk.id) or self.get(chunk.id)
+            if previous is not None:
+                replaced.append(previous)
+            pending[chunk.id] = chunk
+        return replaced
+    
+    def search(self, query_vector: List[float], n_results: int = 5,
+               filters: Optional[EpisodicFilter] = None) -> List[MemoryChunk]:
+        """
+        Performs a vector search.
+        
+        With ``filters`` only matching chunks are scored; the filter is turned
+        into a row mask from precomputed columns before any vector math.
+        """
+        with self._lock:
+            if self.hot_tier is not None:
+                return self._search_tiered([query_vector], n_results, filters)[0]
+            if filters is not None:
+                return self._search_filtered([query_vector], n_results, filters)[0]
+            if hasattr(self, 'index'):
+                return self._search_faiss(query_vector, n_results)
+            else:
+                return self._search_memory(query_vector, n_results)
+    
+    def search_batch(self, query_vectors: List[List[float]], n_results: int = 5,
+                     filters: Optional[EpisodicFilter] = None) -> List[List[MemoryChunk]]:
+        """Searches many query vectors in one pass, returning one result list per query."""
+        if len(query_vectors) == 0:
+            return []
+        with self._lock:
+            if self.hot_tier is not None:
+                return self._search_tiered(query_vectors, n_results, filters)
+            return self._search_cold_batch(query_vectors, n_results, filters)
+    
+    def _search_cold_batch(self, query_vectors: List[List[float]], n_results: int,
+                           filters: Optional[EpisodicFilter] = None) -> List[List[MemoryChunk]]:
+        """Searches the full store of the active backend."""
+        if filters is not None:
+            return self._search_filtered(query_vectors, n_results, filters)
+        if hasattr(self, 'index'):
+            return self._search_faiss_batch(query_vectors, n_results)
+        if self.matrix is not None:
+            scores = self.matrix.scores_batch(query_vectors)
+            return [
+                [self.memory_store[chunk_id] for chunk_id, _ in self.matrix.top_k(row, n_results)]
+                for row in scores
+            ]
+        return [self._search_memory(query, n_results) for query in query_vectors]
+    
+    def _search_filtered(self, query_vectors: List[List[float]], n_results: int,
+                         filters: EpisodicFilter) -> List[List[MemoryChunk]]:
+        """Scores only the rows selected by ``filters``."""
+        if hasattr(self, 'index'):
+            return self._search_faiss_filtered(query_vectors, n_results, filters)
+        if self.matrix is None:
+            return [self._search_memory(query, n_results, filters) for query in query_vectors]
+        rows = np.flatnonzero(self._field_index().mask(filters, len(self.matrix.ids)))
+        if not len(rows):
+            return [[] for _ in query_vectors]
+        scores = self.matrix.scores_batch(query_vectors, rows)
+        return [
+            [self.memory_store[chunk_id] for chunk_id, _ in self.matrix.top_k(row, n_results, rows)]
+            for row in scores
+        ]
+    
+    def _field_index(self) -> ChunkFieldIndex:
+        """Filter columns of the full store, built on first use and then kept in sync."""
+        if self._fields is None:
+            if hasattr(self, 'index'):
+                ids, read = self.chunk_ids, self.id_to_chunk.__getitem__
+            elif isinstance(self.memory_store, MappedEpisodicStore):
+                ids, read = self.matrix.ids, self.memory_store.read_record
+            else:
+                ids, read = self.matrix.ids, self.memory_store.__getitem__
+            fields = ChunkFieldIndex(len(ids))
+            for row, chunk_id in enumerate(ids):
+                if chunk_id is not None:
+                    fields.set(row, read(chunk_id))
+            self._fields = fields
+        return self._fields
+    
+    # Weight of the newest audit in the running hot-tier recall
+    RECALL_SMOOTHING = 0.2
+    
+    def _search_tiered(self, query_vectors: List[List[float]], n_results: int,
+                       filters: Optional[EpisodicFilter] = None) -> List[List[MemoryChunk]]:
+        """
+        Answers queries from the hot tier while it is trusted, the rest with
+        one batched cold search.
+        
+        Hot scores say nothing about the chunks that are only cold, so trust is
+        measured instead: a query is audited (searched in both tiers, the cold
+        answer returned) whenever the hot tier is not trusted and every
+        ``hot_tier_audit_interval``-th query otherwise. The hot tier is trusted
+        while the running recall of its top-k against the cold top-k stays at or
+        above ``hot_tier_min_recall``, or when it holds the whole collection.
+        """
+        hot = self.hot_tier
+        complete = len(hot) >= self.count()
+        trusted = complete or (self.hot_recall is not None
+                               and self.hot_recall >= self.config.hot_tier_min_recall)
+        interval = max(self.config.hot_tier_audit_interval, 1)
+        hot_rows = None
+        if filters is not None:
+            hot_rows = np.flatnonzero(hot.fields.mask(filters, len(hot.ids)))
+        
+        results: List[Optional[List[MemoryChunk]]] = [None] * len(query_vectors)
+        audits: Dict[int, List[str]] = {}
+        if len(hot) and (hot_rows is None or len(hot_rows)):
+            for i, scores in enumerate(hot.scores_batch(query_vectors, hot_rows)):
+                top = hot.top_k(scores, n_results, hot_rows)
+                self._tier_queries += 1
+                if complete:
+                    results[i] = [hot[chunk_id] for chunk_id, _ in top]
+                elif not trusted or self._tier_queries % interval == 0:
+                    audits[i] = [chunk_id for chunk_id, _ in top]
+                else:
+                    results[i] = [hot[chunk_id] for chunk_id, _ in top]
+        elif complete:
+            results = [[] for _ in query_vectors]
+        
+        cold = [i for i, result in enumerate(results) if result is None]
+        if cold:
+            cold_results = self._search_cold_batch([query_vectors[i] for i in cold],
+                                                   n_results, filters)
+            for i, result in zip(cold, cold_results):
+                results[i] = result
+        for i, hot_ids in audits.items():
+            self._note_hot_recall(hot_ids, [chunk.id for chunk in results[i]])
+        self.tier_stats['hot_hits'] += len(query_vectors) - len(cold)
+        self.tier_stats['cold_hits'] += len(cold)
+        return results
+    
+    def _note_hot_recall(self, hot_ids: List[str], cold_ids: List[str]):
+        """Folds one audited query into the running hot-tier recall."""
+        recall = len(set(hot_ids) & set(cold_ids)) / len(cold_ids) if cold_ids else 1.0
+        if self.hot_recall is None:
+            self.hot_recall = recall
+        else:
+            self.hot_recall += self.RECALL_SMOOTHING * (recall - self.hot_recall)
     
-    def search(self, query_vector: List[float], n_results: int = 5) -> List[MemoryChunk]:
-        """Performs a vector search."""
+    def _warm_hot_tier(self):
+        """Refills the hot tier with the most recently stored chunks."""
+        hot = self.hot_tier
+        hot.clear()
         if hasattr(self, 'index'):
-            return self._search_faiss(query_vector, n_results)
+            ordered_ids = self.chunk_ids
+        elif self.matrix is not None:
+            ordered_ids = self.matrix.ids
         else:
-            return self._search_memory(query_vector, n_results)
+            ordered_ids = list(self.memory_store)
+        recent = []
+        for chunk_id in reversed(ordered_ids):
+            if len(recent) >= hot.capacity:
+                break
+            if chunk_id is not None:
+                recent.append(chunk_id)
+        recent.reverse()
+        chunks = [self.get(chunk_id) for chunk_id in recent]
+        vectors = None
+        if hasattr(self, 'index') and recent:
+            # Snapshot records carry no embeddings; read the vectors back from the index
+            rows = [self.id_to_row[chunk_id] for chunk_id in recent]
+            block = self.index.reconstruct_n(rows[0], self.index.ntotal - rows[0])
+            vectors = [block[row - rows[0]].tolist() for row in rows]
+        hot.put(recent, chunks, vectors)
     
-    def _add_to_faiss(self, chunk: MemoryChunk):
+    def promote(self, chunk_ids: List[str]) -> int:
+        """
+        Pulls stored chunks into the hot tier (e.g. a user's recently used ones
+        during priming); returns how many were promoted. No-op without tiering.
+        """
+        if self.hot_tier is None:
+            return 0
+        with self._lock:
+            hot = self.hot_tier
+            stored = self.id_to_row if hasattr(self, 'index') else self.memory_store
+            promoted = []
+            for chunk_id in chunk_ids:
+                if chunk_id in stored and chunk_id not in hot.chunks and chunk_id not in promoted:
+                    promoted.append(chunk_id)
+            if not promoted:
+                return 0
+            chunks = [self.get(chunk_id) for chunk_id in promoted]
+            vectors = None
+            if hasattr(self, 'index'):
+                vectors = [self.index.reconstruct_n(self.id_to_row[chunk_id], 1)[0].tolist()
+                           for chunk_id in promoted]
+            hot.put(promoted, chunks, vectors)
+        return len(promoted)
+    
+    def get_tier_stats(self) -> Optional[Dict[str, Any]]:
+        """Hot/cold tier hit counters, or None when tiering is disabled."""
+        if self.hot_tier is None:
+            return None
+        queries = self.tier_stats['hot_hits'] + self.tier_stats['cold_hits']
+        return {
+            **self.tier_stats,
+            'hot_hit_rate': self.tier_stats['hot_hits'] / queries if queries else 0.0,
+            'hot_recall': self.hot_recall,
+            'hot_chunks': len(self.hot_tier),
+            'hot_capacity': self.hot_tier.capacity,
+            'total_chunks': self.count()
+        }
+    
+    def count(self) -> int:
+        """Number of stored chunks."""
+        if hasattr(self, 'index'):
+            return len(self.id_to_row)
+        return len(self.memory_store)
+    
+    def iter_chunks(self):
+        """Yields ``(chunk_id, chunk)`` for every stored chunk (ids snapshotted up front)."""
+        with self._lock:
+            if hasattr(self, 'index'):
+                items = list(self.id_to_chunk.items())
+            elif isinstance(self.memory_store, MappedEpisodicStore):
+                items = None
+                chunk_ids = list(self.memory_store.id_to_row)
+            else:
+                items = list(self.memory_store.items())
+        if items is not None:
+            yield from items
+            return
+        # Records of the persistent store are parsed one at a time
+        for chunk_id in chunk_ids:
+            chunk = self.get(chunk_id)
+            if chunk is not None:
+                yield chunk_id, chunk
+    
+    def chunk_nbytes(self, chunk: MemoryChunk) -> int:
+        """Estimated footprint of a stored chunk: its float32 vector plus its serialized record."""
+        return 4 * self.dim + len(chunk.model_dump_json(exclude={"embedding"}))
+    
+    def evict(self, chunk_ids: List[str]) -> int:
+        """Drops chunks chosen by the retention policy; returns how many were stored."""
+        with self._lock:
+            evicted = sum(self.delete(chunk_id) for chunk_id in chunk_ids)
+        return evicted
+    
+    def get(self, chunk_id: str) -> Optional[MemoryChunk]:
+        """Returns a stored chunk by id."""
+        with self._lock:
+            if hasattr(self, 'index'):
+                return self.id_to_chunk.get(chunk_id)
+            return self.memory_store.get(chunk_id)
+    
+    def delete(self, chunk_id: str) -> bool:
+        """
+        Removes a chunk; returns False if it was not stored.
+        
+        The index slot becomes a tombstone that searches skip; once enough
+        accumulate, compact() is scheduled on a background thread.
+        """
+        with self._lock:
+            if hasattr(self, 'index'):
+                if chunk_id not in self.id_to_row:
+                    return False
+                self._tombstone_faiss_row(chunk_id)
+                del self.id_to_chunk[chunk_id]
+            else:
+                # Looked up first: the persistent store is its own matrix and pop() frees the row
+                row = self.matrix.id_to_row.get(chunk_id) if self.matrix is not None else None
+                if self.memory_store.pop(chunk_id, None) is None:
+                    return False
+                if self.matrix is not None:
+                    if self._fields is not None:
+                        self._fields.clear(row)
+                    self.matrix.remove(chunk_id)
+            if self.hot_tier is not None:
+                self.hot_tier.discard(chunk_id)
+        self._maybe_compact()
+        return True
+    
+    def update(self, chunk: MemoryChunk):
+        """
+        Replaces a stored chunk (content, metadata and embedding).
+        
+        Without an embedding the old one is kept if the content is unchanged,
+        otherwise it is regenerated. Raises KeyError for unknown ids.
+        """
+        with self._lock:
+            existing = self.get(chunk.id) if chunk.id else None
+            if existing is None:
+                raise KeyError(chunk.id)
+            if chunk.embedding is None and existing.content == chunk.content:
+                chunk.embedding = existing.embedding
+            # Adding an existing id replaces it (FAISS: tombstone + append)
+            self.add(chunk)
+        self._maybe_compact()
+    
+    def compact(self):
+        """Rebuilds the index and id map without tombstones."""
+        with self._lock:
+            if hasattr(self, 'index'):
+                removed = self.tombstones
+                self._compact_faiss()
+            elif isinstance(self.matrix, EmbeddingMatrix):
+                removed = self.matrix.tombstones
+                keep = [row for row, chunk_id in enumerate(self.matrix.ids) if chunk_id is not None]
+                self.matrix.compact()
+                if removed and self._fields is not None:
+                    self._fields.compact(keep)
+            else:
+                return
+        if removed:
+            print(f"🧹 Vector database compacted ({self.collection_name}, "
+                  f"{removed} tombstones removed)")
+    
+    def _tombstone_ratio(self) -> float:
+        """Fraction of index slots held by deleted chunks."""
+        if hasattr(self, 'index'):
+            tombstones, total = self.tombstones, len(self.chunk_ids)
+        elif self.matrix is not None:
+            tombstones, total = self.matrix.tombstones, len(self.matrix.ids)
+        else:
+            return 0.0
+        if tombstones < self.COMPACT_MIN_TOMBSTONES:
+            return 0.0
+        return tombstones / max(total, 1)
+    
+    def _maybe_compact(self):
+        """Starts a background compaction once tombstones pass the configured ratio."""
+        with self._lock:
+            if self._compacting or self._tombstone_ratio() < self.config.compact_tombstone_ratio:
+                return
+            self._compacting = True
+        threading.Thread(target=self._compact_in_background, daemon=True,
+                         name=f"compact-{self.collection_name}").start()
+    
+    def _compact_in_background(self):
+        compacted = False
+        try:
+            self.compact()
+            compacted = True
+        except Exception as e:
+            print(f"⚠️ Background compaction failed ({self.collection_name}): {e}")
+        finally:
+            with self._lock:
+                self._compacting = False
+            # Deletes made while compacting did not schedule a run; catch up on them
+            # (after a failure the next delete retries instead)
+            if compacted:
+                self._maybe_compact()
+    
+    def _compact_faiss(self):
+        """Re-adds the surviving vectors to an empty copy of the (trained) index."""
+        if not self.tombstones:
+            return
+        keep = [row for row, chunk_id in enumerate(self.chunk_ids) if chunk_id is not None]
+        vectors = self.index.reconstruct_n(0, self.index.ntotal)[keep] if keep else None
+        
+        if self.shared_index:
+            self.index.reset()
+            index = self.index
+        else:
+            index = faiss.clone_index(self.index)
+            index.reset()
+        if keep:
+            index.add(vectors)
+        
+        self.index = index
+        self.chunk_ids = [self.chunk_ids[row] for row in keep]
+        self.id_to_row = {chunk_id: row for row, chunk_id in enumerate(self.chunk_ids)}
+        self.tombstones = 0
+        if self._fields is not None:
+            self._fields.compact(keep)
+        self.set_search_params()
+    
+    def _tombstone_faiss_row(self, chunk_id: str):
+        """Marks the index position of ``chunk_id`` as deleted."""
+        row = self.id_to_row.pop(chunk_id)
+        self.chunk_ids[row] = None
+        self.tombstones += 1
+        if self._fields is not None:
+            self._fields.clear(row)
+    
+    def _new_chunk_id(self, existing) -> str:
+        """Generates ``chunk_<n>`` for id-less chunks, skipping ids still in use."""
+        n = len(existing)
+        while f"chunk_{n}" in existing:
+            n += 1
+        return f"chunk_{n}"
+    
+    def _append_faiss_ids(self, chunks: List[MemoryChunk]) -> List[str]:
+        """Records index positions for newly appended chunks; re-added ids replace the old slot."""
+        chunk_ids = []
+        for chunk in chunks:
+            chunk_id = chunk.id or self._new_chunk_id(self.id_to_row)
+            if chunk_id in self.id_to_row:
+                self._tombstone_faiss_row(chunk_id)
+            if self._fields is not None:
+                self._fields.set(len(self.chunk_ids), chunk)
+            self.id_to_row[chunk_id] = len(self.chunk_ids)
+            self.chunk_ids.append(chunk_id)
+            self.id_to_chunk[chunk_id] = chunk
+            chunk_ids.append(chunk_id)
+        return chunk_ids
+    
+    def _add_to_faiss(self, chunk: MemoryChunk) -> str:
         """Adds to the FAISS index."""
         vector = np.array(chunk.embedding, dtype='float32').reshape(1, -1)
         self.index.add(vector)
         
-        chunk_id = chunk.id or f"chunk_{len(self.chunk_ids)}"
-        self.chunk_ids.append(chunk_id)
-        self.id_to_chunk[chunk_id] = chunk
+        chunk_id = self._append_faiss_ids([chunk])[0]
+        self._maybe_train_ann_index()
+        return chunk_id
+    
+    def _add_batch_to_faiss(self, chunks: List[MemoryChunk]) -> List[str]:
+        """Adds many chunks to the FAISS index with one index.add call."""
+        vectors = np.asarray([chunk.embedding for chunk in chunks], dtype='float32')
+        self.index.add(vectors.reshape(len(chunks), -1))
+        
+        chunk_ids = self._append_faiss_ids(chunks)
+        self._maybe_train_ann_index()
+        return chunk_ids
     
-    def _add_to_memory(self, chunk: MemoryChunk):
+    def _add_batch_to_memory(self, chunks: List[MemoryChunk]) -> List[str]:
+        """Adds many chunks to the in-memory store."""
+        chunk_ids = []
+        for chunk in chunks:
+            chunk_id = chunk.id or self._new_chunk_id(self.memory_store)
+            self.memory_store[chunk_id] = chunk
+            chunk_ids.append(chunk_id)
+        if self.matrix is not None:
+            self.matrix.upsert_batch(chunk_ids, [chunk.embedding for chunk in chunks])
+            if self._fields is not None:
+                for chunk_id, chunk in zip(chunk_ids, chunks):
+                    self._fields.set(self.matrix.id_to_row[chunk_id], chunk)
+        return chunk_ids
+    
+    def _add_to_memory(self, chunk: MemoryChunk) -> str:
         """Adds to the in-memory store."""
-        chunk_id = chunk.id or f"chunk_{len(self.memory_store)}"
+        chunk_id = chunk.id or self._new_chunk_id(self.memory_store)
         self.memory_store[chunk_id] = chunk
+        if self.matrix is not None:
+            self.matrix.upsert(chunk_id, chunk.embedding)
+            if self._fields is not None:
+                self._fields.set(self.matrix.id_to_row[chunk_id], chunk)
+        return chunk_id
     
     def _search_faiss(self, query_vector: List[float], n_results: int) -> List[MemoryChunk]:
         """Searches using FAISS."""
+        return self._search_faiss_batch([query_vector], n_results)[0]
+    
+    def _search_faiss_batch(self, query_vectors: List[List[float]],
+                            n_results: int) -> List[List[MemoryChunk]]:
+        """Searches using FAISS with one multi-row index.search call."""
         if self.index.ntotal == 0:
-            return []
+            return [[] for _ in query_vectors]
         
-        query = np.array(query_vector, dtype='float32').reshape(1, -1)
-        scores, indices = self.index.search(query, min(n_results, self.index.ntotal))
+        queries = np.asarray(query_vectors, dtype='float32').reshape(len(query_vectors), -1)
+        # Over-fetch by the tombstone count so deleted slots never cost live results
+        k = min(n_results + self.tombstones, self.index.ntotal)
+        scores, indices = self.index.search(queries, k)
+        return self._chunks_at(indices, n_results)
+    
+    def _search_faiss_filtered(self, query_vectors: List[List[float]], n_results: int,
+                               filters: EpisodicFilter) -> List[List[MemoryChunk]]:
+        """Searches FAISS restricted to the positions selected by ``filters`` (an IDSelector)."""
+        mask = self._field_index().mask(filters, len(self.chunk_ids))
+        selected = int(np.count_nonzero(mask))
+        if not selected:
+            return [[] for _ in query_vectors]
         
-        results = []
-        for idx in indices[0]:
-            if 0 <= idx < len(self.chunk_ids):
-                chunk_id = self.chunk_ids[idx]
-                chunk = self.id_to_chunk.get(chunk_id)
-                if chunk:
-                    results.append(chunk)
+        queries = np.asarray(query_vectors, dtype='float32').reshape(len(query_vectors), -1)
+        # Tombstones are never selected, so no over-fetch is needed
+        k = min(n_results, selected)
+        if self.shared_index:
+            scores, indices = self.index.search(queries, k, rows=np.flatnonzero(mask))
+        else:
+            bits = np.packbits(mask, bitorder='little')
+            selector = faiss.IDSelectorBitmap(len(mask), faiss.swig_ptr(bits))
+            if isinstance(self.index, faiss.IndexIVF):
+                params = faiss.SearchParametersIVF(sel=selector, nprobe=self.index.nprobe)
+            elif isinstance(self.index, faiss.IndexHNSW):
+                params = faiss.SearchParametersHNSW(sel=selector, efSearch=self.index.hnsw.efSearch)
+            else:
+                params = faiss.SearchParameters(sel=selector)
+            scores, indices = self.index.search(queries, k, params=params)
+        return self._chunks_at(indices, n_results)
+    
+    def _chunks_at(self, indices: "np.ndarray", n_results: int) -> List[List[MemoryChunk]]:
+        """Maps FAISS result positions to chunks, skipping misses and tombstones."""
+        all_results = []
+        for row in indices:
+            results = []
+            for idx in row:
+                if 0 <= idx < len(self.chunk_ids):
+                    chunk_id = self.chunk_ids[idx]
+                    chunk = self.id_to_chunk.get(chunk_id) if chunk_id is not None else None
+                    if chunk:
+                        results.append(chunk)
+            all_results.append(results[:n_results])
         
-        return results
+        return all_results
     
-    def _search_memory(self, query_vector: List[float], n_results: int) -> List[MemoryChunk]:
+    def _search_memory(self, query_vector: List[float], n_results: int,
+                       filters: Optional[EpisodicFilter] = None) -> List[MemoryChunk]:
         """Searches in-memory."""
+        if self.matrix is not None:
+            scores = self.matrix.scores(query_vector)
+            return [self.memory_store[chunk_id]
+                    for chunk_id, _ in self.matrix.top_k(scores, n_results)]
+        
         scored_chunks = []
         
         for chunk in self.memory_store.values():
+            if filters is not None and not filters.matches(chunk):
+                continue
             if chunk.embedding:
                 similarity = self._cosine_similarity(query_vector, chunk.embedding)
                 scored_chunks.append((similarity, chunk))
@@ -114,20 +1592,16 @@ class VectorDatabase:
         return [chunk for _, chunk in scored_chunks[:n_results]]
     
     def _generate_embedding(self, text: str) -> List[float]:
-        """Generates a simple hash-based embedding."""
-        import hashlib
-        
-        # Use text hash to generate a deterministic vector
-        hash_val = int(hashlib.md5(text.encode('utf-8')).hexdigest(), 16)
-        
-        # Generate a fixed-dimensional vector
-        vector = []
-        for i in range(self.dim):
-            vector.append(math.sin(hash_val * (i + 1)) * 0.5 + 0.5)
-        
-        # L2 normalization
-        norm = math.sqrt(sum(v * v for v in vector)) or 1.0
-        return [v / norm for v in vector]
+        """Generates the hash-based embedding InformationExtractor gives the same text."""
+        from .information_extractor import InformationExtractor
+        return InformationExtractor.generate_embedding(text)
+    
+    def _generate_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """Generates embeddings for many texts in one vectorized pass (each distinct text once)."""
+        from .information_extractor import InformationExtractor
+        unique = list(dict.fromkeys(texts))
+        embeddings = dict(zip(unique, InformationExtractor.generate_embeddings(unique)))
+        return [embeddings[text] for text in texts]
     
     def _cosine_similarity(self, vec1: List[float], vec2: List[float]) -> float:
         """Calculates cosine similarity."""
@@ -144,52 +1618,497 @@ class VectorDatabase:
         return dot_product / (norm1 * norm2)
 
 
+# (node id -> label, node id -> [(neighbor id, weight, edge label)]) exported by a graph
+GraphRows = Tuple[Dict[str, str], Dict[str, List[Tuple[str, float, str]]]]
+
+
+class GraphSnapshot:
+    """
+    Read-only CSR (compressed sparse row) view of one or more graphs.
+
+    Nodes are integer-indexed; row ``i`` lists the neighbors of ``node_ids[i]``
+    in ``indices[indptr[i]:indptr[i + 1]]``, with parallel ``weights``,
+    ``edge_labels`` (codes into ``edge_label_names``) and ``neighbor_labels``
+    (the neighbor's node label in the graph the edge came from, as codes into
+    ``label_names``). ``node_labels`` holds each node's own label code, or -1
+    for ids that only appear as edge endpoints.
+    """
+
+    def __init__(self, node_ids: List[str], node_labels: "np.ndarray",
+                 indptr: "np.ndarray", indices: "np.ndarray", weights: "np.ndarray",
+                 edge_labels: "np.ndarray", neighbor_labels: "np.ndarray",
+                 label_names: List[str], edge_label_names: List[str]):
+        self.node_ids = node_ids
+        self.node_index = {node_id: i for i, node_id in enumerate(node_ids)}
+        self.node_labels = node_labels
+        self.indptr = indptr
+        self.indices = indices
+        self.weights = weights
+        self.edge_labels = edge_labels
+        self.neighbor_labels = neighbor_labels
+        self.label_names = label_names
+        self.edge_label_names = edge_label_names
+
+    @property
+    def num_nodes(self) -> int:
+        return len(self.node_ids)
+
+    @property
+    def num_edges(self) -> int:
+        return len(self.indices)
+
+    @classmethod
+    def build(cls, graphs: List[GraphRows]) -> "GraphSnapshot":
+        """
+        Compiles graphs into one snapshot.
+        
+        Each graph is ``(node_labels, rows)`` where ``rows`` maps a node id to its
+        ``(neighbor id, weight, edge label)`` list. Rows of the same node are
+        concatenated in graph order, matching how activation merges neighbors.
+        """
+        node_ids: List[str] = []
+        node_index: Dict[str, int] = {}
+        label_codes: Dict[str, int] = {}
+        edge_label_codes: Dict[str, int] = {}
+        
+        def index_of(node_id: str) -> int:
+            i = node_index.get(node_id)
+            if i is None:
+                i = node_index[node_id] = len(node_ids)
+                node_ids.append(node_id)
+            return i
+        
+        for node_labels, rows in graphs:
+            for node_id in node_labels:
+                index_of(node_id)
+            for node_id, row in rows.items():
+                index_of(node_id)
+                for neighbor_id, _, _ in row:
+                    index_of(neighbor_id)
+        
+        n = len(node_ids)
+        node_label_array = np.full(n, -1, dtype=np.int32)
+        per_node: List[List[Tuple[int, float, int, int]]] = [[] for _ in range(n)]
+        for node_labels, rows in graphs:
+            for node_id, label in node_labels.items():
+                i = node_index[node_id]
+                if node_label_array[i] < 0:
+                    node_label_array[i] = label_codes.setdefault(label, len(label_codes))
+            for node_id, row in rows.items():
+                target = per_node[node_index[node_id]]
+                for neighbor_id, weight, edge_label in row:
+                    target.append((
+                        node_index[neighbor_id],
+                        weight,
+                        edge_label_codes.setdefault(edge_label, len(edge_label_codes)),
+                        label_codes.setdefault(node_labels[neighbor_id], len(label_codes)),
+                    ))
+        
+        counts = np.fromiter((len(row) for row in per_node), dtype=np.int64, count=n)
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(counts, out=indptr[1:])
+        flat = [entry for row in per_node for entry in row]
+        columns = list(zip(*flat)) if flat else [(), (), (), ()]
+        
+        return cls(
+            node_ids=node_ids,
+            node_labels=node_label_array,
+            indptr=indptr,
+            indices=np.asarray(columns[0], dtype=np.int64),
+            weights=np.asarray(columns[1], dtype=np.float64),
+            edge_labels=np.asarray(columns[2], dtype=np.int32),
+            neighbor_labels=np.asarray(columns[3], dtype=np.int32),
+            label_names=list(label_codes),
+            edge_label_names=list(edge_label_codes),
+        )
+
+    def neighbors(self, node_id: str) -> List[Tuple[str, float]]:
+        """Returns ``(neighbor id, weight)`` pairs of a node, in snapshot order."""
+        i = self.node_index.get(node_id)
+        if i is None:
+            return []
+        start, end = self.indptr[i], self.indptr[i + 1]
+        return [(self.node_ids[j], float(w))
+                for j, w in zip(self.indices[start:end], self.weights[start:end])]
+
+
+class SharedGraphStore:
+    """
+    Process-wide Neo4j state shared by every user's graphs.
+    
+    The driver (with its connection pool), the schema bookkeeping and one
+    flusher thread are shared, so connections are bounded by graph_pool_size
+    and background threads stay constant however many users are loaded. Each
+    GraphDatabase is a view scoped by its graph-name label that keeps only its
+    session, write buffer, change counters and CSR snapshot; graphs that are
+    not loaded can still be purged through purge_graph().
+    """
+    
+    def __init__(self):
+        self._driver = None
+        self._lock = threading.Lock()
+        # (driver id, graph name) pairs whose constraint has already been created
+        self._schema_ready = set()
+        # Graph -> monotonic time of its next background flush
+        self._flush_due: Dict["GraphDatabase", float] = {}
+        self._flush_wakeup = threading.Condition()
+        self._flusher: Optional[threading.Thread] = None
+    
+    def get_driver(self):
+        """Returns the shared driver, connecting on first use (None if unavailable)."""
+        with self._lock:
+            if self._driver is None and NEO4J_AVAILABLE:
+                config = get_config().database
+                try:
+                    driver = Neo4jGraphDatabase.driver(
+                        config.graph_uri,
+                        auth=(config.graph_user, config.graph_password),
+                        max_connection_pool_size=config.graph_pool_size
+                    )
+                    driver.verify_connectivity()
+                    self._driver = driver
+                    print(f"🔗 Shared Neo4j driver connected (pool size: {config.graph_pool_size})")
+                except Exception as e:
+                    print(f"⚠️ Neo4j connection failed: {e}")
+            return self._driver
+    
+    @property
+    def connected(self) -> bool:
+        """Whether the shared driver is open (get_driver() has succeeded)."""
+        return self._driver is not None
+    
+    def claim_schema(self, driver, graph_name: str) -> bool:
+        """Returns True the first time a graph's schema is requested on a driver."""
+        key = (id(driver), graph_name)
+        with self._lock:
+            if key in self._schema_ready:
+                return False
+            self._schema_ready.add(key)
+            return True
+    
+    def schedule_flush(self, graph: "GraphDatabase", delay: float):
+        """Flushes ``graph`` after ``delay`` seconds unless a flush is already scheduled."""
+        with self._flush_wakeup:
+            if graph in self._flush_due:
+                return
+            self._flush_due[graph] = time.monotonic() + delay
+            if self._flusher is None:
+                self._flusher = threading.Thread(
+                    target=self._run_flusher, daemon=True, name="graph-flusher")
+                self._flusher.start()
+            self._flush_wakeup.notify()
+    
+    def cancel_flush(self, graph: "GraphDatabase"):
+        """Drops ``graph``'s scheduled background flush, if any."""
+        with self._flush_wakeup:
+            self._flush_due.pop(graph, None)
+    
+    def flush_scheduled(self, graph: "GraphDatabase") -> bool:
+        """Whether a background flush of ``graph`` is pending."""
+        with self._flush_wakeup:
+            return graph in self._flush_due
+    
+    def _run_flusher(self):
+        """Flushes graphs as their deadlines pass (one thread for the whole process)."""
+        while True:
+            with self._flush_wakeup:
+                now = time.monotonic()
+                due = [graph for graph, at in self._flush_due.items() if at <= now]
+                for graph in due:
+                    del self._flush_due[graph]
+                if not due:
+                    timeout = min(self._flush_due.values(), default=now + 60.0) - now
+                    self._flush_wakeup.wait(timeout)
+                    continue
+            # Flushed outside the wakeup lock: a flush takes the graph's session lock
+            for graph in due:
+                graph._flush_quietly()
+    
+    def purge_graph(self, graph_name: str, driver=None):
+        """
+        Deletes every Neo4j node and relationship labelled with ``graph_name``,
+        whether or not a GraphDatabase for it is loaded. No-op without a driver.
+        """
+        driver = driver or self.get_driver()
+        if driver is None:
+            return
+        with driver.session() as session:
+            session.run(
+                f"MATCH (n:{GraphDatabase._quote(graph_name)}) DETACH DELETE n").consume()
+    
+    def close(self):
+        """Closes the shared driver; the next get_driver() reconnects."""
+        with self._lock:
+            driver, self._driver = self._driver, None
+            self._schema_ready.clear()
+        if driver is not None:
+            driver.close()
+
+
+graph_store = SharedGraphStore()
+
+
+def get_graph_store() -> SharedGraphStore:
+    """Returns the process-wide graph store."""
+    return graph_store
+
+
 class GraphDatabase:
     """Graph Database Interface - supports Neo4j and in-memory implementations."""
     
-    def __init__(self, graph_name: str, use_real_backend: bool = False):
+    # Most dropped upsert rows kept for inspection
+    DEAD_LETTER_LIMIT = 10000
+    
+    def __init__(self, graph_name: str, use_real_backend: bool = False, driver=None):
+        """
+        Args:
+            graph_name: Graph name.
+            use_real_backend: Whether to connect to Neo4j.
+            driver: An already-open Neo4j driver (or a compatible stand-in) to use
+                instead of the shared one from get_graph_store(). The caller
+                keeps ownership; close() never closes a driver.
+        """
         self.graph_name = graph_name
         self.use_real_backend = use_real_backend
         self.config = get_config().database
         
-        if use_real_backend and NEO4J_AVAILABLE:
+        # Bumped on every write; snapshots are rebuilt when it moves
+        self.version = 0
+        # Node id -> version of its last change (node rewritten or an incident edge added)
+        self.touched: Dict[str, int] = {}
+        self._snapshot: Optional[GraphSnapshot] = None
+        self._snapshot_version = -1
+        
+        # Neo4j upserts are buffered per label and written in one transaction
+        self._pending_nodes: Dict[str, List[Dict[str, Any]]] = {}
+        self._pending_relationships: Dict[str, List[Dict[str, Any]]] = {}
+        self._pending_count = 0
+        self._pending_since: Optional[float] = None
+        # Consecutive failed flushes; the shared flusher backs off exponentially
+        self._flush_failures = 0
+        # (kind, label, row) of upserts dropped after graph_flush_max_retries failed flushes
+        self.dead_letters: Deque[Tuple[str, str, Dict[str, Any]]] = deque(
+            maxlen=self.DEAD_LETTER_LIMIT)
+        # One long-lived session per graph, shared by reads and flushes
+        self._session = None
+        self._session_lock = threading.RLock()
+        # Every Neo4j node of this graph carries the graph name as a label, so
+        # per-user graphs sharing a database stay apart and id lookups hit an index
+        self.scope_label = self._quote(graph_name)
+        
+        if driver is not None:
+            self.driver = driver
+            print(f"🔗 Graph database attached to provided driver ({self.graph_name})")
+            self._ensure_schema()
+        elif use_real_backend and NEO4J_AVAILABLE:
             self._init_neo4j()
         else:
             self._init_memory_backend()
     
     def _init_neo4j(self):
-        """Initializes the Neo4j backend."""
+        """Initializes the Neo4j backend on the shared driver."""
+        self.driver = get_graph_store().get_driver()
+        if self.driver is None:
+            print(f"⚠️ Neo4j unavailable, falling back to in-memory backend ({self.graph_name})")
+            self._init_memory_backend()
+            return
+        print(f"🔗 Neo4j graph view ready ({self.graph_name})")
+        self._ensure_schema()
+    
+    def _ensure_schema(self):
+        """Creates the graph's uniqueness constraint on node ids (index-backed) once per process."""
+        if not get_graph_store().claim_schema(self.driver, self.graph_name):
+            return
+        name = self._quote(f"dmmr_{self.graph_name}_id")
+        query = (
+            f"CREATE CONSTRAINT {name} IF NOT EXISTS "
+            f"FOR (n:{self.scope_label}) REQUIRE n.id IS UNIQUE"
+        )
         try:
-            self.driver = GraphDatabase.driver(
-                self.config.graph_uri,
-                auth=(self.config.graph_user, self.config.graph_password)
-            )
-            self.driver.verify_connectivity()
-            print(f"🔗 Neo4j graph database connected successfully ({self.graph_name})")
+            with self.driver.session() as session:
+                session.run(query).consume()
         except Exception as e:
-            print(f"⚠️ Neo4j connection failed, falling back to in-memory backend: {e}")
-            self._init_memory_backend()
+            print(f"⚠️ Could not create Neo4j constraint for {self.graph_name}: {e}")
+    
+    @staticmethod
+    def _quote(name: str) -> str:
+        """Quotes a label or relationship type for interpolation into Cypher."""
+        return "`" + name.replace("`", "``") + "`"
     
     def _init_memory_backend(self):
         """Initializes the in-memory backend."""
         self.nodes = {}
-        self.edges = []
+        # Distinct edges keyed by identity (source, target, label); repeats are merged
+        self.edges: Dict[Tuple[str, str, str], Relationship] = {}
+        # Bidirectional adjacency: node id -> [(neighbor id, edge)] in edge order
+        self.adjacency: Dict[str, List[Tuple[str, Relationship]]] = {}
         self.driver = None
         print(f"🧠 In-memory graph database initialized ({self.graph_name})")
     
     def add_node(self, node: Node):
         """Adds a node."""
+        self.version += 1
+        self.touched[node.id] = self.version
         if self.driver:
             self._add_node_neo4j(node)
         else:
             self.nodes[node.id] = node
+            # Edges may predate the node; its neighbors' neighbor lists now include it
+            for neighbor_id, _ in self.adjacency.get(node.id, ()):
+                self.touched[neighbor_id] = self.version
     
     def add_relationship(self, rel: Relationship):
         """Adds a relationship."""
+        self.version += 1
+        self.touched[rel.source_id] = self.version
+        self.touched[rel.target_id] = self.version
         if self.driver:
             self._add_relationship_neo4j(rel)
         else:
-            self.edges.append(rel)
+            self._add_relationship_memory(rel)
+    
+    def changed_since(self, node_ids, version: int) -> bool:
+        """
+        Whether any of ``node_ids`` changed after ``version`` (only writes made
+        through this instance are seen, not other processes sharing a Neo4j graph).
+        """
+        touched = self.touched
+        return any(touched.get(node_id, -1) > version for node_id in node_ids)
+    
+    def flush(self):
+        """
+        Writes buffered Neo4j upserts in a single transaction (no-op in memory).
+        
+        A failed write is put back in front of the buffer and re-raised; the flush
+        timer retries it with exponential backoff. Once it has failed more than
+        graph_flush_max_retries times in a row, each label's rows are written in
+        their own transaction and the groups that still fail are logged and moved
+        to ``dead_letters`` instead of being retried, so the buffer cannot grow forever.
+        """
+        with self._session_lock:
+            # This flush covers whatever the scheduled background flush would have written
+            get_graph_store().cancel_flush(self)
+            if not self._pending_count:
+                return
+            nodes, relationships = self._pending_nodes, self._pending_relationships
+            count = self._pending_count
+            self._pending_nodes, self._pending_relationships = {}, {}
+            self._pending_count, self._pending_since = 0, None
+            try:
+                self._get_session().execute_write(self._write_pending, nodes, relationships)
+                self._flush_failures = 0
+            except Exception:
+                self._reset_session()
+                self._flush_failures += 1
+                if self._flush_failures > self.config.graph_flush_max_retries:
+                    self._flush_failures = 0
+                    self._write_or_drop(nodes, relationships)
+                    return
+                # Put the rows back in front so the next flush retries them in order
+                for label, rows in nodes.items():
+                    self._pending_nodes[label] = rows + self._pending_nodes.get(label, [])
+                for label, rows in relationships.items():
+                    self._pending_relationships[label] = (
+                        rows + self._pending_relationships.get(label, []))
+                self._pending_count += count
+                self._pending_since = self._pending_since or time.monotonic()
+                self._schedule_flush()
+                raise
+    
+    def _write_or_drop(self, nodes: Dict[str, List[Dict[str, Any]]],
+                       relationships: Dict[str, List[Dict[str, Any]]]):
+        """Writes each label's rows in its own transaction; groups that fail are dead-lettered."""
+        groups = [("node", label, {label: rows}, {}) for label, rows in nodes.items()]
+        groups += [("relationship", label, {}, {label: rows})
+                   for label, rows in relationships.items()]
+        for kind, label, group_nodes, group_relationships in groups:
+            try:
+                self._get_session().execute_write(
+                    self._write_pending, group_nodes, group_relationships)
+            except Exception as e:
+                self._reset_session()
+                rows = (group_nodes or group_relationships)[label]
+                self.dead_letters.extend((kind, label, row) for row in rows)
+                print(f"⚠️ Dropped {len(rows)} {kind} upserts ({label}) from {self.graph_name} "
+                      f"after repeated flush failures: {e}")
+    
+    def _flush_quietly(self):
+        """Flushes, logging a failure instead of raising (the rows stay buffered for the timer)."""
+        try:
+            self.flush()
+        except Exception as e:
+            print(f"⚠️ Graph flush failed ({self.graph_name}), retrying later: {e}")
+    
+    def _schedule_flush(self):
+        """Schedules a background flush on the shared flusher unless one is pending."""
+        delay = self.config.graph_flush_interval * (2 ** self._flush_failures)
+        get_graph_store().schedule_flush(self, delay)
+    
+    def close(self):
+        """Flushes pending writes and releases the session (the driver is shared)."""
+        if not self.driver:
+            return
+        try:
+            self.flush()
+        finally:
+            get_graph_store().cancel_flush(self)
+            self._reset_session()
+    
+    def purge(self):
+        """Deletes every node and relationship of this graph (pending writes are dropped)."""
+        self.version += 1
+        self.touched.clear()
+        if not self.driver:
+            self.nodes.clear()
+            self.edges.clear()
+            self.adjacency.clear()
+            return
+        get_graph_store().cancel_flush(self)
+        with self._session_lock:
+            self._pending_nodes, self._pending_relationships = {}, {}
+            self._pending_count, self._pending_since = 0, None
+            self._flush_failures = 0
+            try:
+                self._get_session().run(f"MATCH (n:{self.scope_label}) DETACH DELETE n").consume()
+            finally:
+                self._reset_session()
+    
+    def get_weighted_neighbors_many(
+            self, node_ids: List[str]) -> Dict[str, List[Tuple[Node, float]]]:
+        """Gets weighted neighbors of a whole BFS frontier (one query on Neo4j)."""
+        if self.driver:
+            return self._get_weighted_neighbors_many_neo4j(node_ids)
+        return {node_id: self._get_weighted_neighbors_memory(node_id) for node_id in node_ids}
+    
+    def top_degree_nodes(self, k: int) -> List[str]:
+        """Ids of the ``k`` nodes with the most relationships (degree centrality)."""
+        if k <= 0:
+            return []
+        if self.driver:
+            return self._top_degree_nodes_neo4j(k)
+        connected = (node_id for node_id, edges in self.adjacency.items()
+                     if edges and node_id in self.nodes)
+        return heapq.nlargest(k, connected, key=lambda node_id: len(self.adjacency[node_id]))
+    
+    def snapshot_rows(self) -> GraphRows:
+        """Exports ``(node labels, adjacency rows)`` for GraphSnapshot.build."""
+        if self.driver:
+            return self._snapshot_rows_neo4j()
+        
+        node_labels = {node_id: node.label for node_id, node in self.nodes.items()}
+        rows = {
+            node_id: [(neighbor_id, edge.weight, edge.label)
+                      for neighbor_id, edge in row if neighbor_id in self.nodes]
+            for node_id, row in self.adjacency.items()
+        }
+        return node_labels, rows
+    
+    def freeze(self) -> "GraphSnapshot":
+        """Returns a CSR snapshot of this graph, rebuilt only after writes."""
+        if self._snapshot is None or self._snapshot_version != self.version:
+            self._snapshot = GraphSnapshot.build([self.snapshot_rows()])
+            self._snapshot_version = self.version
+        return self._snapshot
     
     def get_node(self, node_id: str) -> Optional[Node]:
         """Gets a node."""
@@ -213,104 +2132,239 @@ class GraphDatabase:
             return self._get_weighted_neighbors_memory(node_id)
     
     # Neo4j implementations
+    def _get_session(self):
+        """Returns the long-lived session, opening it on first use."""
+        if self._session is None:
+            self._session = self.driver.session()
+        return self._session
+    
+    def _reset_session(self):
+        """Drops the current session; the next query opens a fresh one."""
+        with self._session_lock:
+            session, self._session = self._session, None
+        if session is not None:
+            try:
+                session.close()
+            except Exception:
+                pass
+    
+    def _read(self, query: str, parameters: Optional[Dict[str, Any]] = None) -> List[Any]:
+        """
+        Flushes pending writes, then runs a read on the shared session. While a
+        failed flush is waiting for its retry the read goes ahead without it.
+        """
+        with self._session_lock:
+            if not self._flush_failures:
+                self._flush_quietly()
+            try:
+                return list(self._get_session().run(query, parameters or {}))
+            except Exception:
+                self._reset_session()
+                raise
+    
+    def _buffer_write(self, pending: Dict[str, List[Dict[str, Any]]], label: str,
+                      row: Dict[str, Any]):
+        """
+        Queues an upsert row; flushes on batch size, or from the flush timer once
+        the oldest row is graph_flush_interval old (close() flushes the rest).
+        """
+        with self._session_lock:
+            pending.setdefault(label, []).append(row)
+            self._pending_count += 1
+            if self._pending_since is None:
+                self._pending_since = time.monotonic()
+                self._schedule_flush()
+            if self._flush_failures:
+                return
+            if (self._pending_count >= self.config.graph_write_batch_size
+                    or time.monotonic() - self._pending_since >= self.config.graph_flush_interval):
+                self._flush_quietly()
+    
+    def _write_pending(self, tx, nodes: Dict[str, List[Dict[str, Any]]],
+                       relationships: Dict[str, List[Dict[str, Any]]]):
+        """Writes buffered rows with one UNWIND per label (nodes first so edges can match them)."""
+        scope = self.scope_label
+        for label, rows in nodes.items():
+            tx.run(
+                "UNWIND $rows AS row "
+                f"MERGE (n:{scope} {{id: row.id}}) "
+                f"SET n:{self._quote(label)}, n += row.properties, n.embedding = row.embedding",
+                {"rows": rows}
+            )
+        for label, rows in relationships.items():
+            # MERGE keeps one edge per identity; repeats accumulate like merge_weights
+            tx.run(
+                "UNWIND $rows AS row "
+                f"MATCH (s:{scope} {{id: row.source_id}}), (t:{scope} {{id: row.target_id}}) "
+                f"MERGE (s)-[r:{self._quote(label)}]->(t) "
+                "ON CREATE SET r.count = 0 "
+                "SET r += row.properties, r.count = r.count + 1, r.last_seen = row.last_seen, "
+                "r.weight = CASE "
+                "WHEN r.weight IS NULL THEN row.weight "
+                "WHEN r.weight >= 0 AND r.weight <= 1 AND row.weight >= 0 AND row.weight <= 1 "
+                "THEN 1 - (1 - r.weight) * (1 - row.weight) "
+                "WHEN r.weight > row.weight THEN r.weight ELSE row.weight END",
+                {"rows": rows}
+            )
+    
     def _add_node_neo4j(self, node: Node):
-        """Adds a node to Neo4j."""
-        query = (
-            f"MERGE (n:{node.label} {{id: $id}}) "
-            "SET n += $properties, n.embedding = $embedding"
-        )
-        with self.driver.session() as session:
-            session.run(query, {
-                "id": node.id,
-                "properties": node.properties,
-                "embedding": node.embedding or []
-            })
+        """Buffers a node upsert for the next batched write."""
+        self._buffer_write(self._pending_nodes, node.label, {
+            "id": node.id,
+            "properties": node.properties,
+            "embedding": node.embedding or []
+        })
     
     def _add_relationship_neo4j(self, rel: Relationship):
-        """Adds a relationship to Neo4j."""
-        query = (
-            "MATCH (s {id: $source_id}), (t {id: $target_id}) "
-            f"MERGE (s)-[r:{rel.label}]->(t) "
-            "SET r += $properties, r.weight = $weight"
+        """Buffers a relationship upsert for the next batched write."""
+        self._buffer_write(self._pending_relationships, rel.label, {
+            "source_id": rel.source_id,
+            "target_id": rel.target_id,
+            "properties": rel.properties,
+            "weight": rel.weight,
+            "last_seen": rel.created_at.isoformat()
+        })
+    
+    def _node_from_neo4j(self, n) -> Node:
+        """Converts a Neo4j node to a Node, dropping the graph scope label."""
+        labels = sorted(label for label in n.labels if label != self.graph_name)
+        return Node(
+            id=n["id"],
+            label=labels[0] if labels else self.graph_name,
+            properties=dict(n),
+            embedding=n.get("embedding")
         )
-        with self.driver.session() as session:
-            session.run(query, {
-                "source_id": rel.source_id,
-                "target_id": rel.target_id,
-                "properties": rel.properties,
-                "weight": rel.weight
-            })
     
     def _get_node_neo4j(self, node_id: str) -> Optional[Node]:
         """Gets a node from Neo4j."""
-        query = "MATCH (n {id: $node_id}) RETURN n"
-        with self.driver.session() as session:
-            result = session.run(query, {"node_id": node_id})
-            record = result.single()
-            if record:
-                n = record["n"]
-                return Node(
-                    id=n["id"],
-                    label=list(n.labels)[0],
-                    properties=dict(n),
-                    embedding=n.get("embedding")
-                )
+        query = f"MATCH (n:{self.scope_label} {{id: $node_id}}) RETURN n"
+        records = self._read(query, {"node_id": node_id})
+        if records:
+            return self._node_from_neo4j(records[0]["n"])
         return None
     
     def _get_neighbors_neo4j(self, node_id: str) -> List[Node]:
         """Gets neighbors from Neo4j."""
-        query = "MATCH (n {id: $node_id})-[]-(neighbor) RETURN neighbor"
-        neighbors = []
-        with self.driver.session() as session:
-            result = session.run(query, {"node_id": node_id})
-            for record in result:
-                n = record["neighbor"]
-                neighbors.append(Node(
-                    id=n["id"],
-                    label=list(n.labels)[0],
-                    properties=dict(n),
-                    embedding=n.get("embedding")
-                ))
-        return neighbors
+        query = (
+            f"MATCH (n:{self.scope_label} {{id: $node_id}})-[]-(neighbor:{self.scope_label}) "
+            "RETURN neighbor"
+        )
+        return [self._node_from_neo4j(record["neighbor"])
+                for record in self._read(query, {"node_id": node_id})]
     
     def _get_weighted_neighbors_neo4j(self, node_id: str) -> List[Tuple[Node, float]]:
         """Gets weighted neighbors from Neo4j."""
-        query = "MATCH (n {id: $node_id})-[r]-(neighbor) RETURN neighbor, r.weight as weight"
-        neighbors = []
-        with self.driver.session() as session:
-            result = session.run(query, {"node_id": node_id})
-            for record in result:
-                n = record["neighbor"]
-                weight = record["weight"] or 1.0
-                node = Node(
-                    id=n["id"],
-                    label=list(n.labels)[0],
-                    properties=dict(n),
-                    embedding=n.get("embedding")
-                )
-                neighbors.append((node, weight))
+        query = (
+            f"MATCH (n:{self.scope_label} {{id: $node_id}})-[r]-(neighbor:{self.scope_label}) "
+            "RETURN neighbor, r.weight as weight"
+        )
+        return [(self._node_from_neo4j(record["neighbor"]), record["weight"] or 1.0)
+                for record in self._read(query, {"node_id": node_id})]
+    
+    def _top_degree_nodes_neo4j(self, k: int) -> List[str]:
+        """Ranks nodes by relationship count in Neo4j."""
+        query = (
+            f"MATCH (n:{self.scope_label})-[r]-(:{self.scope_label}) "
+            "RETURN n.id AS id, count(r) AS degree ORDER BY degree DESC LIMIT $k"
+        )
+        return [record["id"] for record in self._read(query, {"k": k})]
+    
+    def _get_weighted_neighbors_many_neo4j(
+            self, node_ids: List[str]) -> Dict[str, List[Tuple[Node, float]]]:
+        """Gets weighted neighbors of many nodes with a single UNWIND query."""
+        neighbors: Dict[str, List[Tuple[Node, float]]] = {node_id: [] for node_id in node_ids}
+        if not neighbors:
+            return neighbors
+        
+        query = (
+            "UNWIND $node_ids AS node_id "
+            f"MATCH (n:{self.scope_label} {{id: node_id}})-[r]-(neighbor:{self.scope_label}) "
+            "RETURN node_id, neighbor, r.weight AS weight"
+        )
+        for record in self._read(query, {"node_ids": list(neighbors)}):
+            neighbors[record["node_id"]].append(
+                (self._node_from_neo4j(record["neighbor"]), record["weight"] or 1.0)
+            )
         return neighbors
     
+    def _snapshot_rows_neo4j(self) -> GraphRows:
+        """Exports the whole graph from Neo4j in two queries."""
+        node_labels: Dict[str, str] = {}
+        rows: Dict[str, List[Tuple[str, float, str]]] = {}
+        scope = self.scope_label
+        nodes = self._read(
+            f"MATCH (n:{scope}) RETURN n.id AS id, "
+            "[label IN labels(n) WHERE label <> $graph_name] AS labels",
+            {"graph_name": self.graph_name}
+        )
+        for record in nodes:
+            labels = sorted(record["labels"])
+            node_labels[record["id"]] = labels[0] if labels else self.graph_name
+        edges = self._read(
+            f"MATCH (s:{scope})-[r]->(t:{scope}) "
+            "RETURN s.id AS source, t.id AS target, r.weight AS weight, type(r) AS label"
+        )
+        for record in edges:
+            source, target = record["source"], record["target"]
+            weight, label = record["weight"] or 1.0, record["label"]
+            rows.setdefault(source, []).append((target, weight, label))
+            if target != source:
+                rows.setdefault(target, []).append((source, weight, label))
+        return node_labels, rows
+    
     # In-memory implementations
+    @staticmethod
+    def merge_weights(old: float, new: float) -> float:
+        """
+        Accumulates the weight of a repeated edge.
+        
+        Weights in [0, 1] combine as a probabilistic OR, so repeats strengthen
+        an edge without ever pushing it past 1.0; otherwise the larger weight wins.
+        """
+        if 0.0 <= old <= 1.0 and 0.0 <= new <= 1.0:
+            return 1.0 - (1.0 - old) * (1.0 - new)
+        return max(old, new)
+    
+    def _add_relationship_memory(self, rel: Relationship):
+        """Inserts a new edge or merges a repeat into the existing one."""
+        key = (rel.source_id, rel.target_id, rel.label)
+        existing = self.edges.get(key)
+        last_seen = rel.created_at.isoformat()
+        
+        if existing is None:
+            rel.properties.setdefault("count", 1)
+            rel.properties["last_seen"] = last_seen
+            self.edges[key] = rel
+            self._index_edge(rel)
+            return
+        
+        count = existing.properties.get("count", 1)
+        existing.properties.update(rel.properties)
+        existing.properties["count"] = count + 1
+        existing.properties["last_seen"] = last_seen
+        existing.weight = self.merge_weights(existing.weight, rel.weight)
+    
+    def _index_edge(self, rel: Relationship):
+        """Records an edge in the adjacency map of both endpoints."""
+        self.adjacency.setdefault(rel.source_id, []).append((rel.target_id, rel))
+        if rel.target_id != rel.source_id:
+            self.adjacency.setdefault(rel.target_id, []).append((rel.source_id, rel))
+    
     def _get_neighbors_memory(self, node_id: str) -> List[Node]:
         """Gets neighbors from in-memory store."""
-        neighbors = []
-        for edge in self.edges:
-            if edge.source_id == node_id and edge.target_id in self.nodes:
-                neighbors.append(self.nodes[edge.target_id])
-            elif edge.target_id == node_id and edge.source_id in self.nodes:
-                neighbors.append(self.nodes[edge.source_id])
-        return neighbors
+        return [
+            self.nodes[neighbor_id]
+            for neighbor_id, _ in self.adjacency.get(node_id, ())
+            if neighbor_id in self.nodes
+        ]
     
     def _get_weighted_neighbors_memory(self, node_id: str) -> List[Tuple[Node, float]]:
         """Gets weighted neighbors from in-memory store."""
-        neighbors = []
-        for edge in self.edges:
-            if edge.source_id == node_id and edge.target_id in self.nodes:
-                neighbors.append((self.nodes[edge.target_id], edge.weight))
-            elif edge.target_id == node_id and edge.source_id in self.nodes:
-                neighbors.append((self.nodes[edge.source_id], edge.weight))
-        return neighbors
+        return [
+            (self.nodes[neighbor_id], edge.weight)
+            for neighbor_id, edge in self.adjacency.get(node_id, ())
+            if neighbor_id in self.nodes
+        ]
 
 
 class MultipleMemorySystems:
@@ -340,16 +2394,112 @@ class MultipleMemorySystems:
             use_real_backend=use_real_backends
         )
         
+        # Combined CSR snapshot of the semantic + procedural graphs
+        self._snapshot: Optional[GraphSnapshot] = None
+        self._snapshot_versions = (-1, -1)
+        
         print("✅ Multiple memory systems initialized successfully.")
     
+    def get_all_weighted_neighbors_many(
+            self, node_ids: List[str]) -> Dict[str, List[Tuple[Node, float]]]:
+        """Gets semantic then procedural weighted neighbors for a whole frontier."""
+        semantic = self.semantic.get_weighted_neighbors_many(node_ids)
+        procedural = self.procedural.get_weighted_neighbors_many(node_ids)
+        return {node_id: semantic[node_id] + procedural[node_id] for node_id in semantic}
+    
+    @property
+    def has_remote_graph(self) -> bool:
+        """Whether either graph is served by a remote backend (neighbor fetches are I/O)."""
+        return bool(self.semantic.driver or self.procedural.driver)
+    
+    @property
+    def graph_versions(self) -> Tuple[int, int]:
+        """(semantic, procedural) change counters; bumped by every node/relationship write."""
+        return self.semantic.version, self.procedural.version
+    
+    def freeze(self) -> GraphSnapshot:
+        """
+        Compiles the semantic and procedural graphs into one CSR snapshot.
+        
+        Neighbors of a node are semantic first, then procedural, as in
+        ActivationEngine._get_all_neighbors. Cached until either graph changes.
+        """
+        versions = self.graph_versions
+        if self._snapshot is None or self._snapshot_versions != versions:
+            self._snapshot = GraphSnapshot.build([
+                self.semantic.snapshot_rows(),
+                self.procedural.snapshot_rows()
+            ])
+            self._snapshot_versions = versions
+        return self._snapshot
+    
+    def flush(self):
+        """Writes buffered semantic and procedural graph upserts."""
+        self.semantic.flush()
+        self.procedural.flush()
+    
+    def save(self):
+        """Persists episodic memory snapshots so the next start comes up warm."""
+        self.flush()
+        self.episodic.save()
+    
+    def close(self):
+        """Flushes graph writes and releases this user's sessions and shared-index slice."""
+        self.semantic.close()
+        self.procedural.close()
+        self.episodic.close()
+    
+    def purge(self):
+        """Deletes this user's memories: both graphs and the episodic collection with its files."""
+        self.semantic.purge()
+        self.procedural.purge()
+        self.episodic.purge()
+        self._snapshot = None
+    
     # Episodic Memory Interface
     def add_to_episodic(self, chunk: MemoryChunk):
         """Adds a chunk to episodic memory."""
         self.episodic.add(chunk)
     
-    def search_episodic_by_vector(self, query_vector: List[float], n_results: int = 3) -> List[MemoryChunk]:
-        """Searches episodic memory by vector."""
-        return self.episodic.search(query_vector, n_results)
+    def add_to_episodic_batch(self, chunks: List[MemoryChunk]):
+        """Adds many chunks to episodic memory in one bulk append."""
+        self.episodic.add_batch(chunks)
+    
+    def promote_episodic(self, chunk_ids: List[str]) -> int:
+        """Pulls episodic chunks into the hot tier ahead of use."""
+        return self.episodic.promote(chunk_ids)
+    
+    def delete_from_episodic(self, chunk_id: str) -> bool:
+        """Removes a chunk from episodic memory."""
+        return self.episodic.delete(chunk_id)
+    
+    def update_in_episodic(self, chunk: MemoryChunk):
+        """Replaces a chunk in episodic memory."""
+        self.episodic.update(chunk)
+    
+    def compact_episodic(self):
+        """Reclaims the index space of deleted episodic chunks."""
+        self.episodic.compact()
+    
+    def get_retention_stats(self) -> Optional[Dict[str, Any]]:
+        """Gets episodic retention statistics (None when no cap is configured)."""
+        if self.episodic.retention is None:
+            return None
+        return self.episodic.retention.get_stats()
+    
+    def get_tier_stats(self) -> Optional[Dict[str, Any]]:
+        """Gets episodic hot/cold tier hit counters (None when tiering is disabled)."""
+        return self.episodic.get_tier_stats()
+    
+    def search_episodic_by_vector(self, query_vector: List[float], n_results: int = 3,
+                                  filters: Optional[EpisodicFilter] = None) -> List[MemoryChunk]:
+        """Searches episodic memory by vector, optionally restricted by ``filters``."""
+        return self.episodic.search(query_vector, n_results, filters)
+    
+    def search_batch(self, query_vectors: List[List[float]], n_results: int = 3,
+                     filters: Optional[EpisodicFilter] = None) -> List[List[MemoryChunk]]:
+        """Searches episodic memory with many query vectors in one pass."""
+        return self.episodic.search_batch(query_vectors, n_results, filters)
     
     # Semantic Memory Interface
     def add_semantic_node(self, node: Node):
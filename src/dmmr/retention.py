@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+"""
+Retention Policy - Keeps each user's episodic memory under count and byte caps.
+Memories with the lowest recency/significance are evicted first, in small
+batches on a background thread.
+"""
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from .config import get_config, RetentionConfig
+from .data_models import MemoryChunk
+from .score_calculator import ScoreCalculator
+
+_score_calculator: Optional[ScoreCalculator] = None
+_score_calculator_lock = threading.Lock()
+
+
+def get_score_calculator() -> ScoreCalculator:
+    """Returns the ScoreCalculator shared by all retention policies."""
+    global _score_calculator
+    with _score_calculator_lock:
+        if _score_calculator is None:
+            _score_calculator = ScoreCalculator()
+        return _score_calculator
+
+
+class RetentionPolicy:
+    """
+    Enforces the retention caps of one episodic collection.
+
+    The store must provide ``collection_name``, ``count()``, ``iter_chunks()``,
+    ``chunk_nbytes()`` and ``evict()`` (VectorDatabase does). Byte usage is a
+    running estimate between runs; every run recomputes it exactly.
+    """
+
+    def __init__(self, store, config: Optional[RetentionConfig] = None):
+        self.store = store
+        self.config = config or get_config().retention
+        self.scorer = get_score_calculator()
+        self._bytes: Optional[int] = None
+        self._running = False
+        self._lock = threading.Lock()
+        self.stats = {'runs': 0, 'evicted_chunks': 0, 'evicted_bytes': 0}
+
+    @staticmethod
+    def is_enabled(config: RetentionConfig) -> bool:
+        """Whether any cap is configured."""
+        return bool(config.max_episodic_chunks or config.max_episodic_bytes)
+
+    def note_added(self, chunks: List[MemoryChunk], replaced: Sequence[MemoryChunk] = ()):
+        """
+        Accounts for newly stored chunks and schedules a run if a cap is exceeded.
+        ``replaced`` are the records the new chunks overwrote (same id), whose bytes are released.
+        """
+        if self.config.max_episodic_bytes:
+            added = sum(self.store.chunk_nbytes(chunk) for chunk in chunks)
+            added -= sum(self.store.chunk_nbytes(chunk) for chunk in replaced)
+            with self._lock:
+                if self._bytes is not None:
+                    self._bytes += added
+        self.maybe_run()
+
+    def over_budget(self) -> bool:
+        """Whether the collection currently exceeds a cap."""
+        config = self.config
+        if config.max_episodic_chunks and self.store.count() > config.max_episodic_chunks:
+            return True
+        if config.max_episodic_bytes:
+            if self._bytes is None:
+                self._bytes = sum(self.store.chunk_nbytes(chunk)
+                                  for _, chunk in self.store.iter_chunks())
+            return self._bytes > config.max_episodic_bytes
+        return False
+
+    def _may_be_over_budget(self) -> bool:
+        """Cheap check from the count and the byte estimate (an unknown estimate counts as over)."""
+        config = self.config
+        if config.max_episodic_chunks and self.store.count() > config.max_episodic_chunks:
+            return True
+        if config.max_episodic_bytes:
+            return self._bytes is None or self._bytes > config.max_episodic_bytes
+        return False
+
+    def maybe_run(self):
+        """Starts a background run when possibly over budget and none is in progress."""
+        with self._lock:
+            if self._running or not self._may_be_over_budget():
+                return
+            self._running = True
+        threading.Thread(target=self._run_in_background, daemon=True,
+                         name=f"retention-{self.store.collection_name}").start()
+
+    def _run_in_background(self):
+        try:
+            self.run()
+        except Exception as e:
+            print(f"⚠️ Retention run failed ({self.store.collection_name}): {e}")
+        finally:
+            self._running = False
+
+    def select_victims(self) -> List[Tuple[str, int]]:
+        """
+        Picks ``(chunk_id, nbytes)`` pairs to evict, lowest retention score first,
+        until the collection is back under ``low_water_ratio`` of every cap.
+        """
+        config = self.config
+        scored = []
+        total_bytes = 0
+        for chunk_id, chunk in self.store.iter_chunks():
+            nbytes = self.store.chunk_nbytes(chunk)
+            total_bytes += nbytes
+            score = self.scorer.calculate_retention_score(chunk, config.recency_weight)
+            scored.append((score, chunk_id, nbytes))
+        with self._lock:
+            self._bytes = total_bytes
+
+        count_target = bytes_target = None
+        if config.max_episodic_chunks:
+            count_target = int(config.max_episodic_chunks * config.low_water_ratio)
+        if config.max_episodic_bytes:
+            bytes_target = int(config.max_episodic_bytes * config.low_water_ratio)
+
+        # Stable sort: equal scores are evicted in storage (oldest-first) order
+        scored.sort(key=lambda item: item[0])
+        victims = []
+        count = len(scored)
+        for _, chunk_id, nbytes in scored:
+            over_count = count_target is not None and count > count_target
+            over_bytes = bytes_target is not None and total_bytes > bytes_target
+            if not (over_count or over_bytes):
+                break
+            victims.append((chunk_id, nbytes))
+            count -= 1
+            total_bytes -= nbytes
+        return victims
+
+    def run(self) -> int:
+        """Evicts down to the low-water mark in batches; returns the number of chunks evicted."""
+        if not self.over_budget():
+            return 0
+
+        victims = self.select_victims()
+        batch_size = max(1, self.config.eviction_batch_size)
+        evicted = 0
+        for start in range(0, len(victims), batch_size):
+            batch = victims[start:start + batch_size]
+            # The store takes its lock per batch, so searches interleave with eviction
+            removed = self.store.evict([chunk_id for chunk_id, _ in batch])
+            with self._lock:
+                if removed == len(batch):
+                    freed = sum(nbytes for _, nbytes in batch)
+                    if self._bytes is not None:
+                        self._bytes -= freed
+                else:
+                    # Some victims were deleted meanwhile; recount on the next check
+                    freed = 0
+                    self._bytes = None
+            evicted += removed
+            self.stats['evicted_bytes'] += freed
+
+        self.stats['runs'] += 1
+        self.stats['evicted_chunks'] += evicted
+        if evicted:
+            print(f"🧹 Retention evicted {evicted} chunks ({self.store.collection_name})")
+        return evicted
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Gets retention statistics."""
+        return {
+            **self.stats,
+            'chunks': self.store.count(),
+            'estimated_bytes': self._bytes,
+            'max_chunks': self.config.max_episodic_chunks,
+            'max_bytes': self.config.max_episodic_bytes
+        }
@@ -126,6 +126,21 @@ class ScoreCalculator:
         
         return new_score
     
+    def calculate_retention_score(self, chunk: MemoryChunk, recency_weight: float = 0.5) -> float:
+        """
+        Calculates how strongly a memory should be kept when storage is capped.
+        
+        Args:
+            chunk: The memory chunk.
+            recency_weight: Share of the score given to recency; the rest is significance.
+            
+        Returns:
+            Retention score (0.0 - 1.0); the lowest scores are evicted first.
+        """
+        recency = self._calculate_recency_score(chunk)
+        significance = max(0.0, min(1.0, chunk.significance_score))
+        return recency_weight * recency + (1.0 - recency_weight) * significance
+    
     def _calculate_recency_score(self, chunk: MemoryChunk) -> float:
         """Calculates the recency score."""
         try:
@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+"""
+Shared test fixtures, including an in-process stand-in for the Neo4j driver
+that records every query it receives.
+"""
+import sys
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import pytest
+
+# Make `src.dmmr` importable when pytest is run from the project root
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+
+class FakeNeo4jNode(dict):
+    """Property map with the ``labels`` attribute of a neo4j.graph.Node."""
+    
+    def __init__(self, labels, **properties):
+        super().__init__(**properties)
+        self.labels = frozenset(labels)
+
+
+class FakeResult(list):
+    """Records of one query; ``consume()`` is a no-op."""
+    
+    def consume(self):
+        return None
+
+
+class FakeNeo4jSession:
+    """Answers the queries GraphDatabase issues from the driver's in-memory graph."""
+    
+    def __init__(self, driver: "FakeNeo4jDriver"):
+        self.driver = driver
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+    
+    def close(self):
+        pass
+    
+    def run(self, query: str, parameters=None) -> FakeResult:
+        driver = self.driver
+        driver.queries.append(query)
+        parameters = parameters or {}
+        if query.startswith("CREATE CONSTRAINT"):
+            return FakeResult()
+        if query.endswith("DETACH DELETE n"):
+            label = driver.graph_name.replace("`", "``")
+            if f"(n:`{label}`)" in query:
+                driver.nodes.clear()
+                driver.adjacency.clear()
+            return FakeResult()
+        if query.startswith("UNWIND $node_ids"):
+            return FakeResult(
+                {"node_id": node_id, "neighbor": neighbor, "weight": weight}
+                for node_id in parameters["node_ids"]
+                for neighbor, weight in driver.neighbors(node_id)
+            )
+        if "{id: $node_id})-[r]-" in query:
+            return FakeResult(
+                {"neighbor": neighbor, "weight": weight}
+                for neighbor, weight in driver.neighbors(parameters["node_id"])
+            )
+        if query.endswith("RETURN n"):
+            node = driver.nodes.get(parameters["node_id"])
+            return FakeResult([{"n": node}] if node is not None else [])
+        raise AssertionError(f"Unexpected query: {query}")
+
+
+class FakeNeo4jDriver:
+    """
+    Neo4j driver over a fixed graph, counting round trips; the only write it
+    accepts is deleting the whole graph by its scope label.
+    
+    Args:
+        graph_name: Scope label of the graph (GraphDatabase.graph_name).
+        nodes: Node id -> label.
+        edges: (source id, target id, weight) triples; matched in both directions.
+    """
+    
+    def __init__(self, graph_name: str, nodes: Dict[str, str], edges: List[Tuple[str, str, float]]):
+        self.graph_name = graph_name
+        self.nodes = {
+            node_id: FakeNeo4jNode({graph_name, label}, id=node_id)
+            for node_id, label in nodes.items()
+        }
+        self.adjacency: Dict[str, List[Tuple[FakeNeo4jNode, float]]] = {
+            node_id: [] for node_id in nodes
+        }
+        for source, target, weight in edges:
+            self.adjacency[source].append((self.nodes[target], weight))
+            self.adjacency[target].append((self.nodes[source], weight))
+        self.queries: List[str] = []
+    
+    def neighbors(self, node_id: str) -> List[Tuple[FakeNeo4jNode, float]]:
+        return self.adjacency.get(node_id, [])
+    
+    def session(self, **kwargs) -> FakeNeo4jSession:
+        return FakeNeo4jSession(self)
+    
+    def close(self):
+        pass
+    
+    def neighbor_queries(self) -> Tuple[int, int]:
+        """(batched, single-node) neighbor queries received so far."""
+        batched = sum(query.startswith("UNWIND $node_ids") for query in self.queries)
+        single = sum("{id: $node_id})-[r]-" in query for query in self.queries)
+        return batched, single
+
+
+@pytest.fixture
+def fake_neo4j_driver():
+    """Factory for FakeNeo4jDriver instances."""
+    return FakeNeo4jDriver
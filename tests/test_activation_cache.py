@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+"""
+ActivationCache eviction policies (LRU, LFU, ARC), per-entry TTL and the
+byte budget.
+"""
+import pytest
+
+from src.dmmr import activation_cache
+from src.dmmr.activation_cache import ActivationCache, CachePolicy
+
+
+class FakeClock:
+    """Stands in for time.monotonic inside activation_cache."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(activation_cache.time, "monotonic", clock)
+    return clock
+
+
+def test_cache_policy_is_abstract():
+    with pytest.raises(TypeError):
+        CachePolicy()
+
+    class Partial(CachePolicy):
+        def insert(self, key):
+            pass
+
+    with pytest.raises(TypeError):
+        Partial()
+
+
+def test_lru_evicts_least_recently_used():
+    cache = ActivationCache(max_size=3, policy="lru")
+    for key in "abc":
+        cache.set(key, key)
+    cache.get("a")
+
+    cache.set("d", "d")
+
+    assert "b" not in cache
+    assert all(key in cache for key in "acd")
+    assert cache.get_stats()["evictions"] == 1
+
+
+def test_lfu_evicts_least_frequently_used():
+    cache = ActivationCache(max_size=3, policy="lfu")
+    for key in "abc":
+        cache.set(key, key)
+    for _ in range(3):
+        cache.get("a")
+    cache.get("c")
+
+    cache.set("d", "d")
+
+    assert "b" not in cache
+    assert all(key in cache for key in "acd")
+
+
+def test_arc_keeps_frequent_keys_through_a_scan():
+    cache = ActivationCache(max_size=4, policy="arc")
+    for key in ("hot1", "hot2"):
+        cache.set(key, key)
+        cache.get(key)
+
+    # A one-off scan larger than the cache
+    for i in range(10):
+        cache.set(f"scan{i}", i)
+
+    assert "hot1" in cache and "hot2" in cache
+    lru = ActivationCache(max_size=4, policy="lru")
+    for key in ("hot1", "hot2"):
+        lru.set(key, key)
+        lru.get(key)
+    for i in range(10):
+        lru.set(f"scan{i}", i)
+    assert "hot1" not in lru and "hot2" not in lru
+
+
+def test_entries_expire_after_their_ttl(clock):
+    cache = ActivationCache(max_size=10, ttl=5.0)
+    cache.set("default", 1)
+    cache.set("short", 2, ttl=1.0)
+
+    clock.now += 2.0
+    assert cache.get("short") is None
+    assert cache.get("default") == 1
+
+    clock.now += 4.0
+    assert "default" not in cache
+    assert cache.get("default", "gone") == "gone"
+    stats = cache.get_stats()
+    assert stats["expirations"] == 2
+    assert stats["hits"] == 1 and stats["misses"] == 2
+
+
+def test_overwrite_resets_ttl(clock):
+    cache = ActivationCache(max_size=10, ttl=5.0)
+    cache.set("key", 1)
+    clock.now += 4.0
+    cache.set("key", 2)
+
+    clock.now += 4.0
+
+    assert cache.get("key") == 2
+
+
+def test_byte_budget_evicts_until_the_new_entry_fits():
+    cache = ActivationCache(max_size=100, policy="lru", max_bytes=100, sizeof=len)
+    cache.set("a", "x" * 40)
+    cache.set("b", "x" * 40)
+
+    cache.set("c", "x" * 40)
+
+    assert "a" not in cache
+    assert cache.get_stats()["bytes"] == 80
+    # Larger than the whole budget: not cached, nothing evicted
+    cache.set("huge", "x" * 101)
+    assert "huge" not in cache and "b" in cache and "c" in cache
+    # Growing an entry in place also respects the budget
+    cache.set("c", "x" * 70)
+    assert "b" not in cache
+    assert cache.get_stats()["bytes"] == 70
+
+
+def test_zero_size_disables_the_cache():
+    cache = ActivationCache(max_size=0)
+    cache.set("a", 1)
+
+    assert len(cache) == 0
+    assert cache.get("a") is None
+
+
+def test_unknown_policy_is_rejected():
+    with pytest.raises(ValueError):
+        ActivationCache(policy="fifo")
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+"""
+Spreading activation results are memoized per cue set and graph version:
+repeating a query is served from the cache until a graph write bumps the
+version.
+"""
+import pytest
+
+from src.dmmr import TaskType, get_config
+from src.dmmr.activation_engine import ActivationEngine
+from src.dmmr.data_models import Node, Relationship
+from src.dmmr.memory_systems import MultipleMemorySystems
+
+
+@pytest.fixture
+def engine(tmp_path, monkeypatch):
+    monkeypatch.setattr(get_config().database, "cache_dir", str(tmp_path))
+    monkeypatch.setattr(get_config().activation, "engine_mode", "bfs")
+    memory = MultipleMemorySystems("memo_test")
+    for node_id in ("a", "b", "c"):
+        memory.semantic.add_node(Node(id=node_id, label="Concept"))
+    memory.semantic.add_relationship(Relationship(source_id="a", target_id="b", label="RELATED"))
+    engine = ActivationEngine(memory)
+    engine.activation_threshold = 0.01
+    return engine
+
+
+@pytest.fixture
+def runs(engine, monkeypatch):
+    """Counts activations that were computed rather than recalled."""
+    calls = []
+    compute = engine._spreading_activation_bfs
+
+    async def counted(*args, **kwargs):
+        calls.append(args)
+        return await compute(*args, **kwargs)
+
+    monkeypatch.setattr(engine, "_spreading_activation_bfs", counted)
+    return calls
+
+
+def activate(engine, cues=(("a", 1.0),)):
+    nodes = engine.spreading_activation(list(cues), TaskType.GENERAL_QA, max_depth=2)
+    return [(node.id, node.properties["activation"]) for node in nodes]
+
+
+def test_repeated_activation_is_recalled(engine, runs):
+    first = activate(engine)
+    active_nodes = dict(engine.active_nodes)
+
+    engine.active_nodes.clear()
+    second = activate(engine)
+
+    assert len(runs) == 1
+    assert second == first
+    assert engine.active_nodes == active_nodes
+
+
+def test_equivalent_cue_lists_share_an_entry(engine, runs):
+    activate(engine, [("a", 0.5), ("b", 1.0)])
+    activate(engine, [("a", 0.2), ("b", 1.0), ("a", 0.5)])
+
+    assert len(runs) == 1
+
+
+@pytest.mark.parametrize("write", [
+    lambda memory: memory.semantic.add_relationship(
+        Relationship(source_id="b", target_id="c", label="RELATED")),
+    lambda memory: memory.semantic.add_node(Node(id="d", label="Concept")),
+    lambda memory: memory.procedural.add_node(Node(id="p", label="Step")),
+], ids=["semantic_edge", "semantic_node", "procedural_node"])
+def test_graph_writes_invalidate_the_memo(engine, runs, write):
+    activate(engine)
+
+    write(engine.memory)
+    after = activate(engine)
+
+    assert len(runs) == 2
+    # The new version is memoized in turn
+    assert activate(engine) == after
+    assert len(runs) == 2
+
+
+def test_new_edge_reaches_newly_connected_nodes(engine, runs):
+    assert "c" not in dict(activate(engine))
+
+    engine.memory.semantic.add_relationship(
+        Relationship(source_id="b", target_id="c", label="RELATED"))
+
+    assert "c" in dict(activate(engine))
+
+
+def test_propagation_parameters_are_part_of_the_key(engine, runs):
+    activate(engine)
+
+    engine.decay_factor *= 0.5
+    activate(engine)
+
+    assert len(runs) == 2
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+"""
+Async spreading activation gives the same result as the sync entry point,
+batches each layer's cross-modal lookups into one episodic search and keeps
+concurrent lookups under max_concurrent_lookups.
+"""
+import asyncio
+import threading
+import time
+
+import pytest
+
+from src.dmmr import TaskType, get_config
+from src.dmmr.activation_engine import ActivationEngine
+from src.dmmr.data_models import Node, Relationship
+from src.dmmr.memory_systems import MultipleMemorySystems
+
+# r - a - c - d, r - b - c: every node is reached with energy above 0.8
+EDGES = [("r", "a"), ("r", "b"), ("a", "c"), ("b", "c"), ("c", "d")]
+
+
+@pytest.fixture
+def engine(tmp_path, monkeypatch):
+    monkeypatch.setattr(get_config().database, "cache_dir", str(tmp_path))
+    monkeypatch.setattr(get_config().activation, "engine_mode", "bfs")
+    memory = MultipleMemorySystems("async_test")
+    for node_id in "rabcd":
+        memory.semantic.add_node(Node(id=node_id, label="Concept", embedding=[1.0, 0.0]))
+    for source, target in EDGES:
+        memory.semantic.add_relationship(
+            Relationship(source_id=source, target_id=target, label="RELATED"))
+    engine = ActivationEngine(memory)
+    engine.decay_factor = 1.0
+    return engine
+
+
+@pytest.fixture
+def searches(engine, monkeypatch):
+    """Records each episodic batch search with its query count and peak concurrency."""
+    calls = []
+    running = [0, 0]  # current, peak
+    lock = threading.Lock()
+
+    def search_batch(query_vectors, n_results=5, filters=None):
+        with lock:
+            running[0] += 1
+            running[1] = max(running)
+        time.sleep(0.02)
+        with lock:
+            running[0] -= 1
+            calls.append(len(query_vectors))
+        return [[] for _ in query_vectors]
+
+    monkeypatch.setattr(engine.memory, "search_batch", search_batch)
+    return calls, running
+
+
+def ranked(nodes):
+    return [(node.id, node.properties["activation"]) for node in nodes]
+
+
+def test_async_matches_sync(engine):
+    cues = [("r", 1.0)]
+    sync = ranked(engine.spreading_activation(cues, TaskType.GENERAL_QA, max_depth=3))
+    engine.cache.clear()
+
+    result = asyncio.run(engine.spreading_activation_async(cues, TaskType.GENERAL_QA, max_depth=3))
+
+    assert ranked(result) == sync
+    assert len(sync) == 5
+
+
+def test_one_cross_modal_search_per_layer(engine, searches):
+    calls, _ = searches
+
+    engine.spreading_activation([("r", 1.0)], TaskType.GENERAL_QA, max_depth=3)
+
+    # Layers {r}, {a, b}, {c}
+    assert calls and sorted(calls) == [1, 1, 2]
+
+
+def test_concurrent_lookups_respect_the_limit(engine, searches, monkeypatch):
+    calls, running = searches
+    monkeypatch.setattr(get_config().activation, "max_concurrent_lookups", 1)
+
+    engine.spreading_activation([("r", 1.0)], TaskType.GENERAL_QA, max_depth=3)
+
+    assert len(calls) == 3
+    assert running[1] == 1
+
+
+def test_sync_entry_point_works_inside_a_running_loop(engine):
+    async def handler():
+        return engine.spreading_activation([("r", 1.0)], TaskType.GENERAL_QA, max_depth=2)
+
+    nodes = asyncio.run(handler())
+
+    assert {node.id for node in nodes} == {"r", "a", "b", "c"}
@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+"""
+Best-first spreading activation expands the most energetic nodes first and
+stops at its node, edge and top-k stability budgets.
+"""
+import pytest
+
+from src.dmmr import TaskType, get_config
+from src.dmmr.activation_engine import ActivationEngine
+from src.dmmr.data_models import Node, Relationship
+from src.dmmr.memory_systems import MultipleMemorySystems
+
+
+def ternary_tree(depth: int):
+    """Unit-weight edges of a complete ternary tree rooted at ``r``."""
+    edges = []
+    layer = ["r"]
+    for _ in range(depth):
+        next_layer = []
+        for parent in layer:
+            for i in range(3):
+                child = f"{parent}.{i}"
+                edges.append((parent, child, 1.0))
+                next_layer.append(child)
+        layer = next_layer
+    return edges
+
+
+@pytest.fixture
+def best_first(tmp_path, monkeypatch):
+    """Builds a best-first engine over an in-memory graph; records every expansion."""
+    activation = get_config().activation
+    monkeypatch.setattr(get_config().database, "cache_dir", str(tmp_path))
+    monkeypatch.setattr(activation, "engine_mode", "best_first")
+    monkeypatch.setattr(activation, "best_first_max_nodes", 0)
+    monkeypatch.setattr(activation, "best_first_max_edges", 0)
+    monkeypatch.setattr(activation, "best_first_patience", 0)
+
+    def build(edges, **budgets):
+        for name, value in budgets.items():
+            monkeypatch.setattr(activation, f"best_first_{name}", value)
+        memory = MultipleMemorySystems("best_first_test")
+        for source, target, weight in edges:
+            for node_id in (source, target):
+                memory.semantic.add_node(Node(id=node_id, label="Concept"))
+            memory.semantic.add_relationship(
+                Relationship(source_id=source, target_id=target, label="RELATED", weight=weight))
+        engine = ActivationEngine(memory)
+        engine.activation_threshold = 0.001
+        expansions = []
+        get_neighbors = engine._get_all_neighbors
+
+        def recorded(node_id):
+            neighbors = get_neighbors(node_id)
+            expansions.append((node_id, len(neighbors)))
+            return neighbors
+
+        engine._get_all_neighbors = recorded
+        return engine, expansions
+    return build
+
+
+def activate(engine, max_depth=3):
+    nodes = engine.spreading_activation([("r", 1.0)], TaskType.GENERAL_QA, max_depth=max_depth)
+    return {node.id: node.properties["activation"] for node in nodes}
+
+
+@pytest.mark.parametrize("max_nodes", [1, 4, 7])
+def test_node_budget_caps_expansions(best_first, max_nodes):
+    engine, expansions = best_first(ternary_tree(4), max_nodes=max_nodes)
+
+    activate(engine)
+
+    assert len(expansions) == max_nodes
+
+
+@pytest.mark.parametrize("max_edges", [3, 10, 25])
+def test_edge_budget_stops_once_reached(best_first, max_edges):
+    engine, expansions = best_first(ternary_tree(4), max_edges=max_edges)
+
+    activate(engine)
+
+    processed = [degree for _, degree in expansions]
+    assert sum(processed[:-1]) < max_edges <= sum(processed)
+
+
+def test_unlimited_budgets_expand_every_reachable_node_within_depth(best_first):
+    engine, expansions = best_first(ternary_tree(3))
+
+    activated = activate(engine, max_depth=3)
+
+    # Nodes at depth 3 only receive energy
+    assert len(expansions) == 1 + 3 + 9
+    assert len(activated) == 1 + 3 + 9 + 27
+
+
+def test_most_energetic_branch_is_expanded_first(best_first):
+    edges = [("r", "strong", 1.0), ("r", "weak", 0.1),
+             ("strong", "strong.child", 1.0), ("weak", "weak.child", 1.0)]
+    engine, expansions = best_first(edges, max_nodes=2)
+
+    activated = activate(engine)
+
+    assert [node_id for node_id, _ in expansions] == ["r", "strong"]
+    assert "strong.child" in activated
+    assert "weak.child" not in activated
+
+
+def test_stable_top_k_stops_early(best_first):
+    # A star: no expansion, the hub's included, changes the single top node
+    edges = [("r", f"leaf{i}", 1.0) for i in range(50)]
+    engine, expansions = best_first(edges, top_k=1, patience=3)
+
+    activate(engine, max_depth=2)
+
+    assert len(expansions) == 3
+
+
+def test_budget_is_part_of_the_memo_key(best_first, monkeypatch):
+    engine, expansions = best_first(ternary_tree(3), max_nodes=2)
+    activate(engine)
+    activate(engine)
+    assert len(expansions) == 2
+
+    monkeypatch.setattr(get_config().activation, "best_first_max_nodes", 3)
+    activate(engine)
+
+    assert len(expansions) == 2 + 3
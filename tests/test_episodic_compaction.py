@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+"""
+Deleting episodic chunks leaves tombstones that searches skip; background
+compaction removes them, including tombstones left while it was running.
+"""
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from src.dmmr import get_config
+from src.dmmr.data_models import MemoryChunk
+from src.dmmr.memory_systems import VectorDatabase
+
+DIM = 16
+
+
+def make_chunks(count: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    return [MemoryChunk(id=f"c{i}", content=f"text {i}", user_id="u",
+                        embedding=rng.standard_normal(DIM).tolist())
+            for i in range(count)]
+
+
+def tombstones(db: VectorDatabase) -> int:
+    return db.tombstones if hasattr(db, "index") else db.matrix.tombstones
+
+
+def wait_for_compaction(db: VectorDatabase, timeout: float = 10.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        busy = any(thread.name == f"compact-{db.collection_name}"
+                   for thread in threading.enumerate())
+        if not busy and not db._compacting:
+            return
+        time.sleep(0.01)
+    raise AssertionError("compaction did not finish")
+
+
+@pytest.fixture(params=["memory", "mapped", "faiss"])
+def vector_db(request, tmp_path, monkeypatch):
+    database = get_config().database
+    monkeypatch.setattr(database, "cache_dir", str(tmp_path))
+    monkeypatch.setattr(database, "vector_dim", DIM)
+    monkeypatch.setattr(database, "hot_tier_size", 0)
+    monkeypatch.setattr(database, "compact_tombstone_ratio", 0.25)
+    monkeypatch.setattr(database, "persist_episodic", request.param == "mapped")
+
+    def build(name: str, chunks):
+        db = VectorDatabase(name, use_real_backend=request.param == "faiss")
+        db.add_batch([chunk.model_copy() for chunk in chunks])
+        return db
+    return build
+
+
+def test_deleted_chunks_are_compacted_away(vector_db):
+    chunks = make_chunks(400)
+    db = vector_db("compacted", chunks)
+    # The hundredth delete reaches the 0.25 tombstone ratio
+    deleted = {chunk.id for chunk in chunks[::4]}
+
+    for chunk_id in deleted:
+        assert db.delete(chunk_id)
+    wait_for_compaction(db)
+
+    assert tombstones(db) == 0
+    assert db.count() == len(chunks) - len(deleted)
+    assert not db.delete("c0")
+    survivors = [chunk for chunk in chunks if chunk.id not in deleted]
+    reference = vector_db("reference", survivors)
+    queries = [chunk.embedding for chunk in chunks[:20]]
+    got = [[chunk.id for chunk in result] for result in db.search_batch(queries, 5)]
+    expected = [[chunk.id for chunk in result] for result in reference.search_batch(queries, 5)]
+    assert got == expected
+
+
+def test_deletes_during_compaction_schedule_another_run(vector_db, monkeypatch):
+    chunks = make_chunks(400)
+    db = vector_db("racing", chunks)
+    compact = db.compact
+    late = [chunk.id for chunk in chunks[200:]]
+
+    def compact_then_delete():
+        compact()
+        # Deletes landing while the flag is still set do not start a compaction
+        if late:
+            for chunk_id in late:
+                db.delete(chunk_id)
+            late.clear()
+
+    monkeypatch.setattr(db, "compact", compact_then_delete)
+    for chunk in chunks[:100]:
+        db.delete(chunk.id)
+    wait_for_compaction(db)
+
+    assert tombstones(db) == 0
+    assert db.count() == 100
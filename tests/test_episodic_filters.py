@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+"""
+Metadata-filtered episodic search: the filter columns select exactly the
+chunks EpisodicFilter.matches accepts, and stay in sync through updates,
+deletes and compaction.
+"""
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from src.dmmr import TaskType, get_config
+from src.dmmr.data_models import EpisodicFilter, MemoryChunk
+from src.dmmr.memory_systems import ChunkFieldIndex, VectorDatabase
+
+DIM = 16
+NOW = datetime(2026, 1, 1)
+TASK_TYPES = list(TaskType)
+
+
+def make_chunks(count: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    return [MemoryChunk(
+        id=f"c{i}", content=f"text {i}", user_id="u",
+        task_type=TASK_TYPES[i % len(TASK_TYPES)],
+        timestamp=NOW - timedelta(days=i % 30),
+        significance_score=float(rng.random()),
+        metadata={"topic": ["work", "health", "travel"][i % 3], "tags": ["unhashable"]},
+        embedding=rng.standard_normal(DIM).tolist(),
+    ) for i in range(count)]
+
+
+FILTERS = [
+    EpisodicFilter(task_types=[TaskType.GENERAL_QA]),
+    EpisodicFilter(start_time=NOW - timedelta(days=7), end_time=NOW - timedelta(days=2)),
+    EpisodicFilter(min_significance=0.6, metadata={"topic": "work"}),
+    EpisodicFilter(metadata={"topic": ["health", "travel"]}),
+    EpisodicFilter(metadata={"topic": "missing"}),
+    EpisodicFilter(metadata={"tags": ["unhashable"]}),
+]
+
+
+@pytest.fixture(params=["memory", "mapped", "faiss"])
+def vector_db(request, tmp_path, monkeypatch):
+    database = get_config().database
+    monkeypatch.setattr(database, "cache_dir", str(tmp_path))
+    monkeypatch.setattr(database, "vector_dim", DIM)
+    monkeypatch.setattr(database, "hot_tier_size", 0)
+    monkeypatch.setattr(database, "persist_episodic", request.param == "mapped")
+
+    def build(name: str, chunks):
+        db = VectorDatabase(name, use_real_backend=request.param == "faiss")
+        db.add_batch([chunk.model_copy() for chunk in chunks])
+        return db
+    return build
+
+
+def search_ids(db: VectorDatabase, queries, filters=None):
+    return [[chunk.id for chunk in result] for result in db.search_batch(queries, 5, filters)]
+
+
+def assert_filtered_like_reference(db, vector_db, chunks, queries):
+    for i, filters in enumerate(FILTERS):
+        matching = [chunk for chunk in chunks if filters.matches(chunk)]
+        reference = vector_db(f"reference{i}", matching)
+        assert search_ids(db, queries, filters) == search_ids(reference, queries)
+
+
+def test_filtered_search_matches_a_store_of_the_matching_chunks(vector_db):
+    chunks = make_chunks(120)
+    db = vector_db("filtered", chunks)
+    queries = [chunk.embedding for chunk in chunks[:10]]
+
+    assert_filtered_like_reference(db, vector_db, chunks, queries)
+    assert db.search(queries[0], 5, FILTERS[0]) == db.search_batch(queries[:1], 5, FILTERS[0])[0]
+
+
+def test_filter_columns_follow_updates_deletes_and_compaction(vector_db):
+    chunks = make_chunks(120)
+    db = vector_db("changing", chunks)
+    queries = [chunk.embedding for chunk in chunks[:10]]
+    # Build the columns before changing the store so they must be kept in sync
+    db.search_batch(queries, 5, FILTERS[0])
+
+    for chunk in chunks[:30]:
+        chunk.metadata = {"topic": "work"}
+        chunk.task_type = TaskType.GENERAL_QA
+        db.update(chunk.model_copy())
+    for chunk in chunks[90:]:
+        db.delete(chunk.id)
+    chunks = chunks[:90]
+    assert_filtered_like_reference(db, vector_db, chunks, queries)
+
+    db.compact()
+    assert_filtered_like_reference(db, vector_db, chunks, queries)
+
+
+def test_field_index_mask():
+    fields = ChunkFieldIndex(initial_capacity=1)
+    chunks = make_chunks(6)
+    for row, chunk in enumerate(chunks):
+        fields.set(row, chunk)
+    fields.clear(3)
+
+    mask = fields.mask(EpisodicFilter(metadata={"topic": ["work", "travel"]}), 6)
+
+    expected = [row != 3 and chunk.metadata["topic"] in ("work", "travel")
+                for row, chunk in enumerate(chunks)]
+    assert mask.tolist() == expected
+    # Unhashable metadata values are not indexed and never match
+    assert not fields.mask(EpisodicFilter(metadata={"tags": ["unhashable"]}), 6).any()
+    fields.compact([0, 2, 4])
+    assert fields.mask(EpisodicFilter(), 3).tolist() == [True, True, True]
+    work = fields.mask(EpisodicFilter(metadata={"topic": "work"}), 3)
+    assert work.tolist() == [True, False, False]
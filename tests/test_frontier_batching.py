@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+"""
+Spreading activation over a remote graph reads neighbors in batches:
+one query per graph for each BFS frontier layer, never one per node.
+"""
+import pytest
+
+from src.dmmr import TaskType, get_config
+from src.dmmr.activation_engine import ActivationEngine
+from src.dmmr.memory_systems import GraphDatabase, MultipleMemorySystems
+
+
+def ternary_tree(depth: int):
+    """Nodes and unit-weight edges of a complete ternary tree rooted at ``r``."""
+    nodes = {"r": "Concept"}
+    edges = []
+    layer = ["r"]
+    for _ in range(depth):
+        next_layer = []
+        for parent in layer:
+            for i in range(3):
+                child = f"{parent}.{i}"
+                nodes[child] = "Concept"
+                edges.append((parent, child, 1.0))
+                next_layer.append(child)
+        layer = next_layer
+    return nodes, edges
+
+
+@pytest.fixture
+def remote_engine(fake_neo4j_driver, monkeypatch):
+    """An ActivationEngine whose semantic and procedural graphs are served by fake drivers."""
+    def build(engine_mode: str, tree_depth: int = 4):
+        monkeypatch.setattr(get_config().activation, "engine_mode", engine_mode)
+        memory = MultipleMemorySystems("frontier_test")
+        nodes, edges = ternary_tree(tree_depth)
+        semantic = fake_neo4j_driver("frontier_test_semantic", nodes, edges)
+        procedural = fake_neo4j_driver("frontier_test_procedural", {}, [])
+        memory.semantic = GraphDatabase("frontier_test_semantic", driver=semantic)
+        memory.procedural = GraphDatabase("frontier_test_procedural", driver=procedural)
+        engine = ActivationEngine(memory)
+        # Every node of the tree stays above the threshold, so each layer is expanded
+        engine.activation_threshold = 0.001
+        return engine, semantic, procedural
+    return build
+
+
+@pytest.mark.parametrize("max_depth", [1, 2, 3])
+def test_bfs_issues_one_neighbor_query_per_frontier_layer(remote_engine, max_depth):
+    engine, semantic, procedural = remote_engine("bfs")
+    
+    activated = engine.spreading_activation([("r", 1.0)], TaskType.GENERAL_QA, max_depth=max_depth)
+    
+    assert semantic.neighbor_queries() == (max_depth, 0)
+    assert procedural.neighbor_queries() == (max_depth, 0)
+    # Layers 0..max_depth receive energy
+    assert len(activated) == sum(3 ** layer for layer in range(max_depth + 1))
+
+
+def test_repeated_activation_reads_neighbors_from_cache(remote_engine):
+    engine, semantic, _ = remote_engine("bfs")
+    engine.spreading_activation([("r", 1.0)], TaskType.GENERAL_QA, max_depth=2)
+    engine.cache.delete(engine._memo_key([("r", 1.0)], TaskType.GENERAL_QA, 2))
+    before = semantic.neighbor_queries()
+    
+    engine.spreading_activation([("r", 1.0)], TaskType.GENERAL_QA, max_depth=2)
+    
+    assert semantic.neighbor_queries() == before
+
+
+def test_best_first_never_reads_neighbors_one_node_at_a_time(remote_engine, monkeypatch):
+    monkeypatch.setattr(get_config().activation, "best_first_prefetch", 16)
+    engine, semantic, procedural = remote_engine("best_first")
+    
+    engine.spreading_activation([("r", 1.0)], TaskType.GENERAL_QA, max_depth=3)
+    
+    batched, single = semantic.neighbor_queries()
+    assert single == 0
+    # 1 + 3 + 9 expanded nodes in batches of at most 16
+    assert 1 <= batched <= 13
+    assert procedural.neighbor_queries()[1] == 0
@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+"""
+A user's Neo4j graphs can be deleted through the shared graph store by their
+scope label, whether or not a GraphDatabase for them is loaded.
+"""
+from src.dmmr.memory_systems import GraphDatabase, SharedGraphStore
+
+
+def test_purge_graph_deletes_only_the_labelled_graph(fake_neo4j_driver):
+    driver = fake_neo4j_driver("alice_semantic", {"a": "Concept", "b": "Concept"},
+                               [("a", "b", 1.0)])
+    store = SharedGraphStore()
+
+    store.purge_graph("bob_semantic", driver=driver)
+    assert set(driver.nodes) == {"a", "b"}
+
+    store.purge_graph("alice_semantic", driver=driver)
+    assert driver.nodes == {}
+    assert driver.queries == [
+        "MATCH (n:`bob_semantic`) DETACH DELETE n",
+        "MATCH (n:`alice_semantic`) DETACH DELETE n",
+    ]
+    # A graph view opened afterwards finds nothing
+    graph = GraphDatabase("alice_semantic", driver=driver)
+    assert graph.get_node("a") is None
+    assert graph.get_weighted_neighbors("a") == []
+
+
+def test_purge_graph_quotes_the_label(fake_neo4j_driver):
+    driver = fake_neo4j_driver("odd`name", {"a": "Concept"}, [])
+
+    SharedGraphStore().purge_graph("odd`name", driver=driver)
+
+    assert driver.queries == ["MATCH (n:`odd``name`) DETACH DELETE n"]
+    assert driver.nodes == {}
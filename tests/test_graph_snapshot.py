@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+"""
+The CSR snapshot of the semantic and procedural graphs lists the same
+weighted neighbors as the graphs themselves and is rebuilt only after writes.
+"""
+import pytest
+
+from src.dmmr import get_config
+from src.dmmr.data_models import Node, Relationship
+from src.dmmr.memory_systems import GraphSnapshot, MultipleMemorySystems
+
+
+@pytest.fixture
+def memory(tmp_path, monkeypatch):
+    monkeypatch.setattr(get_config().database, "cache_dir", str(tmp_path))
+    memory = MultipleMemorySystems("snapshot_test")
+    for node_id in ("a", "b", "c"):
+        memory.semantic.add_node(Node(id=node_id, label="Concept"))
+    memory.semantic.add_relationship(
+        Relationship(source_id="a", target_id="b", label="RELATED", weight=0.5))
+    memory.semantic.add_relationship(
+        Relationship(source_id="b", target_id="c", label="IS_A", weight=2.0))
+    for node_id in ("a", "step"):
+        memory.procedural.add_node(Node(id=node_id, label="Step"))
+    memory.procedural.add_relationship(
+        Relationship(source_id="a", target_id="step", label="NEXT", weight=1.5))
+    return memory
+
+
+def graph_neighbors(memory, node_id):
+    """Weighted neighbors straight from the graphs, semantic first."""
+    neighbors = (memory.get_semantic_weighted_neighbors(node_id)
+                 + memory.get_procedural_weighted_neighbors(node_id))
+    return [(node.id, weight) for node, weight in neighbors]
+
+
+def test_snapshot_matches_the_graphs(memory):
+    snapshot = memory.freeze()
+
+    assert sorted(snapshot.node_ids) == ["a", "b", "c", "step"]
+    assert snapshot.num_edges == 2 * 3
+    for node_id in snapshot.node_ids:
+        assert snapshot.neighbors(node_id) == graph_neighbors(memory, node_id)
+    assert snapshot.neighbors("missing") == []
+    labels = {node_id: snapshot.label_names[snapshot.node_labels[i]]
+              for i, node_id in enumerate(snapshot.node_ids)}
+    assert labels["b"] == "Concept" and labels["step"] == "Step"
+
+
+def test_snapshot_is_cached_until_a_write(memory):
+    snapshot = memory.freeze()
+    assert memory.freeze() is snapshot
+    assert memory.semantic.freeze() is memory.semantic.freeze()
+
+    memory.semantic.add_relationship(
+        Relationship(source_id="c", target_id="a", label="RELATED", weight=1.0))
+    rebuilt = memory.freeze()
+
+    assert rebuilt is not snapshot
+    assert rebuilt.neighbors("c") == graph_neighbors(memory, "c")
+    assert ("a", 1.0) in rebuilt.neighbors("c")
+
+
+def test_repeated_edges_accumulate_in_the_snapshot(memory):
+    memory.semantic.add_relationship(
+        Relationship(source_id="a", target_id="b", label="RELATED", weight=0.25))
+
+    snapshot = memory.freeze()
+
+    neighbor, weight = snapshot.neighbors("a")[0]
+    assert neighbor == "b" and weight > 0.5
+    assert snapshot.neighbors("a") == graph_neighbors(memory, "a")
+    assert snapshot.num_edges == 2 * 3
+
+
+def test_empty_snapshot():
+    snapshot = GraphSnapshot.build([({}, {})])
+
+    assert snapshot.num_nodes == 0 and snapshot.num_edges == 0
+    assert snapshot.neighbors("a") == []
@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+"""
+The episodic hot tier only answers while it agrees with the cold tier:
+queries whose true top-k is cold-only must still get the untiered answer.
+"""
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from src.dmmr import get_config
+from src.dmmr.data_models import MemoryChunk
+from src.dmmr.memory_systems import VectorDatabase
+
+DIM = 32
+
+
+def make_chunks(count: int, seed: int = 0):
+    """Chunks with nonnegative embeddings; the first ten are old and insignificant."""
+    rng = np.random.default_rng(seed)
+    chunks = []
+    for i in range(count):
+        old = i < 10
+        chunks.append(MemoryChunk(
+            id=f"c{i}", content=f"text {i}", user_id="u",
+            significance_score=0.01 if old else 0.9,
+            timestamp=datetime.now() - timedelta(days=300 if old else 0),
+            embedding=rng.random(DIM).tolist(),
+        ))
+    return chunks
+
+
+@pytest.fixture
+def vector_db(tmp_path, monkeypatch):
+    database = get_config().database
+    monkeypatch.setattr(database, "cache_dir", str(tmp_path))
+    monkeypatch.setattr(database, "vector_dim", DIM)
+    monkeypatch.setattr(database, "persist_episodic", False)
+
+    def build(name: str, hot_tier_size: int):
+        monkeypatch.setattr(database, "hot_tier_size", hot_tier_size)
+        db = VectorDatabase(name, use_real_backend=False)
+        db.add_batch(make_chunks(300))
+        return db
+    return build
+
+
+def test_cold_only_top_k_is_found(vector_db):
+    untiered = vector_db("untiered", 0)
+    tiered = vector_db("tiered", 50)
+    old = [f"c{i}" for i in range(10)]
+    assert not set(old) & set(tiered.hot_tier.chunks)
+    # Each query sits on an old chunk, so its top-k includes cold-only chunks
+    queries = [untiered.get(chunk_id).embedding for chunk_id in old] * 4
+
+    expected = [[chunk.id for chunk in result] for result in untiered.search_batch(queries, 5)]
+    got = [[chunk.id for chunk in result] for result in tiered.search_batch(queries, 5)]
+
+    assert got == expected
+    assert all(result[0] in old for result in got)
+    stats = tiered.get_tier_stats()
+    assert stats["hot_hits"] == 0
+    assert stats["hot_recall"] < get_config().database.hot_tier_min_recall
+
+
+def test_trusted_hot_tier_answers_and_keeps_auditing(vector_db, monkeypatch):
+    tiered = vector_db("tiered", 50)
+    monkeypatch.setattr(get_config().database, "hot_tier_audit_interval", 4)
+    hot_ids = list(tiered.hot_tier.chunks)[:8]
+    queries = [tiered.hot_tier[chunk_id].embedding for chunk_id in hot_ids]
+    tiered.hot_recall = 1.0
+
+    results = tiered.search_batch(queries, 1)
+
+    assert [result[0].id for result in results] == hot_ids
+    stats = tiered.get_tier_stats()
+    # Every fourth query was audited against the cold tier
+    assert stats["cold_hits"] == 2
+    assert stats["hot_hits"] == 6
@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+"""
+The persistent episodic store reopens with the same chunks, rows and search
+results after adds, updates, deletes and compaction.
+"""
+import numpy as np
+import pytest
+
+from src.dmmr import get_config
+from src.dmmr.data_models import MemoryChunk
+from src.dmmr.memory_systems import MappedEpisodicStore, VectorDatabase
+
+DIM = 16
+
+
+def make_chunks(count: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    return [MemoryChunk(id=f"c{i}", content=f"text {i}", user_id="u",
+                        metadata={"n": i}, embedding=rng.standard_normal(DIM).tolist())
+            for i in range(count)]
+
+
+@pytest.fixture
+def open_db(tmp_path, monkeypatch):
+    database = get_config().database
+    monkeypatch.setattr(database, "cache_dir", str(tmp_path))
+    monkeypatch.setattr(database, "vector_dim", DIM)
+    monkeypatch.setattr(database, "hot_tier_size", 0)
+    monkeypatch.setattr(database, "persist_episodic", True)
+    # Compaction only when a test asks for it
+    monkeypatch.setattr(database, "compact_tombstone_ratio", 2.0)
+    opened = []
+
+    def open_(name: str = "persisted") -> VectorDatabase:
+        db = VectorDatabase(name, use_real_backend=False)
+        assert isinstance(db.memory_store, MappedEpisodicStore)
+        opened.append(db)
+        return db
+    yield open_
+    if opened:
+        opened[-1].memory_store.close()
+
+
+def snapshot(db: VectorDatabase, queries):
+    """Everything a reopened store must reproduce."""
+    chunks = {chunk_id: (chunk.content, chunk.metadata, np.round(chunk.embedding, 5).tolist())
+              for chunk_id, chunk in db.iter_chunks()}
+    results = [[chunk.id for chunk in result] for result in db.search_batch(queries, 5)]
+    return db.count(), chunks, results
+
+
+def reopen(db: VectorDatabase, open_db) -> VectorDatabase:
+    db.memory_store.close()
+    return open_db(db.collection_name)
+
+
+def test_reopen_restores_adds_updates_and_deletes(open_db):
+    chunks = make_chunks(200)
+    db = open_db()
+    db.add_batch([chunk.model_copy() for chunk in chunks])
+    for chunk in chunks[:20]:
+        db.update(chunk.model_copy(update={"content": f"updated {chunk.id}", "embedding": None}))
+    for chunk in chunks[150:]:
+        db.delete(chunk.id)
+    queries = [chunk.embedding for chunk in chunks[:10]]
+    before = snapshot(db, queries)
+    tombstones = db.matrix.tombstones
+
+    db = reopen(db, open_db)
+
+    assert snapshot(db, queries) == before
+    assert db.get("c0").content == "updated c0"
+    assert db.get("c199") is None
+    # Removed rows come back as tombstones until the next compaction
+    assert db.matrix.tombstones == tombstones
+
+
+def test_reopen_after_compaction(open_db):
+    chunks = make_chunks(120)
+    db = open_db()
+    db.add_batch([chunk.model_copy() for chunk in chunks])
+    for chunk in chunks[::2]:
+        db.delete(chunk.id)
+    db.compact()
+    queries = [chunk.embedding for chunk in chunks[:10]]
+    before = snapshot(db, queries)
+
+    db = reopen(db, open_db)
+
+    assert snapshot(db, queries) == before
+    assert db.matrix.tombstones == 0
+    assert len(db.matrix.ids) == 60
+    db.add(chunks[0].model_copy())
+    assert db.count() == 61
+
+
+def test_torn_id_line_is_ignored(tmp_path):
+    store = MappedEpisodicStore(DIM, str(tmp_path))
+    for chunk in make_chunks(3):
+        store[chunk.id] = chunk
+    store.close()
+    with open(tmp_path / "ids.jsonl", "a", encoding="utf-8") as f:
+        f.write('"c3')
+
+    store = MappedEpisodicStore(DIM, str(tmp_path))
+
+    assert [chunk_id for chunk_id in store.ids] == ["c0", "c1", "c2"]
+    assert store["c1"].content == "text 1"
+    store.close()
+
+
+def test_dimension_mismatch_is_rejected(tmp_path):
+    MappedEpisodicStore(DIM, str(tmp_path)).close()
+
+    with pytest.raises(ValueError):
+        MappedEpisodicStore(DIM * 2, str(tmp_path))
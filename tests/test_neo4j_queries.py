@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+"""
+Neo4j reads are scoped by the graph's label and look nodes up by the indexed
+id property; each graph's uniqueness constraint is created once per driver.
+"""
+import pytest
+
+from src.dmmr import memory_systems
+from src.dmmr.memory_systems import GraphDatabase, SharedGraphStore
+
+
+@pytest.fixture(autouse=True)
+def fresh_graph_store(monkeypatch):
+    """Schema bookkeeping starts empty for every test."""
+    store = SharedGraphStore()
+    monkeypatch.setattr(memory_systems, "graph_store", store)
+    return store
+
+
+def reads(driver):
+    return [query for query in driver.queries if not query.startswith("CREATE CONSTRAINT")]
+
+
+def test_node_lookup_is_label_scoped_and_keyed_by_id(fake_neo4j_driver):
+    driver = fake_neo4j_driver("alice_semantic", {"a": "Concept", "b": "Person"}, [("a", "b", 0.5)])
+    graph = GraphDatabase("alice_semantic", driver=driver)
+
+    node = graph.get_node("a")
+
+    assert node.id == "a"
+    # The scope label is dropped from the node's own label
+    assert node.label == "Concept"
+    assert graph.get_node("missing") is None
+    assert reads(driver)[0] == "MATCH (n:`alice_semantic` {id: $node_id}) RETURN n"
+
+
+def test_every_read_is_scoped_by_the_graph_label(fake_neo4j_driver):
+    driver = fake_neo4j_driver("alice_semantic", {"a": "Concept", "b": "Person"}, [("a", "b", 0.5)])
+    graph = GraphDatabase("alice_semantic", driver=driver)
+
+    neighbors = graph.get_weighted_neighbors("a")
+    graph.get_weighted_neighbors_many(["a", "b"])
+    graph.get_node("b")
+
+    assert [(node.id, node.label, weight) for node, weight in neighbors] == [("b", "Person", 0.5)]
+    assert reads(driver)
+    assert all("`alice_semantic`" in query for query in reads(driver))
+
+
+def test_constraint_is_created_once_per_graph(fake_neo4j_driver):
+    driver = fake_neo4j_driver("alice_semantic", {}, [])
+
+    GraphDatabase("alice_semantic", driver=driver)
+    GraphDatabase("alice_semantic", driver=driver)
+    GraphDatabase("alice_procedural", driver=driver)
+
+    constraints = [query for query in driver.queries if query.startswith("CREATE CONSTRAINT")]
+    assert constraints == [
+        "CREATE CONSTRAINT `dmmr_alice_semantic_id` IF NOT EXISTS "
+        "FOR (n:`alice_semantic`) REQUIRE n.id IS UNIQUE",
+        "CREATE CONSTRAINT `dmmr_alice_procedural_id` IF NOT EXISTS "
+        "FOR (n:`alice_procedural`) REQUIRE n.id IS UNIQUE",
+    ]
+
+
+def test_graph_names_are_quoted(fake_neo4j_driver):
+    driver = fake_neo4j_driver("odd`name", {"a": "Concept"}, [])
+    graph = GraphDatabase("odd`name", driver=driver)
+
+    graph.get_node("a")
+
+    assert "FOR (n:`odd``name`)" in driver.queries[0]
+    assert reads(driver) == ["MATCH (n:`odd``name` {id: $node_id}) RETURN n"]
@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+"""
+Retention caps: episodic memory is evicted down to the low-water mark of its
+count and byte caps, lowest retention score (old, insignificant) first.
+"""
+import threading
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from src.dmmr import get_config
+from src.dmmr.config import RetentionConfig
+from src.dmmr.data_models import MemoryChunk
+from src.dmmr.memory_systems import VectorDatabase
+from src.dmmr.retention import RetentionPolicy
+
+DIM = 16
+
+
+def make_chunks(count: int, stale: int, seed: int = 0):
+    """``count`` chunks whose first ``stale`` are a year old and insignificant."""
+    rng = np.random.default_rng(seed)
+    chunks = []
+    for i in range(count):
+        old = i < stale
+        chunks.append(MemoryChunk(
+            id=f"c{i}", content=f"memory {i} " + "x" * (i % 7), user_id="u",
+            significance_score=0.05 if old else 0.9,
+            timestamp=datetime.now() - timedelta(days=365 if old else 0),
+            embedding=rng.standard_normal(DIM).tolist(),
+        ))
+    return chunks
+
+
+def store_bytes(db: VectorDatabase) -> int:
+    return sum(db.chunk_nbytes(chunk) for _, chunk in db.iter_chunks())
+
+
+@pytest.fixture
+def vector_db(tmp_path, monkeypatch):
+    database = get_config().database
+    monkeypatch.setattr(database, "cache_dir", str(tmp_path))
+    monkeypatch.setattr(database, "vector_dim", DIM)
+    monkeypatch.setattr(database, "hot_tier_size", 0)
+    monkeypatch.setattr(database, "persist_episodic", False)
+
+    def build(name: str, chunks, use_real_backend: bool = False):
+        db = VectorDatabase(name, use_real_backend=use_real_backend)
+        db.add_batch(chunks)
+        return db
+    return build
+
+
+@pytest.mark.parametrize("use_real_backend", [False, True])
+def test_count_cap_evicts_lowest_scores_to_low_water(vector_db, use_real_backend):
+    db = vector_db("counted", make_chunks(150, stale=40), use_real_backend)
+    policy = RetentionPolicy(db, RetentionConfig(max_episodic_chunks=100, low_water_ratio=0.9,
+                                                 eviction_batch_size=16))
+
+    evicted = policy.run()
+
+    assert evicted == 60
+    assert db.count() == 90
+    assert all(db.get(f"c{i}") is None for i in range(40))
+    assert policy.get_stats()["evicted_chunks"] == 60
+    assert policy.run() == 0
+
+
+def test_byte_cap_keeps_an_exact_estimate(vector_db):
+    db = vector_db("sized", make_chunks(200, stale=50))
+    cap = store_bytes(db) // 2
+    policy = RetentionPolicy(db, RetentionConfig(max_episodic_bytes=cap, low_water_ratio=0.8))
+
+    assert policy.over_budget()
+    policy.run()
+
+    assert store_bytes(db) <= int(cap * 0.8)
+    assert policy.get_stats()["estimated_bytes"] == store_bytes(db)
+    assert all(db.get(f"c{i}") is None for i in range(50))
+
+
+def test_replacing_chunks_releases_their_bytes(vector_db, monkeypatch):
+    chunks = make_chunks(50, stale=0)
+    monkeypatch.setattr(get_config().retention, "max_episodic_bytes", 10 ** 9)
+    db = vector_db("replaced", chunks)
+    assert db.retention.over_budget() is False
+
+    for chunk in chunks[:10]:
+        db.update(chunk.model_copy(update={"content": "rewritten " * 5, "embedding": None}))
+    db.add_batch([chunk.model_copy(update={"content": "again"}) for chunk in chunks[:5]] * 2)
+
+    assert db.retention.get_stats()["estimated_bytes"] == store_bytes(db)
+
+
+def test_store_enforces_caps_in_the_background(vector_db, monkeypatch):
+    monkeypatch.setattr(get_config().retention, "max_episodic_chunks", 100)
+    db = vector_db("background", make_chunks(130, stale=30))
+
+    deadline = time.monotonic() + 10.0
+    while any(thread.name == "retention-background" for thread in threading.enumerate()):
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+    assert db.count() == 90
+    assert all(db.get(f"c{i}") is None for i in range(30))
@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+"""
+With the shared FAISS index every user's collection is a partition of one
+process-wide index: searches only see the caller's chunks and rank them as a
+private index would, through interleaved adds, deletes, compaction and close.
+"""
+import threading
+
+import numpy as np
+import pytest
+
+from src.dmmr import get_config
+from src.dmmr.data_models import MemoryChunk
+from src.dmmr.memory_systems import VectorDatabase
+
+DIM = 12
+
+
+def make_chunks(user: str, count: int, seed: int):
+    rng = np.random.default_rng(seed)
+    return [MemoryChunk(id=f"{user}{i}", content=f"{user} {i}", user_id=user,
+                        embedding=rng.standard_normal(DIM).tolist())
+            for i in range(count)]
+
+
+@pytest.fixture
+def vector_db(tmp_path, monkeypatch):
+    database = get_config().database
+    monkeypatch.setattr(database, "cache_dir", str(tmp_path))
+    monkeypatch.setattr(database, "vector_dim", DIM)
+    monkeypatch.setattr(database, "hot_tier_size", 0)
+    monkeypatch.setattr(database, "vector_index_type", "flat")
+    monkeypatch.setattr(database, "compact_tombstone_ratio", 2.0)
+    opened = []
+
+    def build(name: str, shared: bool = True) -> VectorDatabase:
+        monkeypatch.setattr(database, "shared_vector_index", shared)
+        db = VectorDatabase(name, use_real_backend=True)
+        opened.append(db)
+        return db
+    yield build
+    for db in opened:
+        db.close()
+
+
+def search_ids(db: VectorDatabase, queries):
+    return [[chunk.id for chunk in result] for result in db.search_batch(queries, 5)]
+
+
+def private_copy(vector_db, db: VectorDatabase) -> VectorDatabase:
+    private = vector_db(f"{db.collection_name}_private", shared=False)
+    private.add_batch([chunk.model_copy() for _, chunk in db.iter_chunks()])
+    return private
+
+
+def test_partitions_only_see_their_own_chunks(vector_db):
+    users = {user: vector_db(f"{user}_episodic") for user in ("alice", "bob", "carol")}
+    chunks = {user: make_chunks(user, 60, seed) for seed, user in enumerate(users)}
+    # Interleave the writes so partitions are not contiguous in the shared index
+    for start in range(0, 60, 20):
+        for user, db in users.items():
+            db.add_batch([chunk.model_copy() for chunk in chunks[user][start:start + 20]])
+    queries = [chunk.embedding for chunk in chunks["bob"][:10]]
+
+    for user, db in users.items():
+        assert db.shared_index
+        assert db.count() == 60
+        got = search_ids(db, queries)
+        assert all(chunk_id.startswith(user) for result in got for chunk_id in result)
+        assert got == search_ids(private_copy(vector_db, db), queries)
+
+
+def test_deletes_compaction_and_close_leave_other_partitions_intact(vector_db):
+    alice, bob = vector_db("alice_episodic"), vector_db("bob_episodic")
+    alice_chunks, bob_chunks = make_chunks("alice", 80, 1), make_chunks("bob", 80, 2)
+    for start in range(0, 80, 40):
+        alice.add_batch([chunk.model_copy() for chunk in alice_chunks[start:start + 40]])
+        bob.add_batch([chunk.model_copy() for chunk in bob_chunks[start:start + 40]])
+    queries = [chunk.embedding for chunk in alice_chunks[:5] + bob_chunks[:5]]
+    expected_bob = search_ids(private_copy(vector_db, bob), queries)
+
+    for chunk in alice_chunks[::2]:
+        alice.delete(chunk.id)
+    alice.compact()
+    assert search_ids(bob, queries) == expected_bob
+    assert search_ids(alice, queries) == search_ids(private_copy(vector_db, alice), queries)
+
+    alice.close()
+    assert search_ids(bob, queries) == expected_bob
+
+
+def test_concurrent_writers_and_readers(vector_db):
+    users = [vector_db(f"user{i}_episodic") for i in range(4)]
+    chunks = [make_chunks(f"user{i}_", 100, i) for i in range(4)]
+    errors = []
+
+    def write(db, user_chunks):
+        try:
+            for start in range(0, 100, 10):
+                db.add_batch([chunk.model_copy() for chunk in user_chunks[start:start + 10]])
+                db.search_batch([user_chunks[start].embedding], 3)
+        except Exception as e:  # surfaced below
+            errors.append(e)
+
+    threads = [threading.Thread(target=write, args=pair) for pair in zip(users, chunks)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    for i, db in enumerate(users):
+        assert db.count() == 100
+        top = db.search(chunks[i][7].embedding, 1)
+        assert [chunk.id for chunk in top] == [chunks[i][7].id]